@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from subway_synth import month_list, write_raw_months
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ['pandas', 'scipy', 'matplotlib', 'seaborn', 'requests', 'pyarrow']
+
+# 명령을 실행한 뒤 불러온 무거운 라이브러리를 표준 오류로 출력하는 실행기
+RUNNER = f"""
+import sys
+sys.path.insert(0, {SCRIPT_DIR!r})
+sys.argv = ['subway_cli.py'] + sys.argv[1:]
+import subway_cli
+try:
+    code = subway_cli.main()
+finally:
+    loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+    sys.stderr.write('LOADED ' + ','.join(loaded) + '\\n')
+"""
+
+# 기존 스크립트처럼 시작할 때 모든 라이브러리를 불러오는 경우 (비교 기준)
+ALL_IMPORTS = ("import pandas, numpy, requests; from scipy import stats; "
+               "import matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot, seaborn")
+
+
+def run(args, repeat):
+    """명령을 repeat번 새 프로세스로 실행해 가장 짧은 시간(ms)과 불러온 라이브러리 반환"""
+    best, loaded = float('inf'), ''
+    env = dict(os.environ, MPLBACKEND='Agg')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(args, capture_output=True, text=True, env=env)
+        best = min(best, (time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} 실패:\n{result.stdout}\n{result.stderr}")
+        loaded = next((line[7:] for line in result.stderr.splitlines() if line.startswith('LOADED ')), '')
+    return best, loaded
+
+
+def main(repeat=3):
+    with tempfile.TemporaryDirectory() as path:
+        data_dir, store_dir = os.path.join(path, 'raw'), os.path.join(path, 'store')
+        months = month_list(1, '202309')
+        write_raw_months(data_dir, months, stations_per_line=50)
+        paths = ['--data-dir', data_dir, '--store-dir', store_dir]
+        # 가상 데이터의 Parquet/집계도 임시 폴더에만 씀 (저장소 기본 위치의 집계를 건드리지 않음)
+        outputs = ['--dataset-dir', os.path.join(path, 'parquet'), '--aggregate-dir', os.path.join(path, 'aggregates')]
+        cli = [sys.executable, '-c', RUNNER]
+        subprocess.run(cli + ['preprocess', '--start', months[0]] + paths + outputs, capture_output=True, check=True)
+
+        commands = [
+            ('python 시작', [sys.executable, '-c', 'pass']),
+            ('모든 라이브러리 불러오기', [sys.executable, '-c', ALL_IMPORTS]),
+            ('--help', cli + ['--help']),
+            ('top', cli + ['top'] + paths),
+            ('top --lines 2 --hours 7-9', cli + ['top', '--lines', '2', '--hours', '7-9'] + paths),
+            ('preprocess (저장된 달)', cli + ['preprocess', '--start', months[0]] + paths + outputs),
+            ('report', cli + ['report'] + paths),
+            ('ttest', cli + ['ttest'] + paths),
+        ]
+        print(f"{'명령':<28}{'시간(ms)':>10}  불러온 라이브러리")
+        for name, args in commands:
+            elapsed, loaded = run(args, repeat)
+            print(f"{name:<28}{elapsed:>10.0f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from subway_analysis import update_store
+from subway_forecast import SeasonalForecaster, auto_harmonics, backtest, design_matrix, month_number
+from subway_store import RidershipStore
+from subway_synth import month_list, write_raw_months
+
+STATIONS_PER_LINE = 50
+N_MONTHS = 36
+
+
+def loop_fit(values, months, harmonics):
+    """계열마다 np.linalg.lstsq를 부르는 비교용 구현 (SeasonalForecaster.fit과 같은 모형)"""
+    numbers = np.array([month_number(month) for month in months])
+    X = design_matrix(numbers, numbers.min(), harmonics)
+    series = values.reshape(len(months), -1).T
+    coef = np.full((len(series), X.shape[1]), np.nan)
+    for n, y in enumerate(series):
+        keep = ~np.isnan(y)
+        if keep.any():
+            coef[n] = np.linalg.lstsq(X[keep], np.log1p(y[keep]), rcond=None)[0]
+    return coef
+
+
+def main(n_months=N_MONTHS, stations_per_line=STATIONS_PER_LINE):
+    with tempfile.TemporaryDirectory() as path:
+        months = month_list(n_months)
+        write_raw_months(os.path.join(path, 'raw'), months, stations_per_line)
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_store(months, os.path.join(path, 'raw'), os.path.join(path, 'store'),
+                         dataset_dir=None, aggregate_dir=None)
+        store = RidershipStore(os.path.join(path, 'store'))
+
+        start = time.perf_counter()
+        values = store.history(months)
+        read_time = time.perf_counter() - start
+        n_series = int((~np.isnan(values).all(axis=0)).sum())
+        print(f"{n_months}개월 × {len(store.lines)}개 호선 × 역 {stations_per_line}개 × 24시간 × 2 "
+              f"= 계열 {n_series:,}개 (저장소 읽기 {read_time * 1000:.0f}ms)")
+
+        harmonics = auto_harmonics(n_months)
+        start = time.perf_counter()
+        expected = loop_fit(values, months, harmonics)
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        model = SeasonalForecaster(harmonics).fit(values, months)
+        fit_time = time.perf_counter() - start
+        present = ~np.isnan(expected).any(axis=1)
+        assert np.allclose(model.coef[present], expected[present], atol=1e-6)
+        model.forecast(1)  # scipy import는 측정에서 뺌
+        start = time.perf_counter()
+        model.forecast(1)
+        predict_time = time.perf_counter() - start
+        print(f"적합: 계열별 반복 {loop_time:.2f}s, 묶음 계산 {fit_time * 1000:.0f}ms "
+              f"({loop_time / fit_time:.0f}배), 예측·구간 {predict_time * 1000:.0f}ms")
+
+        start = time.perf_counter()
+        results = backtest(values, months, min_train=n_months - 12)
+        backtest_time = time.perf_counter() - start
+        print(f"백테스트 {len(results)}개 시점: {backtest_time:.2f}s "
+              f"(평균 WAPE {np.mean([row['wape'] for row in results]):.1%}, "
+              f"계절 단순 예측 {np.mean([row['naive_wape'] for row in results]):.1%}, "
+              f"구간 적중률 {np.mean([row['coverage'] for row in results]):.1%})")
+        store.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,59 @@
+import contextlib
+import io
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from subway_aggregate import AggregateState
+from subway_analysis import preprocess_data
+from subway_store import RidershipStore
+from subway_synth import make_card_subway_time
+from subway_topk import top_k_stations
+
+
+def make_month(month, stations_per_line):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess_data(make_card_subway_time([month], stations_per_line))
+
+
+def main(n_months=60, stations_per_line=300):
+    months = [f"{2019 + i // 12}{i % 12 + 1:02d}" for i in range(n_months + 1)]
+    path = tempfile.mkdtemp()
+    store = RidershipStore(path + '/store')
+    aggregates = AggregateState(path + '/aggregates')
+    for month in months[:-1]:
+        store.write_month(month, make_month(month, stations_per_line))
+        aggregates.fold(store, month)
+    cube = aggregates.cube(store)
+    aggregates.line_reports(cube)
+    aggregates.save()
+
+    # 새 달 저장
+    store.write_month(months[-1], make_month(months[-1], stations_per_line))
+
+    # 전체 다시 계산: 모든 달을 합쳐 큐브를 만들고 모든 호선 상위 역 계산
+    start = time.perf_counter()
+    full_cube = store.cube()
+    full_top = top_k_stations(full_cube)
+    full_ms = (time.perf_counter() - start) * 1000
+
+    # 증분 계산: 새 달 변화분만 더하고 바뀐 호선 보고서만 다시 계산
+    start = time.perf_counter()
+    aggregates = AggregateState(path + '/aggregates')
+    aggregates.fold(store, months[-1])
+    cube = aggregates.cube(store)
+    reports, refreshed = aggregates.line_reports(cube)
+    aggregates.save()
+    incremental_ms = (time.perf_counter() - start) * 1000
+
+    assert np.array_equal(cube.values, full_cube.values)
+    assert {line: report['top'] for line, report in reports.items()} == full_top
+    print(f"기존 {n_months}개월 + 새 1개월, 호선 {len(cube.lines)}개 × 역 {stations_per_line}개")
+    print(f"전체 다시 계산: {full_ms:.1f}ms")
+    print(f"증분 계산: {incremental_ms:.1f}ms (다시 계산한 호선 {len(refreshed)}개)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
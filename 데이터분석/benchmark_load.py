@@ -0,0 +1,103 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from subway_analysis import update_store
+from subway_load import LineLoad, read_station_order
+from subway_store import RidershipStore
+from subway_synth import month_list, write_raw_months, write_station_order_csv
+
+STATIONS_PER_LINE = 50
+BACKFILL_MONTHS = (12, 60)
+
+
+def loop_load(cube, order):
+    """호선·시간·역마다 파이썬 반복문으로 계산하는 비교용 구현 (estimate_load와 같은 규칙)"""
+    result = {}
+    for line, (names, circular) in order.items():
+        if line not in cube.line_index:
+            continue
+        i = cube.line_index[line]
+        slots = [cube.station_index[i].get(name) for name in names]
+        n = len(names)
+        loads = np.zeros((n, 24, 2))
+        for hour in range(24):
+            on = [0.0 if j is None else float(cube.values[i, j, hour, 0]) for j in slots]
+            off = [0.0 if j is None else float(cube.values[i, j, hour, 1]) for j in slots]
+            forward_on, forward_off = [], []
+            for s in range(n):
+                off_before, off_after = sum(off[:s]), sum(off[s + 1:])
+                on_before, on_after = sum(on[:s]), sum(on[s + 1:])
+                share_on = 0.5 if circular or off_before + off_after == 0 else off_after / (off_before + off_after)
+                share_off = 0.5 if circular or on_before + on_after == 0 else on_before / (on_before + on_after)
+                forward_on.append(on[s] * share_on)
+                forward_off.append(off[s] * share_off)
+            for d, (d_on, d_off) in enumerate([(forward_on, forward_off),
+                                                ([a - b for a, b in zip(on, forward_on)],
+                                                 [a - b for a, b in zip(off, forward_off)])]):
+                scale = sum(d_on) / sum(d_off) if sum(d_off) else 0.0
+                flow = [a - b * scale for a, b in zip(d_on, d_off)]
+                running, values = 0.0, []
+                for s in range(n):
+                    running += flow[s]
+                    values.append(running if d == 0 else sum(flow) - running)
+                n_segments = n if circular else n - 1
+                if circular:
+                    lowest = min(values[:n_segments])
+                    values = [v - lowest for v in values]
+                for s in range(n_segments):
+                    loads[s, hour, d] = max(values[s], 0.0)
+        result[line] = loads
+    return result
+
+
+def main(backfill_months=BACKFILL_MONTHS):
+    with tempfile.TemporaryDirectory() as path:
+        months = month_list(max(backfill_months))
+        write_raw_months(os.path.join(path, 'raw'), months, STATIONS_PER_LINE)
+        order_path = os.path.join(path, 'order.csv')
+        write_station_order_csv(order_path, STATIONS_PER_LINE)
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_store(months, os.path.join(path, 'raw'), os.path.join(path, 'store'),
+                         dataset_dir=None, aggregate_dir=None)
+        store = RidershipStore(os.path.join(path, 'store'))
+        order = read_station_order(order_path)
+
+        # 한 달치: 반복문 구현과 결과·시간 비교
+        cube = store.cube(months[:1])
+        start = time.perf_counter()
+        expected = loop_load(cube, order)
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        load = LineLoad.from_cube(cube, order)
+        vector_time = time.perf_counter() - start
+        for i, line in enumerate(load.lines):
+            n = len(load.stations[i])
+            assert np.allclose(load.load[i, :n], expected[line]), line
+        segments = sum(len(names) - (0 if c else 1) for names, c in zip(load.stations, load.circular))
+        print(f"한 달 ({len(load.lines)}개 호선, 구간 {segments}개 × 24시간 × 2방향)")
+        print(f"  반복문 {loop_time * 1000:.1f}ms, 배열 계산 {vector_time * 1000:.2f}ms "
+              f"({loop_time / vector_time:.0f}배)")
+
+        # 여러 달 백필: 달마다 큐브를 만들어 계산 vs 모든 달을 쌓아 한 번에 계산
+        for n_months in backfill_months:
+            selected = months[:n_months]
+            start = time.perf_counter()
+            per_month = [LineLoad.from_cube(store.cube([month]), order).load for month in selected]
+            per_month_time = time.perf_counter() - start
+            start = time.perf_counter()
+            batched = LineLoad.from_store(store, order, selected)
+            batched_time = time.perf_counter() - start
+            assert np.allclose(np.stack(per_month), batched.load)
+            print(f"{n_months}개월 백필: 달마다 {per_month_time * 1000:.0f}ms, 한 번에 {batched_time * 1000:.0f}ms "
+                  f"(달당 {batched_time / n_months * 1000:.2f}ms)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or BACKFILL_MONTHS)
@@ -0,0 +1,76 @@
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from subway_names import StationIndex, canonical_column, canonical_name, decompose, edit_distance, name_key
+from subway_synth import DEFAULT_LINES, station_names
+
+STATIONS_PER_LINE = 50
+
+
+def scan_lookup(names, query):
+    """색인 없이 모든 이름을 정규화해 비교 (기존 방식처럼 매번 전체 목록을 훑음)"""
+    key = name_key(query)
+    return next((name for name in names if name_key(name) == key), None)
+
+
+def scan_prefix(names, prefix, limit=10):
+    target = decompose(name_key(prefix))
+    found = sorted({canonical_name(name) for name in names if decompose(name_key(name)).startswith(target)},
+                   key=lambda name: (len(name), name))
+    return found[:limit]
+
+
+def scan_fuzzy(names, query, max_distance=1):
+    target = decompose(name_key(query))
+    return sorted((d, name) for name in set(names)
+                  if (d := edit_distance(target, decompose(name_key(name)))) <= max_distance)
+
+
+def timed(func, number):
+    """func를 number번 실행한 평균 시간(마이크로초), 5번 반복 중 가장 빠른 값"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(stations_per_line=STATIONS_PER_LINE):
+    names_by_line = station_names(DEFAULT_LINES, stations_per_line)
+    names = [name for line in DEFAULT_LINES for name in names_by_line[line]]
+    index = StationIndex()
+    build = timed(lambda: StationIndex(names), 3) / 1000
+    for line in DEFAULT_LINES:
+        for name in names_by_line[line]:
+            index.add(name, line)
+
+    name = names_by_line['2호선'][7]
+    typo = name[:-1] + chr(ord(name[-1]) + 1)
+    prefix = name[0] + decompose(name[1])[0]
+    print(f"역 {len(index)}개 ({len(DEFAULT_LINES)}개 호선 × {stations_per_line}), 색인 생성 {build:.1f}ms")
+    assert scan_lookup(names, name + '역') == index.names[index.lookup(name + '역')]
+    assert scan_prefix(names, prefix) == [index.names[i] for i in index.search(prefix)]
+    assert [n for _, n in scan_fuzzy(names, typo)] == sorted(index.names[i] for i, _ in index.fuzzy(typo, 1))
+
+    print(f"{'질의':<34}{'전체 탐색(us)':>14}{'색인(us)':>12}")
+    cases = [
+        (f"정확한 이름 '{name}'", lambda: scan_lookup(names, name), lambda: index.lookup(name)),
+        (f"표기 차이 '{name}역'", lambda: scan_lookup(names, name + '역'), lambda: index.lookup(name + '역')),
+        (f"호선 지정 '{name}' (2호선)", lambda: scan_lookup(names_by_line['2호선'], name),
+         lambda: index.lookup(name, '2호선')),
+        (f"접두사 '{prefix}'", lambda: scan_prefix(names, prefix), lambda: index.search(prefix)),
+        (f"접두사 '{name[0]}'", lambda: scan_prefix(names, name[0]), lambda: index.search(name[0])),
+        (f"오타 '{typo}' (거리 1)", lambda: scan_fuzzy(names, typo), lambda: index.fuzzy(typo, 1)),
+        (f"오타 resolve '{typo}'", lambda: scan_fuzzy(names, typo), lambda: index.resolve(typo)),
+    ]
+    for label, scan, indexed in cases:
+        print(f"{label:<34}{timed(scan, 20):>14.1f}{timed(indexed, 2000):>12.2f}")
+
+    # 수집 단계의 이름 정리 비용 (CSV 청크 10만 행 기준, 고유 이름만 한 번씩 정규화)
+    column = pd.Series(np.resize(np.array(names, dtype=object), 100000))
+    canonical_name.cache_clear()
+    print(f"\n대표 표기 변환 10만 행: {timed(lambda: canonical_column(column), 5) / 1000:.1f}ms "
+          f"(행마다 변환: {timed(lambda: column.map(canonical_name), 5) / 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else STATIONS_PER_LINE)
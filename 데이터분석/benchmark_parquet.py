@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+
+from subway_analysis import preprocess_data
+from subway_parquet import dataset_files, read_dataset, write_dataset
+from subway_synth import make_card_subway_time
+
+
+def column_bytes(files, columns):
+    """Parquet 파일들에서 columns 컬럼 청크의 압축 크기 합계 (실제로 읽어야 하는 바이트)"""
+    total = 0
+    for path in files:
+        metadata = pq.ParquetFile(path).metadata
+        for r in range(metadata.num_row_groups):
+            row_group = metadata.row_group(r)
+            for c in range(row_group.num_columns):
+                chunk = row_group.column(c)
+                if chunk.path_in_schema in columns:
+                    total += chunk.total_compressed_size
+    return total
+
+
+def main(n_months=36, stations_per_line=300):
+    months = [f"{2021 + i // 12}{i % 12 + 1:02d}" for i in range(n_months)]
+    path = tempfile.mkdtemp()
+    raw_months = [make_card_subway_time([month], stations_per_line) for month in months]
+
+    # 기존 방식: 원본(JSON 행과 같은 모양)을 매번 다시 전처리
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = [preprocess_data(raw) for raw in raw_months]
+    reparse_ms = (time.perf_counter() - start) * 1000
+
+    for month, frame in zip(months, frames):
+        write_dataset(frame, path, month)
+    all_files = dataset_files(path)
+    total_bytes = sum(os.path.getsize(f) for f in all_files)
+
+    # "2호선, 2023년, 승차인원만" 조회
+    columns = ['역명', '시간', '승차인원']
+    start = time.perf_counter()
+    result = read_dataset(path, columns=columns, lines=['2호선'], year=2023)
+    query_ms = (time.perf_counter() - start) * 1000
+    files = dataset_files(path, lines=['2호선'], year=2023)
+    needed = column_bytes(files, columns)
+
+    print(f"데이터셋: {n_months}개월, 파일 {len(all_files)}개, {total_bytes / 1024 / 1024:.1f}MB")
+    print(f"조회 결과: {len(result)}행, 파일 {len(files)}개")
+    print(f"읽은 컬럼 바이트: {needed / 1024:.1f}KB (전체의 {needed / total_bytes * 100:.2f}%)")
+    print(f"원본 {n_months}개월 재전처리: {reparse_ms:.1f}ms, Parquet 조회: {query_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 36)
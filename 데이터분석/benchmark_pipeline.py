@@ -0,0 +1,113 @@
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+
+from subway_analysis import (analyze_commute_windows, analyze_top_stations, create_visualizations,
+                             perform_hypothesis_testing, update_store)
+from subway_csv import load_processed
+from subway_cube import CongestionCube
+from subway_profile import StageProfiler
+from subway_synth import month_list, write_raw_months, write_station_hour_csv
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 실제 CardSubwayTime 한 달치와 비슷한 규모 (12개 호선 × 50개 역 = 600행)
+STATIONS_PER_LINE = 50
+SCALES = (1, 10, 100)
+
+
+def load_ttest_module():
+    """파일 이름에 '-'가 있어 import 문으로 불러올 수 없는 t-test.py 불러오기"""
+    spec = importlib.util.spec_from_file_location('t_test', os.path.join(SCRIPT_DIR, 't-test.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_inputs(scale, path):
+    """scale개월(한 달치 × scale 규모)의 가상 원본 저널과 CSV 생성 (측정하지 않음)"""
+    months = month_list(scale)
+    write_raw_months(os.path.join(path, 'raw'), months, STATIONS_PER_LINE)
+    write_station_hour_csv(os.path.join(path, 'ridership.csv'), months, STATIONS_PER_LINE)
+    return months
+
+
+def run_pipeline(months, path, output_dir, plots=True, n_resamples=1000, trace_memory=False):
+    """두 파이프라인을 실행하고 단계별 측정값(StageProfiler) 반환
+
+    trace_memory=True면 tracemalloc으로 최대 메모리를 재지만 시간이 크게 늘어나므로
+    시간과 메모리는 따로 실행해 측정함
+    """
+    data_dir = os.path.join(path, 'raw')
+    csv_path = os.path.join(path, 'ridership.csv')
+    raw_rows = len(months) * 12 * STATIONS_PER_LINE
+    tt = load_ttest_module()
+
+    profiler = StageProfiler(enabled=True, trace_memory=trace_memory)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Open API 파이프라인 (저장된 원본 → 전처리/저장소 → 큐브 → 분석 → 그림)
+        with profiler.stage('전처리', rows=raw_rows):
+            store = update_store(months, data_dir, os.path.join(output_dir, 'store'),
+                                 dataset_dir=None, aggregate_dir=None)
+        with profiler.stage('큐브', rows=raw_rows):
+            cube = store.cube(months)
+        observed = int(cube.observed.sum())
+        with profiler.stage('상위 역', rows=observed):
+            top = analyze_top_stations(cube)
+        with profiler.stage('출퇴근 시간대', rows=observed):
+            analyze_commute_windows(cube)
+        with profiler.stage('가설검정', rows=observed):
+            perform_hypothesis_testing(cube)
+        if plots:
+            with profiler.stage('그림', rows=observed):
+                create_visualizations(cube, top, os.path.join(output_dir, 'plots'), force=True)
+
+        # CSV 파이프라인 (CSV 청크 전처리 → 큐브 → t-검정/재표본 검정)
+        with profiler.stage('CSV 전처리', rows=raw_rows):
+            df = load_processed(csv_path, by_month=True)
+        with profiler.stage('CSV 큐브', rows=len(df)):
+            csv_cube = CongestionCube.from_frame(df)
+        with profiler.stage('t-검정', rows=observed):
+            tt.perform_ttest_analysis(csv_cube)
+        with profiler.stage('재표본 검정', rows=observed):
+            tt.perform_resampling_analysis(csv_cube, n_resamples=n_resamples)
+    store.close()
+    return profiler
+
+
+def main(scales=SCALES, plots=True):
+    reports = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as path:
+            months = make_inputs(scale, path)
+            profiler = run_pipeline(months, path, os.path.join(path, 'time'), plots)
+            memory = run_pipeline(months, path, os.path.join(path, 'memory'), plots, trace_memory=True)
+            memory.stop()
+        # 시간 측정 결과에 메모리 측정 결과를 합침
+        for record, traced in zip(profiler.stages, memory.stages):
+            record['traced_peak_mb'] = traced['traced_peak_mb']
+        reports[scale] = profiler
+        print(f"\n=== {scale}× ({scale}개월, 원본 {scale * 12 * STATIONS_PER_LINE}행) ===")
+        print(f"{'단계':<14}{'시간(ms)':>12}{'처리량(행/초)':>16}{'최대 메모리(MB)':>18}")
+        for record in profiler.stages:
+            throughput = record['rows'] / record['wall_s'] if record['wall_s'] else float('inf')
+            print(f"{record['name']:<14}{record['wall_s'] * 1000:>12.1f}{throughput:>16,.0f}"
+                  f"{record['traced_peak_mb']:>18.1f}")
+        print(f"보고서: {profiler.save(f'benchmark_pipeline-{scale}x')}")
+
+    # 규모가 커질 때 단계별 시간이 늘어나는 비율
+    base = min(scales)
+    print(f"\n=== {base}× 대비 시간 비율 ===")
+    names = [record['name'] for record in reports[base].stages]
+    print(f"{'단계':<14}" + ''.join(f"{f'{scale}×':>10}" for scale in scales))
+    for i, name in enumerate(names):
+        base_time = reports[base].stages[i]['wall_s']
+        print(f"{name:<14}" + ''.join(f"{reports[scale].stages[i]['wall_s'] / base_time:>10.1f}"
+                                      for scale in scales))
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    main(tuple(int(arg) for arg in args) or SCALES, plots='--no-plots' not in sys.argv)
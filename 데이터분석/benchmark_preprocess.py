@@ -0,0 +1,75 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from subway_analysis import preprocess_data
+from subway_schema import to_compact_frame
+from subway_synth import make_card_subway_time
+
+
+def preprocess_data_melt(df):
+    """기존 melt + apply + pivot_table 방식의 전처리 (비교용)"""
+    df_melted = pd.melt(df,
+                        id_vars=['USE_MM', 'SBWY_ROUT_LN_NM', 'STTN'],
+                        value_vars=[col for col in df.columns if 'GET_' in col],
+                        var_name='TIME_TYPE',
+                        value_name='PASSENGER_NUM')
+    df_melted['TIME'] = df_melted['TIME_TYPE'].str.extract(r'HR_(\d+)_').astype(str) + '시'
+    df_melted['TYPE'] = df_melted['TIME_TYPE'].apply(lambda x: '승차인원' if 'GET_ON' in x else '하차인원')
+    # 같은 호선/역/시간이 여러 번 나오면 합산 (결측인 값은 빼고 더함)
+    df_melted['PASSENGER_NUM'] = pd.to_numeric(df_melted['PASSENGER_NUM'], errors='coerce')
+    df_processed = df_melted.dropna(subset=['PASSENGER_NUM']).pivot_table(
+        index=['SBWY_ROUT_LN_NM', 'STTN', 'TIME'],
+        columns='TYPE',
+        values='PASSENGER_NUM',
+        aggfunc='sum'
+    ).reset_index()
+    df_processed = df_processed.rename(columns={
+        'SBWY_ROUT_LN_NM': '호선',
+        'STTN': '역명',
+        'TIME': '시간'
+    })
+    df_processed['승차인원'] = pd.to_numeric(df_processed['승차인원'], errors='coerce')
+    df_processed['하차인원'] = pd.to_numeric(df_processed['하차인원'], errors='coerce')
+    df_processed = df_processed.fillna(0)
+    df_processed['총이용객'] = df_processed['승차인원'] + df_processed['하차인원']
+    seoul_lines = ['1호선', '2호선', '3호선', '4호선', '5호선', '6호선', '7호선', '8호선', '9호선']
+    df_processed = df_processed[df_processed['호선'].isin(seoul_lines)]
+    df_processed.columns.name = None
+    return to_compact_frame(df_processed)
+
+
+def measure(func, df):
+    """실행 시간(초)과 tracemalloc 최대 메모리(MB) 측정"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def main(n_months=24):
+    months = [f"{2022 + i // 12}{i % 12 + 1:02d}" for i in range(n_months)]
+    raw = make_card_subway_time(months)
+    # 결측치 처리도 같은지 확인하기 위해 일부 값을 비움
+    raw.iloc[::97, 5] = np.nan
+    print(f"원본 데이터: {len(raw)}행 × {len(raw.columns)}열 ({n_months}개월)")
+
+    old, old_time, old_peak = measure(preprocess_data_melt, raw)
+    new, new_time, new_peak = measure(preprocess_data, raw)
+
+    pd.testing.assert_frame_equal(old, new)
+    print("\n결과 일치 확인 완료")
+    print(f"{'방식':<20}{'시간(초)':>10}{'최대 메모리(MB)':>18}")
+    print(f"{'melt + pivot_table':<20}{old_time:>10.3f}{old_peak:>18.1f}")
+    print(f"{'NumPy 블록':<20}{new_time:>10.3f}{new_peak:>18.1f}")
+    print(f"속도 {old_time / new_time:.1f}배, 메모리 {old_peak / new_peak:.1f}배 감소")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
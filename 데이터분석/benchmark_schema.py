@@ -0,0 +1,61 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from subway_analysis import preprocess_data
+from subway_schema import PEAK_HOURS
+from subway_synth import make_card_subway_time
+
+
+def to_string_frame(df):
+    """간결한 스키마 이전의 전처리 결과 형태 (object 문자열, '7시' 시간, float64 인원)"""
+    return pd.DataFrame({
+        '호선': df['호선'].astype(str).to_numpy(dtype=object),
+        '역명': df['역명'].astype(str).to_numpy(dtype=object),
+        '시간': (df['시간'].astype(str) + '시').to_numpy(dtype=object),
+        '승차인원': df['승차인원'].to_numpy(dtype=np.float64),
+        '하차인원': df['하차인원'].to_numpy(dtype=np.float64),
+        '총이용객': df['총이용객'].to_numpy(dtype=np.float64)
+    })
+
+
+def best_time(func, repeat=20):
+    """repeat번 실행 중 가장 빠른 시간(ms)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main(n_months=12):
+    months = [f"{2022 + i // 12}{i % 12 + 1:02d}" for i in range(n_months)]
+    raw = make_card_subway_time(months, stations_per_line=300)
+    compact = preprocess_data(raw)
+    old = to_string_frame(compact)
+    print(f"\n전처리 결과: {len(compact)}행")
+
+    old_peak = [f"{hour}시" for hour in PEAK_HOURS]
+    cases = [
+        ('피크 필터', lambda: old[old['시간'].isin(old_peak)],
+         lambda: compact[compact['피크']]),
+        ('호선 필터', lambda: old[old['호선'] == '2호선'],
+         lambda: compact[compact['호선'] == '2호선']),
+        ('호선별 합계', lambda: old.groupby('호선')['총이용객'].sum(),
+         lambda: compact.groupby('호선', observed=True)['총이용객'].sum())
+    ]
+
+    old_mb = old.memory_usage(deep=True).sum() / 1024 / 1024
+    new_mb = compact.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{'항목':<14}{'기존':>12}{'간결한 스키마':>16}{'배율':>8}")
+    print(f"{'메모리(MB)':<14}{old_mb:>12.1f}{new_mb:>16.1f}{old_mb / new_mb:>8.1f}")
+    for name, old_func, new_func in cases:
+        old_ms, new_ms = best_time(old_func), best_time(new_func)
+        print(f"{name + '(ms)':<14}{old_ms:>12.2f}{new_ms:>16.2f}{old_ms / new_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 12)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from urllib.parse import urlencode
+
+import numpy as np
+
+from subway_cube import CongestionCube
+from subway_server import CongestionIndex, serve
+from subway_synth import DEFAULT_LINES, month_list, ridership_counts, station_names
+
+STATIONS_PER_LINE = 50
+N_REQUESTS = 20000
+CONCURRENCY = 32
+HOT_QUERIES = 200
+
+
+def make_cube(n_months=12, stations_per_line=STATIONS_PER_LINE):
+    """가상 n_months개월 합계 큐브 (12개 호선 × stations_per_line개 역)"""
+    counts = ridership_counts(month_list(n_months), stations_per_line)
+    names = station_names(DEFAULT_LINES, stations_per_line)
+    return CongestionCube(counts.sum(axis=0).astype(np.float64), DEFAULT_LINES,
+                          [names[line] for line in DEFAULT_LINES])
+
+
+def run_server(cache_size, queue):
+    """자식 프로세스에서 색인을 만들고 빈 포트로 서비스 시작 (포트를 queue로 알려줌)"""
+    index = CongestionIndex(make_cube())
+    asyncio.run(serve(index, '127.0.0.1', 0, cache_size, lambda host, port: queue.put(port)))
+
+
+def make_queries(n, rng, hot=None):
+    """point/window/top 질의를 섞은 경로 목록 (hot이 주어지면 그 개수의 질의만 반복, 앞쪽일수록 자주)"""
+    names = station_names(DEFAULT_LINES, STATIONS_PER_LINE)
+    metrics = ['총이용객', '승차인원', '하차인원']
+
+    def query():
+        line = DEFAULT_LINES[rng.integers(len(DEFAULT_LINES))]
+        station = names[line][rng.integers(STATIONS_PER_LINE)]
+        kind = rng.choice(['point', 'window', 'top'], p=[0.5, 0.3, 0.2])
+        if kind == 'point':
+            params = {'line': line, 'station': station, 'hour': int(rng.integers(24))}
+        else:
+            start = int(rng.integers(24))
+            end = (start + int(rng.integers(1, 5))) % 24
+            params = {'line': line, 'start': start, 'end': end, 'metric': metrics[rng.integers(3)]}
+            if kind == 'window':
+                params['station'] = station
+            else:
+                params['k'] = 10
+        return f"/{kind}?{urlencode(params)}"
+
+    if hot is None:
+        return [query() for _ in range(n)]
+    pool = [query() for _ in range(hot)]
+    # 질의 빈도는 지프 분포를 따름 (대시보드가 같은 역·시간대를 반복해서 묻는 상황)
+    weights = 1 / np.arange(1, hot + 1)
+    return [pool[i] for i in rng.choice(hot, size=n, p=weights / weights.sum())]
+
+
+async def request(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('utf-8'))
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                  if line.lower().startswith(b'content-length'))
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def load_test(port, queries, concurrency=CONCURRENCY):
+    """concurrency개의 keep-alive 연결로 질의를 나눠 보내고 (요청별 지연 시간(초), 전체 시간, 오류 수) 반환"""
+    latencies = np.empty(len(queries))
+    errors = 0
+
+    async def client(worker):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in range(worker, len(queries), concurrency):
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, queries[i])
+            latencies[i] = time.perf_counter() - start
+            errors += status != 200
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    return latencies, time.perf_counter() - start, errors
+
+
+async def fetch_stats(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, body = await request(reader, writer, '/stats')
+    writer.close()
+    return json.loads(body)
+
+
+def main(n_requests=N_REQUESTS):
+    rng = np.random.default_rng(0)
+    scenarios = [
+        ('캐시 없음, 모두 다른 질의', 0, make_queries(n_requests, rng)),
+        ('캐시 없음, 반복 질의', 0, make_queries(n_requests, rng, HOT_QUERIES)),
+        ('LRU 캐시, 반복 질의', 4096, make_queries(n_requests, rng, HOT_QUERIES)),
+    ]
+    print(f"요청 {n_requests}개, 동시 연결 {CONCURRENCY}개 (서버는 별도 프로세스)")
+    print(f"{'시나리오':<22}{'p50(ms)':>10}{'p99(ms)':>10}{'RPS':>10}{'캐시 적중률':>12}{'오류':>6}")
+    for name, cache_size, queries in scenarios:
+        queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=run_server, args=(cache_size, queue), daemon=True)
+        server.start()
+        try:
+            port = queue.get(timeout=60)
+            # 연결·색인 준비 과정이 측정에 섞이지 않도록 먼저 조금 보내 봄
+            asyncio.run(load_test(port, queries[:200]))
+            latencies, elapsed, errors = asyncio.run(load_test(port, queries))
+            stats = asyncio.run(fetch_stats(port))
+        finally:
+            server.terminate()
+            server.join()
+        p50, p99 = np.percentile(latencies * 1000, [50, 99])
+        hit_rate = stats['cache']['hit_rate'] if cache_size else None
+        print(f"{name:<22}{p50:>10.2f}{p99:>10.2f}{len(queries) / elapsed:>10,.0f}"
+              f"{'-' if hit_rate is None else f'{hit_rate:.1%}':>12}{errors:>6}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_REQUESTS)
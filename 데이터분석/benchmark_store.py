@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from subway_analysis import preprocess_data
+from subway_store import RidershipStore
+from subway_synth import make_card_subway_time
+
+
+def measure(func):
+    """실행 시간(ms)과 tracemalloc 최대 메모리(MB) 측정"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / 1024 / 1024
+
+
+def main(n_months=60, stations_per_line=300):
+    months = [f"{2019 + i // 12}{i % 12 + 1:02d}" for i in range(n_months)]
+    path = tempfile.mkdtemp()
+    store = RidershipStore(path)
+    for month in months:
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.write_month(month, preprocess_data(make_card_subway_time([month], stations_per_line)))
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 / 1024
+    print(f"저장소: {n_months}개월, 디스크 {size:.1f}MB")
+
+    # 저장소 열기는 meta.json만 읽음
+    store, open_ms, open_mb = measure(lambda: RidershipStore(path))
+    line_cube, line_ms, line_mb = measure(lambda: store.cube(lines=['2호선']))
+    store.close()
+    full_cube, full_ms, full_mb = measure(lambda: RidershipStore(path).cube())
+
+    print(f"{'작업':<22}{'시간(ms)':>10}{'최대 메모리(MB)':>18}")
+    print(f"{'저장소 열기':<22}{open_ms:>10.1f}{open_mb:>18.2f}")
+    print(f"{'2호선 5년 합계':<22}{line_ms:>10.1f}{line_mb:>18.2f}")
+    print(f"{'전체 호선 5년 합계':<22}{full_ms:>10.1f}{full_mb:>18.2f}")
+    assert np.array_equal(line_cube.values[0], full_cube.line('2호선'))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
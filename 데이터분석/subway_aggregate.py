@@ -0,0 +1,141 @@
+import json
+import os
+
+import numpy as np
+
+from subway_cube import DIRECTIONS, HOURS
+from subway_store import MISSING, assemble_cube
+
+DEFAULT_AGGREGATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'aggregates')
+STATE_NAME = 'state.json'
+
+
+def _contribution(array, shape):
+    """한 달치 저장소 배열을 (합계, 관측 횟수) 변화분으로 변환 (shape 크기로 0을 채워 맞춤)"""
+    totals = np.zeros(shape + (HOURS, len(DIRECTIONS)))
+    counts = np.zeros(shape + (HOURS,), dtype=np.int32)
+    if array is None:
+        return totals, counts
+    lines, stations = array.shape[:2]
+    values = np.asarray(array, dtype=np.float64)
+    observed = (values != MISSING).any(axis=3)
+    totals[:lines, :stations] = np.where(values == MISSING, 0, values)
+    counts[:lines, :stations] = observed
+    return totals, counts
+
+
+class AggregateState:
+    """저장소 전체 달의 (호선, 역, 시간, 승하차) 합계와 관측 횟수를 미리 계산해 두는 집계
+
+    새 달이 저장되면 그 달의 변화분만 더하고(fold), 바뀐 호선만 'dirty'로 표시해
+    호선별 보고서(상위 역, 피크/비피크 통계)와 그림을 그 호선만 다시 만들게 함
+    - totals.npy, counts.npy: 저장소의 (호선, 역) 번호 기준 배열
+    - state.json: 반영한 달 목록, 다시 계산할 호선, 호선별 보고서
+    """
+
+    def __init__(self, path=DEFAULT_AGGREGATE_DIR):
+        self.path = path
+        totals_path = os.path.join(path, 'totals.npy')
+        state_path = os.path.join(path, STATE_NAME)
+        if os.path.exists(totals_path) and os.path.exists(state_path):
+            self.totals = np.load(totals_path)
+            self.counts = np.load(os.path.join(path, 'counts.npy'))
+            with open(state_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        else:
+            self.totals = np.zeros((0, 0, HOURS, len(DIRECTIONS)))
+            self.counts = np.zeros((0, 0, HOURS), dtype=np.int32)
+            self.state = {'months': [], 'dirty_lines': [], 'reports': {}}
+
+    @property
+    def months(self):
+        return sorted(self.state['months'])
+
+    @property
+    def dirty_lines(self):
+        return list(self.state['dirty_lines'])
+
+    def _grow(self, shape):
+        """저장소에 호선/역이 늘어난 만큼 배열 크기를 키움"""
+        if shape == self.totals.shape[:2]:
+            return
+        totals = np.zeros(shape + (HOURS, len(DIRECTIONS)))
+        counts = np.zeros(shape + (HOURS,), dtype=np.int32)
+        lines, stations = self.totals.shape[:2]
+        totals[:lines, :stations] = self.totals
+        counts[:lines, :stations] = self.counts
+        self.totals, self.counts = totals, counts
+
+    def fold(self, store, month, previous=None):
+        """저장소에 새로 저장된 달(previous가 있으면 다시 저장된 달)의 변화분만 반영
+
+        previous: 다시 저장하기 전의 그 달 배열 (이미 반영된 달이면 빼고 다시 더함)
+        반환값: 값이 바뀐 호선 목록
+        """
+        current = store.month_array(month)
+        shape = (len(store.lines), max(len(store.meta['stations'][line]) for line in store.lines))
+        self._grow(shape)
+        if month not in self.state['months']:
+            # 집계를 지웠거나 저장 전에 중단되어 반영된 적 없는 달은 예전 배열이 있어도 새 달처럼 더함
+            previous = None
+        elif previous is None:
+            return []
+
+        new_totals, new_counts = _contribution(current, shape)
+        old_totals, old_counts = _contribution(previous, shape)
+        delta_totals, delta_counts = new_totals - old_totals, new_counts - old_counts
+        self.totals += delta_totals
+        self.counts += delta_counts
+
+        changed = (delta_totals != 0).any(axis=(1, 2, 3)) | (delta_counts != 0).any(axis=(1, 2))
+        affected = [line for line, flag in zip(store.lines, changed) if flag]
+        if month not in self.state['months']:
+            self.state['months'].append(month)
+        self.state['dirty_lines'] = sorted(set(self.state['dirty_lines']) | set(affected))
+        return affected
+
+    def cube(self, store, lines=None):
+        """반영된 모든 달의 합계 큐브 (달 수와 관계없이 한 달치 크기만큼만 계산)"""
+        parts = []
+        for i, line in enumerate(store.lines):
+            if lines is not None and line not in lines:
+                continue
+            names = store.meta['stations'][line]
+            parts.append((line, names, self.totals[i, :len(names)], self.counts[i, :len(names)] > 0))
+        parts.sort(key=lambda part: part[0])
+        return assemble_cube(parts)
+
+    def line_reports(self, cube, k=10, metric='총이용객'):
+        """호선별 보고서(상위 k개 역)를 바뀐 호선만 다시 계산
+
+        반환값: ({호선: 보고서}, 다시 계산한 호선 목록)
+        """
+        reports = self.state['reports']
+        settings = {'k': k, 'metric': metric}
+        dirty = set(self.state['dirty_lines'])
+        pending = [line for line in cube.lines
+                   if line in dirty or reports.get(line, {}).get('settings') != settings]
+
+        # 역별 합계는 한 번만 계산하고 다시 계산할 호선 부분만 사용
+        totals = cube.sum('station', metric) if pending else None
+        refreshed = []
+        for line in pending:
+            i = cube.line_index[line]
+            n = cube.station_counts[i]
+            order = np.argsort(-totals[i, :n], kind='stable')[:k]
+            reports[line] = {'settings': settings, 'top': [cube.stations[i][j] for j in order]}
+            refreshed.append(line)
+        self.state['dirty_lines'] = sorted(dirty - set(cube.lines))
+        return {line: reports[line] for line in cube.lines}, refreshed
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name, array in [('totals.npy', self.totals), ('counts.npy', self.counts)]:
+            temp_path = os.path.join(self.path, name + '.tmp')
+            with open(temp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp_path, os.path.join(self.path, name))
+        path = os.path.join(self.path, STATE_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
@@ -1,62 +1,87 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import os
 import warnings
-import requests
-import time
-from datetime import datetime, timedelta
+import re
+import sys
+from subway_aggregate import DEFAULT_AGGREGATE_DIR, AggregateState
+from subway_cache import DEFAULT_CACHE_PATH, PageCache
+from subway_cube import METRICS, as_cube
+from subway_fetch import BASE_URL, fetch_all_pages
+from subway_ingest import DEFAULT_DATA_DIR, ingest_months, load_month
+from subway_memo import StageCache
+from subway_names import canonical_column
+from subway_parquet import DEFAULT_DATASET_DIR, dataset_months, write_dataset
+from subway_profile import StageProfiler
+from subway_schema import PEAK_HOURS, to_compact_frame
+from subway_store import DEFAULT_STORE_DIR, RidershipStore
+from subway_stats import (MomentAccumulator, diff_z_interval, peak_accumulators,
+                          ttest, z_interval)
+from subway_topk import top_k_stations
+from subway_window import HourWindowIndex, sweep_windows
 warnings.filterwarnings('ignore')
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+# 시간대별 승하차 컬럼 (예: HR_4_GET_ON_NOPE)
+HOUR_COLUMN_PATTERN = re.compile(r'HR_(\d+)_GET_(ON|OFF)')
 
-def get_subway_data(service_key):
+def get_subway_data(service_key, date="202309", workers=4, rate=5.0, base_url=BASE_URL,
+                    cache_path=DEFAULT_CACHE_PATH):
     """Open API를 통해 지하철 시간대별 승하차 데이터 가져오기"""
-    base_url = "http://openapi.seoul.go.kr:8088"
-    all_data = []
-    
+    cache = None
     try:
-        # 2023년 9월 p데이터 조회 (최신 데이터가 있는 날짜로 설정)
-        date = "202309"
+        # 이미 받은 페이지는 디스크 캐시에서 읽음 (cache_path=None이면 캐시 사용 안 함)
+        if cache_path:
+            cache = PageCache(cache_path)
         
-        # 데이터를 청크 단위로 가져오기
-        start_index = 1
-        end_index = 1000
+        # 첫 페이지로 전체 건수를 확인한 뒤 나머지 페이지는 병렬로 조회
+        # (rate: 초당 최대 요청 수, 실패한 페이지는 백오프 후 재시도)
+        print(f"\n{date} 데이터 조회 중...")
+        all_data = fetch_all_pages(service_key, date, base_url=base_url,
+                                   workers=workers, rate=rate, cache=cache)
         
-        while True:
-            # API 요청 URL 구성 - 시간대별 승하차인원 API 사용
-            url = f"{base_url}/{service_key}/json/CardSubwayTime/{start_index}/{end_index}/{date}"
-            print(f"\n{date} 데이터 조회 중... (인덱스: {start_index}-{end_index})")
-            
-            response = requests.get(url)
-            print(f"응답 상태: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'CardSubwayTime' in data and 'row' in data['CardSubwayTime']:
-                    rows = data['CardSubwayTime']['row']
-                    total_count = data['CardSubwayTime'].get('list_total_count', 0)
-                    print(f"데이터 건수: {len(rows)}")
-                    all_data.extend(rows)
-                    
-                    if end_index >= total_count:
-                        break
-                        
-                    start_index = end_index + 1
-                    end_index = min(end_index + 1000, total_count)
-                    
-                elif 'RESULT' in data:
-                    print(f"{date}: {data['RESULT'].get('MESSAGE', '')}")
-                    break
-            else:
-                break
-            
-            time.sleep(0.5)  # API 호출 간격 조절
+        if all_data:
+            print(f"데이터 건수: {len(all_data)}")
+            return pd.DataFrame(all_data)
+        else:
+            print("\n조회 가능한 데이터를 찾지 못했습니다.")
+            return None
         
+    except Exception as e:
+        print(f"데이터 조회 중 오류 발생: {e}")
+        return None
+    finally:
+        if cache is not None:
+            cache.close()
+
+def collect_months(service_key, start_month, end_month, workers=4, rate=5.0,
+                   base_url=BASE_URL, data_dir=DEFAULT_DATA_DIR, cache_path=DEFAULT_CACHE_PATH, profiler=None):
+    """여러 달의 데이터를 체크포인트 저널에 저장하며 수집하고 저장이 끝난 달 목록 반환"""
+    cache = None
+    try:
+        if cache_path:
+            cache = PageCache(cache_path)
+        
+        # 이미 저장된 달은 건너뛰고, 중단된 달은 마지막으로 기록된 페이지부터 이어서 수집
+        return ingest_months(service_key, start_month, end_month, data_dir=data_dir,
+                             base_url=base_url, profiler=profiler, workers=workers, rate=rate, cache=cache)
+        
+    except Exception as e:
+        print(f"데이터 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        if cache is not None:
+            cache.close()
+
+def get_subway_data_range(service_key, start_month, end_month, workers=4, rate=5.0,
+                          base_url=BASE_URL, data_dir=DEFAULT_DATA_DIR, cache_path=DEFAULT_CACHE_PATH):
+    """여러 달의 데이터를 체크포인트 저널에 저장하며 수집 후 하나의 DataFrame으로 가져오기"""
+    try:
+        months = collect_months(service_key, start_month, end_month, workers, rate,
+                                base_url, data_dir, cache_path)
+        
+        all_data = [row for month in months for row in load_month(month, data_dir)]
         if all_data:
+            print(f"데이터 건수: {len(all_data)} ({len(months)}개월)")
             return pd.DataFrame(all_data)
         else:
             print("\n조회 가능한 데이터를 찾지 못했습니다.")
@@ -66,6 +91,75 @@ def get_subway_data(service_key):
         print(f"데이터 조회 중 오류 발생: {e}")
         return None
 
+def update_store(months, data_dir=DEFAULT_DATA_DIR, store_dir=DEFAULT_STORE_DIR, force=False,
+                 dataset_dir=DEFAULT_DATASET_DIR, aggregate_dir=DEFAULT_AGGREGATE_DIR, profiler=None):
+    """저장된 월별 원본 데이터를 전처리해 메모리 맵 저장소와 Parquet 데이터셋에 추가 (이미 들어 있는 달은 건너뜀)
+
+    한 번에 한 달씩만 메모리에 올리므로 기간이 길어도 최대 메모리는 한 달치 정도임
+    새로 저장한 달은 전체 기간 집계(aggregate_dir)에 변화분만 더함
+    (dataset_dir/aggregate_dir=None이면 Parquet 내보내기/집계를 하지 않음)
+    profiler(StageProfiler)가 주어지면 달마다 전처리 시간과 입력/출력 행 수를 기록
+    """
+    profiler = profiler or StageProfiler()
+    store = RidershipStore(store_dir)
+    aggregates = AggregateState(aggregate_dir) if aggregate_dir else None
+    try:
+        exported = set(dataset_months(dataset_dir)) if dataset_dir else set()
+        for month in months:
+            need_store = force or not store.has_month(month)
+            need_export = dataset_dir is not None and (force or month not in exported)
+            if not need_store and not need_export:
+                continue
+            rows = load_month(month, data_dir)
+            if not rows:
+                continue
+            print(f"\n{month} 데이터를 저장소에 추가하는 중...")
+            with profiler.stage(f"전처리 {month}", rows_in=len(rows)) as stage:
+                df = preprocess_data(pd.DataFrame(rows))
+                stage['rows'] = 0 if df is None else len(df)
+            if df is None:
+                continue
+            if need_store:
+                previous = np.array(store.month_array(month)) if store.has_month(month) else None
+                store.write_month(month, df)
+                if aggregates is not None:
+                    aggregates.fold(store, month, previous)
+            if need_export:
+                try:
+                    write_dataset(df, dataset_dir, month)
+                except ImportError as e:
+                    print(f"Parquet 내보내기를 건너뜁니다: {e}")
+                    dataset_dir = None
+        
+        if aggregates is not None:
+            # 집계를 저장하기 전에 중단된 실행이 남긴 달도 반영
+            for month in store.months:
+                if month not in aggregates.months:
+                    aggregates.fold(store, month)
+            aggregates.save()
+        return store
+        
+    except Exception as e:
+        print(f"저장소 갱신 중 오류 발생: {e}")
+        return None
+
+def parse_hour_columns(columns):
+    """HR_{시}_GET_ON/OFF_NOPE 컬럼 이름을 한 번만 해석해 (컬럼 위치, 시간 위치, 승하차 위치) 배열 생성"""
+    parsed = []
+    for position, col in enumerate(columns):
+        match = HOUR_COLUMN_PATTERN.match(col)
+        if match:
+            parsed.append((position, int(match.group(1)), 0 if match.group(2) == 'ON' else 1))
+    
+    # 기존 pivot_table 결과와 같은 순서('0시', '10시', '11시', ...)가 되도록 문자열 기준 정렬
+    hours = sorted({hour for _, hour, _ in parsed}, key=lambda hour: f"{hour}시")
+    hour_slot = {hour: slot for slot, hour in enumerate(hours)}
+    
+    col_pos = np.array([p for p, _, _ in parsed], dtype=np.intp)
+    hour_pos = np.array([hour_slot[h] for _, h, _ in parsed], dtype=np.intp)
+    type_pos = np.array([t for _, _, t in parsed], dtype=np.intp)
+    return hours, col_pos, hour_pos, type_pos
+
 def preprocess_data(df):
     """데이터 전처리"""
     try:
@@ -75,26 +169,33 @@ def preprocess_data(df):
         print("\n=== 원본 데이터 컬럼 ===")
         print(df.columns.tolist())
         
-        # 시간대별 데이터를 행으로 변환
-        df_melted = pd.melt(df, 
-                          id_vars=['USE_MM', 'SBWY_ROUT_LN_NM', 'STTN'],
-                          value_vars=[col for col in df.columns if 'GET_' in col],
-                          var_name='TIME_TYPE',
-                          value_name='PASSENGER_NUM')
-        
-        # 시간 추출 (HR_4_GET_ON_NOPE -> 4시)
-        df_melted['TIME'] = df_melted['TIME_TYPE'].str.extract(r'HR_(\d+)_').astype(str) + '시'
-        
-        # 승하차 구분
-        df_melted['TYPE'] = df_melted['TIME_TYPE'].apply(lambda x: '승차인원' if 'GET_ON' in x else '하차인원')
+        key_cols = ['SBWY_ROUT_LN_NM', 'STTN']
+        hours, col_pos, hour_pos, type_pos = parse_hour_columns(df.columns)
+        
+        # '서울역'/'서울', 괄호 표기처럼 표기만 다른 역 이름을 하나로 합침 (달마다 표기가 달라도 같은 역으로 집계)
+        df = df.assign(STTN=canonical_column(df['STTN']))
+        value_cols = df.columns[col_pos]
+        
+        # 같은 호선/역(표기만 달랐던 역 포함)이 여러 번 나오면 셀마다 합산 (모두 결측인 셀은 결측 유지)
+        numeric = df[list(value_cols)].apply(pd.to_numeric, errors='coerce')
+        wide = numeric.groupby([df[col] for col in key_cols], sort=True).sum(min_count=1)
+        values = wide.to_numpy(dtype=np.float64)
+        
+        # (역 수 × 24시간 × 승/하차) 블록으로 바로 배치
+        block = np.full((len(wide), len(hours), 2), np.nan)
+        block[:, hour_pos, type_pos] = values
+        
+        n_hours = len(hours)
+        df_processed = pd.DataFrame({
+            'SBWY_ROUT_LN_NM': np.repeat(wide.index.get_level_values(0).to_numpy(), n_hours),
+            'STTN': np.repeat(wide.index.get_level_values(1).to_numpy(), n_hours),
+            'TIME': np.tile(np.array([f"{hour}시" for hour in hours], dtype=object), len(wide)),
+            '승차인원': block[:, :, 0].ravel(),
+            '하차인원': block[:, :, 1].ravel()
+        })
         
-        # 피봇 테이블로 변환
-        df_processed = df_melted.pivot_table(
-            index=['SBWY_ROUT_LN_NM', 'STTN', 'TIME'],
-            columns='TYPE',
-            values='PASSENGER_NUM',
-            aggfunc='first'
-        ).reset_index()
+        # 승하차 값이 모두 없는 시간대는 제외 (pivot_table의 dropna와 동일)
+        df_processed = df_processed[~np.isnan(block).all(axis=2).ravel()].reset_index(drop=True)
         
         # 컬럼명 한글로 변경
         df_processed = df_processed.rename(columns={
@@ -103,10 +204,6 @@ def preprocess_data(df):
             'TIME': '시간'
         })
         
-        # 숫자형 데이터 변환
-        df_processed['승차인원'] = pd.to_numeric(df_processed['승차인원'], errors='coerce')
-        df_processed['하차인원'] = pd.to_numeric(df_processed['하차인원'], errors='coerce')
-        
         # 결측치 처리
         df_processed = df_processed.fillna(0)
         
@@ -117,6 +214,9 @@ def preprocess_data(df):
         seoul_lines = ['1호선', '2호선', '3호선', '4호선', '5호선', '6호선', '7호선', '8호선', '9호선']
         df_processed = df_processed[df_processed['호선'].isin(seoul_lines)]
         
+        # 작은 자료형으로 변환 (호선/역명 category, 시간 uint8, 인원 int32, 피크 여부 bool)
+        df_processed = to_compact_frame(df_processed)
+        
         print("\n=== 전처리 후 데이터 샘플 ===")
         print(df_processed.head())
         
@@ -126,22 +226,13 @@ def preprocess_data(df):
         print(f"데이터 전처리 중 오류 발생: {e}")
         return None
 
-def analyze_top_stations(df):
-    """호선별 상위 10개 역 분석"""
+def analyze_top_stations(df, k=10, metric='총이용객', hours=None):
+    """호선별 상위 k개 역 분석 (k, 기준 인원, 시간 범위 지정 가능)"""
     try:
-        # 호선별 역별 총 이용객 계산
-        station_stats = df.groupby(['호선', '역명']).agg({
-            '승차인원': 'sum',
-            '하차인원': 'sum',
-            '총이용객': 'sum'
-        }).reset_index()
-        
-        # 호선별로 상위 10개 역 선택
-        top_stations_by_line = {}
-        for line in station_stats['호선'].unique():
-            line_data = station_stats[station_stats['호선'] == line]
-            top_10 = line_data.nlargest(10, '총이용객')['역명'].tolist()
-            top_stations_by_line[line] = top_10
+        cube = as_cube(df)
+        
+        # 모든 호선의 상위 k개 역을 한 번에 선택
+        top_stations_by_line = top_k_stations(cube, k, metric, hours)
         
         return top_stations_by_line
         
@@ -149,182 +240,131 @@ def analyze_top_stations(df):
         print(f"상위 역 분석 중 오류 발생: {e}")
         return None
 
-def create_visualizations(df, top_stations_by_line):
-    """시각화 생성"""
+def analyze_top_stations_incremental(store, k=10, metric='총이용객', aggregate_dir=DEFAULT_AGGREGATE_DIR):
+    """미리 계산한 전체 기간 집계로 호선별 상위 역 분석 (새 달로 값이 바뀐 호선만 다시 계산)
+
+    반환값: (전체 기간 큐브, {호선: [역명, ...]})
+    """
+    try:
+        aggregates = AggregateState(aggregate_dir)
+        cube = aggregates.cube(store)
+        reports, refreshed = aggregates.line_reports(cube, k, metric)
+        aggregates.save()
+        
+        if refreshed:
+            print(f"다시 계산한 호선: {', '.join(refreshed)}")
+        else:
+            print("바뀐 호선이 없어 저장된 결과를 사용합니다.")
+        return cube, {line: report['top'] for line, report in reports.items()}
+        
+    except Exception as e:
+        print(f"상위 역 분석 중 오류 발생: {e}")
+        return None, None
+
+def analyze_commute_windows(df, metric='총이용객', top=5):
+    """가능한 모든 출퇴근 시간대(오전 구간 + 오후 구간)를 비교해 피크/비피크 차이가 큰 시간대 출력"""
+    print(f"\n=== 출퇴근 시간대 탐색 결과 ({metric}, 상위 {top}개) ===")
+    
+    try:
+        # (호선, 역, 승하차)별 누적합 색인으로 후보 시간대마다 O(1)로 합계 계산
+        index = HourWindowIndex(as_cube(df))
+        results = sweep_windows(index, metric, 'all', top)
+        
+        for rank, (_, row) in enumerate(results.iterrows(), 1):
+            print(f"\n{rank}. {row['시간대']}")
+            print(f"피크시간대 평균: {row['피크시간대 평균']:.2f}")
+            print(f"비피크시간대 평균: {row['비피크시간대 평균']:.2f}")
+            print(f"t-통계량: {row['t-통계량']:.4f}")
+        
+        return results
+        
+    except Exception as e:
+        print(f"출퇴근 시간대 탐색 중 오류 발생: {e}")
+        return None
+
+def create_visualizations(df, top_stations_by_line, output_dir='.', workers=None, force=False,
+                          profiler=None):
+    """시각화 생성 (데이터가 바뀐 호선만 병렬로 다시 그림)
+
+    profiler(StageProfiler)가 주어지면 다시 그린 그림 파일마다 시간을 기록
+    """
     print("\n시각화 생성 중...")
     
     # 서울 지하철 1~9호선만 처리
     seoul_lines = ['1호선', '2호선', '3호선', '4호선', '5호선', '6호선', '7호선', '8호선', '9호선']
     
-    # 시간 순서 정의
-    time_order = [f"{i}시" for i in range(24)]
+    # matplotlib/seaborn은 불러오는 데 오래 걸리므로 그림을 그릴 때만 불러옴
+    from subway_plot import chart_paths, render_charts
+    
+    cube = as_cube(df)
+    timings = {}
+    rendered, skipped = render_charts(cube, top_stations_by_line, seoul_lines,
+                                      output_dir, workers, force, timings)
+    if profiler is not None:
+        for path, (wall, cpu) in timings.items():
+            profiler.record(f"그림 {os.path.basename(path)}", wall, cpu)
     
     for line in seoul_lines:
-        if line not in top_stations_by_line:
+        if line not in rendered and line not in skipped:
             continue
-            
-        top_stations = top_stations_by_line[line]
-        line_data = df[df['호선'] == line]
         
-        if line_data.empty or not top_stations:
-            continue
-            
-        # 라인 그래프
-        plt.figure(figsize=(15, 10))
-        
-        # 승차 인원 그래프
-        plt.subplot(2, 1, 1)
-        for station in top_stations:
-            station_data = line_data[line_data['역명'] == station].copy()
-            station_data['시간순'] = pd.Categorical(station_data['시간'], categories=time_order, ordered=True)
-            station_data = station_data.sort_values('시간순')
-            plt.plot(station_data['시간'], station_data['승차인원'], label=station, marker='o')
-        
-        plt.title(f'{line} 상위 10개 역의 시간대별 승차 인원')
-        plt.xlabel('시간')
-        plt.ylabel('승차 인원')
-        plt.xticks(time_order, rotation=45)
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.grid(True)
-        
-        # 하차 인원 그래프
-        plt.subplot(2, 1, 2)
-        for station in top_stations:
-            station_data = line_data[line_data['역명'] == station].copy()
-            station_data['시간순'] = pd.Categorical(station_data['시간'], categories=time_order, ordered=True)
-            station_data = station_data.sort_values('시간순')
-            plt.plot(station_data['시간'], station_data['하차인원'], label=station, marker='o')
-        
-        plt.title(f'{line} 상위 10개 역의 시간대별 하차 인원')
-        plt.xlabel('시간')
-        plt.ylabel('하차 인원')
-        plt.xticks(time_order, rotation=45)
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.grid(True)
-        
-        plt.tight_layout()
-        plt.savefig(f'subway_time_stats_{line}.png', bbox_inches='tight')
-        plt.close()
-        
-        # 히트맵 생성
-        plt.figure(figsize=(15, 12))
-        
-        # 승차 히트맵
-        plt.subplot(2, 1, 1)
-        heatmap_data_on = []
-        for station in top_stations:
-            station_data = line_data[line_data['역명'] == station].copy()
-            station_data['시간순'] = pd.Categorical(station_data['시간'], categories=time_order, ordered=True)
-            station_data = station_data.sort_values('시간순')
-            heatmap_data_on.append(station_data['승차인원'].values)
-        
-        sns.heatmap(heatmap_data_on, 
-                   xticklabels=time_order,
-                   yticklabels=top_stations,
-                   cmap='YlOrRd',
-                   fmt='.0f',
-                   cbar_kws={'label': '승차 인원'})
-        
-        plt.title(f'{line} 상위 10개 역의 시간대별 승차 인원 히트맵')
-        plt.xlabel('시간')
-        plt.ylabel('역명')
-        
-        # 하차 히트맵
-        plt.subplot(2, 1, 2)
-        heatmap_data_off = []
-        for station in top_stations:
-            station_data = line_data[line_data['역명'] == station].copy()
-            station_data['시간순'] = pd.Categorical(station_data['시간'], categories=time_order, ordered=True)
-            station_data = station_data.sort_values('시간순')
-            heatmap_data_off.append(station_data['하차인원'].values)
-        
-        sns.heatmap(heatmap_data_off,
-                   xticklabels=time_order,
-                   yticklabels=top_stations,
-                   cmap='YlOrRd',
-                   fmt='.0f',
-                   cbar_kws={'label': '하차 인원'})
-        
-        plt.title(f'{line} 상위 10개 역의 시간대별 하차 인원 히트맵')
-        plt.xlabel('시간')
-        plt.ylabel('역명')
-        
-        plt.tight_layout()
-        plt.savefig(f'subway_time_heatmap_{line}.png', bbox_inches='tight')
-        plt.close()
-        
-        print(f'\n{line} 시간대별 시각화 파일이 생성되었습니다: subway_time_stats_{line}.png')
-        print(f'\n{line} 시간대별 히트맵 파일이 생성되었습니다: subway_time_heatmap_{line}.png')
-        
-        print(f'\n{line} 상위 10개 역:')
+        stats_path, heatmap_path = chart_paths(line, output_dir)
+        if line in rendered:
+            print(f'\n{line} 시간대별 시각화 파일이 생성되었습니다: {stats_path}')
+            print(f'\n{line} 시간대별 히트맵 파일이 생성되었습니다: {heatmap_path}')
+        else:
+            print(f'\n{line} 데이터가 바뀌지 않아 기존 파일을 사용합니다: {stats_path}, {heatmap_path}')
+        
+        top_stations = top_stations_by_line[line]
+        print(f'\n{line} 상위 {len(top_stations)}개 역:')
         for i, station in enumerate(top_stations, 1):
             print(f'{i}. {station}')
 
-def perform_hypothesis_testing(df):
-    """시간대별 승하차 인원에 대한 가설검정 수행"""
+def perform_hypothesis_testing(df, peak_hours=PEAK_HOURS):
+    """시간대별 승하차 인원에 대한 가설검정 수행 (peak_hours: 피크시간대로 볼 시간 목록)"""
     print("\n=== 가설검정 결과 (신뢰수준: 2시그마/95.45%) ===")
     
     try:
-        # 피크시간대 정의
-        morning_peak_hours = [str(i) + '시' for i in range(7, 10)]  # 오전 7-9시
-        evening_peak_hours = [str(i) + '시' for i in range(17, 20)]  # 오후 5-7시
-        peak_hours = morning_peak_hours + evening_peak_hours
-        
-        # 피크시간대와 비피크시간대 데이터 분리
-        peak_data = df[df['시간'].isin(peak_hours)]
-        non_peak_data = df[~df['시간'].isin(peak_hours)]
+        cube = as_cube(df)
         
         # 2시그마 신뢰수준을 위한 z값 (95.45%)
         z_critical = 2.0
         
-        # 1. 피크시간대와 비피크시간대 승차인원 비교
+        # 1. 피크시간대와 비피크시간대 승차인원 비교 (개수/합계/편차제곱합 누적기로 한 번에 집계)
         print("\n1. 피크시간대 vs 비피크시간대 승차인원 분석")
-        peak_mean = peak_data['승차인원'].mean()
-        non_peak_mean = non_peak_data['승차인원'].mean()
-        
-        # 표준오차 계산
-        peak_std = peak_data['승차인원'].std()
-        non_peak_std = non_peak_data['승차인원'].std()
-        peak_n = len(peak_data)
-        non_peak_n = len(non_peak_data)
-        
-        pooled_std = np.sqrt((peak_std**2/peak_n + non_peak_std**2/non_peak_n))
-        margin_of_error = z_critical * pooled_std
+        peak_on, non_peak_on = peak_accumulators(cube, '승차인원', peak_hours)
+        low, high = diff_z_interval(peak_on, non_peak_on, z_critical)
         
-        print(f"피크시간대 평균 승차인원: {peak_mean:.2f}")
-        print(f"비피크시간대 평균 승차인원: {non_peak_mean:.2f}")
-        print(f"차이의 95.45% 신뢰구간: [{abs(peak_mean - non_peak_mean) - margin_of_error:.2f}, "
-              f"{abs(peak_mean - non_peak_mean) + margin_of_error:.2f}]")
+        print(f"피크시간대 평균 승차인원: {peak_on.mean()[0]:.2f}")
+        print(f"비피크시간대 평균 승차인원: {non_peak_on.mean()[0]:.2f}")
+        print(f"차이의 95.45% 신뢰구간: [{low[0]:.2f}, {high[0]:.2f}]")
         
-        # 2. 호선별 평균 이용객수 분석
+        # 2. 호선별 평균 이용객수 분석 (호선별 피크/비피크 누적기를 합쳐 전체 시간대 통계 계산)
         print("\n2. 호선별 평균 이용객수 분석")
-        line_stats = df.groupby('호선')['총이용객'].agg(['mean', 'std', 'count']).reset_index()
-        
-        for _, row in line_stats.iterrows():
-            mean = row['mean']
-            std = row['std']
-            n = row['count']
-            se = std / np.sqrt(n)
-            ci = z_critical * se
-            print(f"\n{row['호선']}:")
-            print(f"평균 이용객: {mean:.2f}")
-            print(f"95.45% 신뢰구간: [{mean - ci:.2f}, {mean + ci:.2f}]")
+        line_peak, line_non_peak = peak_accumulators(cube, '총이용객', peak_hours, cube.lines)
+        line_stats = MomentAccumulator(len(cube.lines)).merge(line_peak).merge(line_non_peak)
+        low, high = z_interval(line_stats, z_critical)
+        
+        for i, line in enumerate(cube.lines):
+            print(f"\n{line}:")
+            print(f"평균 이용객: {line_stats.mean()[i]:.2f}")
+            print(f"95.45% 신뢰구간: [{low[i]:.2f}, {high[i]:.2f}]")
         
         # 3. 시간대별 승하차 비율 분석
         print("\n3. 시간대별 승하차 비율 분석")
-        df['승하차비율'] = df['승차인원'] / df['하차인원']
-        time_stats = df.groupby('시간')['승하차비율'].agg(['mean', 'std', 'count']).reset_index()
-        
-        for _, row in time_stats.iterrows():
-            if not np.isnan(row['mean']) and not np.isnan(row['std']):
-                mean = row['mean']
-                std = row['std']
-                n = row['count']
-                se = std / np.sqrt(n)
-                ci = z_critical * se
-                print(f"\n{row['시간']}:")
-                print(f"평균 승하차비율: {mean:.2f}")
-                print(f"95.45% 신뢰구간: [{mean - ci:.2f}, {mean + ci:.2f}]")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = cube.values[..., 0] / cube.values[..., 1]
+        hour_idx = np.nonzero(cube.observed)[2]
+        time_stats = MomentAccumulator(24).update(ratio[cube.observed], hour_idx)
+        means, stds = time_stats.mean(), time_stats.std()
+        low, high = z_interval(time_stats, z_critical)
+        
+        # 기존 groupby('시간')과 같은 순서('0시', '10시', ...)로 출력
+        for hour in sorted(range(24), key=lambda h: f"{h}시"):
+            if not np.isnan(means[hour]) and not np.isnan(stds[hour]):
+                print(f"\n{hour}시:")
+                print(f"평균 승하차비율: {means[hour]:.2f}")
+                print(f"95.45% 신뢰구간: [{low[hour]:.2f}, {high[hour]:.2f}]")
         
         return True
         
@@ -332,93 +372,130 @@ def perform_hypothesis_testing(df):
         print(f"가설검정 중 오류 발생: {e}")
         return False
 
-def main():
+def main(force=False, profile=False):
+    """force=True면 저장된 단계 결과와 그림을 쓰지 않고 모든 분석을 다시 계산
+
+    profile=True면 단계별 시간/메모리/행 수를 측정해 data/profiles에 JSON 보고서로 저장
+    """
     # API 키 설정
     service_key = "7a4b584f5a6c6565373672684c4a67"
     
+    # 조회할 기간 (YYYYMM, 시작월과 종료월 포함)
+    start_month = "202309"
+    end_month = "202309"
+    
+    # 호선별로 뽑을 상위 역 수
+    top_k = 10
+    
+    profiler = StageProfiler(enabled=profile)
     try:
         # 데이터 조회
         print("Open API에서 데이터를 조회하는 중...")
-        raw_data = get_subway_data(service_key)
+        with profiler.stage('데이터 조회') as stage:
+            months = collect_months(service_key, start_month, end_month, profiler=profiler)
+            stage['months'] = len(months)
         
-        if raw_data is None:
+        if not months:
             print("데이터를 가져오는데 실패했습니다.")
             return
             
-        # 데이터 전처리
+        # 입력 데이터와 코드가 그대로인 분석 단계는 저장된 결과를 사용
+        stages = StageCache()
+        
+        # 새로 받은 달만 전처리해 월별 저장소에 추가
         print("\n데이터 전처리 중...")
-        df = preprocess_data(raw_data)
+        with profiler.stage('저장소 갱신'):
+            store = update_store(months, profiler=profiler)
         
-        if df is None:
+        if store is None:
             print("데이터 전처리에 실패했습니다.")
             return
             
-        # 호선별 상위 10개 역 분석
-        print("\n호선별 상위 10개 역 분석 중...")
-        top_stations_by_line = analyze_top_stations(df)
+        # 호선별 상위 k개 역 분석
+        print(f"\n호선별 상위 {top_k}개 역 분석 중...")
+        with profiler.stage('상위 역 분석') as stage:
+            if sorted(months) == store.months:
+                # 저장소 전체 기간이면 미리 계산한 집계에서 큐브를 만들고 바뀐 호선만 다시 계산
+                cube, top_stations_by_line = analyze_top_stations_incremental(store, top_k)
+            else:
+                # 저장소에서 조회 기간의 합계로 호선 × 역 × 시간 × 승하차 큐브를 만들어 모든 분석에서 공유
+                cube = store.cube(months)
+                top_stations_by_line = stages.run(analyze_top_stations, cube, top_k, force=force)
+            if cube is not None:
+                stage['rows'] = int(cube.observed.sum())
         
         if top_stations_by_line is None:
             print("상위 역 분석에 실패했습니다.")
             return
             
+        # 피크/비피크 차이가 가장 큰 출퇴근 시간대 탐색
+        print("\n출퇴근 시간대 탐색 중...")
+        with profiler.stage('출퇴근 시간대 탐색', rows=int(cube.observed.sum())):
+            stages.run(analyze_commute_windows, cube, force=force)
+            
         # 가설검정 수행
         print("\n가설검정 수행 중...")
-        perform_hypothesis_testing(df)
+        with profiler.stage('가설검정', rows=int(cube.observed.sum())):
+            stages.run(perform_hypothesis_testing, cube, force=force)
             
         # 시각화 생성
         print("\n시각화 생성 중...")
-        create_visualizations(df, top_stations_by_line)
+        with profiler.stage('시각화'):
+            create_visualizations(cube, top_stations_by_line, force=force, profiler=profiler)
         
         print("\n분석이 완료되었습니다.")
         
     except Exception as e:
         print(f"Error: 분석 중 오류가 발생했습니다: {str(e)}")
+    finally:
+        try:
+            if profile:
+                profiler.print_summary()
+                print(f"\n실행 보고서 저장: {profiler.save('subway_analysis')}")
+        finally:
+            profiler.stop()
 
-def perform_hypothesis_testing(df):
-    """시간대별 승하차 인원에 대한 가설검정 수행"""
+def perform_hypothesis_testing(df, peak_hours=PEAK_HOURS):
+    """시간대별 승하차 인원에 대한 가설검정 수행 (peak_hours: 피크시간대로 볼 시간 목록)"""
     print("\n=== 가설검정 결과 ===")
     
     try:
-        from scipy import stats
-        
-        # 피크시간대 정의
-        morning_peak_hours = [str(i) + '시' for i in range(7, 10)]  # 오전 7-9시
-        evening_peak_hours = [str(i) + '시' for i in range(17, 20)]  # 오후 5-7시
-        peak_hours = morning_peak_hours + evening_peak_hours
+        cube = as_cube(df)
         
-        # 피크시간대와 비피크시간대 데이터 분리
-        peak_data = df[df['시간'].isin(peak_hours)]
-        non_peak_data = df[~df['시간'].isin(peak_hours)]
+        # 피크시간대와 비피크시간대 누적기 (승차인원/하차인원/총이용객별)
+        peak_data, non_peak_data = {}, {}
+        for metric in METRICS:
+            peak_data[metric], non_peak_data[metric] = peak_accumulators(cube, metric, peak_hours)
         
         # 1. 승차 인원에 대한 t-test
         print("\n1. 승차 인원 분석 (피크시간대 vs 비피크시간대)")
-        t_stat_on, p_value_on = stats.ttest_ind(peak_data['승차인원'], 
-                                               non_peak_data['승차인원'])
+        t_stat_on, p_value_on = ttest(peak_data['승차인원'], non_peak_data['승차인원'])
+        t_stat_on, p_value_on = t_stat_on[0], p_value_on[0]
         
         print(f"승차 인원 t-통계량: {t_stat_on:.4f}")
         print(f"승차 인원 p-value: {p_value_on:.4e}")
-        print(f"피크시간대 평균 승차인원: {peak_data['승차인원'].mean():.2f}")
-        print(f"비피크시간대 평균 승차인원: {non_peak_data['승차인원'].mean():.2f}")
+        print(f"피크시간대 평균 승차인원: {peak_data['승차인원'].mean()[0]:.2f}")
+        print(f"비피크시간대 평균 승차인원: {non_peak_data['승차인원'].mean()[0]:.2f}")
         
         # 2. 하차 인원에 대한 t-test
         print("\n2. 하차 인원 분석 (피크시간대 vs 비피크시간대)")
-        t_stat_off, p_value_off = stats.ttest_ind(peak_data['하차인원'], 
-                                                 non_peak_data['하차인원'])
+        t_stat_off, p_value_off = ttest(peak_data['하차인원'], non_peak_data['하차인원'])
+        t_stat_off, p_value_off = t_stat_off[0], p_value_off[0]
         
         print(f"하차 인원 t-통계량: {t_stat_off:.4f}")
         print(f"하차 인원 p-value: {p_value_off:.4e}")
-        print(f"피크시간대 평균 하차인원: {peak_data['하차인원'].mean():.2f}")
-        print(f"비피크시간대 평균 하차인원: {non_peak_data['하차인원'].mean():.2f}")
+        print(f"피크시간대 평균 하차인원: {peak_data['하차인원'].mean()[0]:.2f}")
+        print(f"비피크시간대 평균 하차인원: {non_peak_data['하차인원'].mean()[0]:.2f}")
         
         # 3. 총 이용객에 대한 t-test
         print("\n3. 총 이용객 분석 (피크시간대 vs 비피크시간대)")
-        t_stat_total, p_value_total = stats.ttest_ind(peak_data['총이용객'], 
-                                                     non_peak_data['총이용객'])
+        t_stat_total, p_value_total = ttest(peak_data['총이용객'], non_peak_data['총이용객'])
+        t_stat_total, p_value_total = t_stat_total[0], p_value_total[0]
         
         print(f"총 이용객 t-통계량: {t_stat_total:.4f}")
         print(f"총 이용객 p-value: {p_value_total:.4e}")
-        print(f"피크시간대 평균 총이용객: {peak_data['총이용객'].mean():.2f}")
-        print(f"비피크시간대 평균 총이용객: {non_peak_data['총이용객'].mean():.2f}")
+        print(f"피크시간대 평균 총이용객: {peak_data['총이용객'].mean()[0]:.2f}")
+        print(f"비피크시간대 평균 총이용객: {non_peak_data['총이용객'].mean()[0]:.2f}")
         
         # 가설검정 결과 해석
         alpha = 0.05
@@ -439,6 +516,6 @@ def perform_hypothesis_testing(df):
         print(f"가설검정 중 오류 발생: {e}")
         return False
 if __name__ == "__main__":
-    main()
+    main(force='--force' in sys.argv, profile='--profile' in sys.argv)
 
     
\ No newline at end of file
@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'api_pages.sqlite3')
+
+
+def is_closed_month(date):
+    """이미 끝난 달이면 True (데이터가 더 이상 바뀌지 않음)"""
+    return str(date)[:6] < datetime.now().strftime('%Y%m')
+
+
+class PageCache:
+    """Open API 응답 페이지를 (엔드포인트, 날짜, 인덱스 구간) 단위로 저장하는 디스크 캐시
+
+    - 지난 달 데이터는 바뀌지 않으므로 만료되지 않음
+    - 이번 달(또는 이후) 데이터는 ttl초가 지나면 만료
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 페이지부터 삭제(LRU)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=6 * 3600, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                endpoint TEXT, date TEXT, start_index INTEGER, end_index INTEGER,
+                total_count INTEGER, rows TEXT, size INTEGER,
+                stored_at REAL, accessed_at REAL,
+                PRIMARY KEY (endpoint, date, start_index, end_index)
+            )""")
+        self.conn.commit()
+
+    def is_closed_month(self, date):
+        return is_closed_month(date)
+
+    def get(self, endpoint, date, start_index, end_index):
+        """캐시된 (행 목록, 전체 건수) 반환, 없거나 만료되었으면 None"""
+        key = (endpoint, str(date), start_index, end_index)
+        with self.lock:
+            found = self.conn.execute(
+                "SELECT rows, total_count, stored_at FROM pages "
+                "WHERE endpoint=? AND date=? AND start_index=? AND end_index=?", key).fetchone()
+            if found is None:
+                return None
+            rows, total_count, stored_at = found
+            now = time.time()
+            if not self.is_closed_month(date) and now - stored_at > self.ttl:
+                self.conn.execute(
+                    "DELETE FROM pages WHERE endpoint=? AND date=? AND start_index=? AND end_index=?", key)
+                self.conn.commit()
+                return None
+            self.conn.execute(
+                "UPDATE pages SET accessed_at=? "
+                "WHERE endpoint=? AND date=? AND start_index=? AND end_index=?", (now,) + key)
+            self.conn.commit()
+        return json.loads(rows), total_count
+
+    def put(self, endpoint, date, start_index, end_index, rows, total_count):
+        """페이지 저장 후 용량 초과분 정리"""
+        text = json.dumps(rows, ensure_ascii=False)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, str(date), start_index, end_index, total_count,
+                 text, len(text.encode('utf-8')), now, now))
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 LRU 순서로 삭제"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = self.conn.execute(
+            "SELECT endpoint, date, start_index, end_index, size FROM pages ORDER BY accessed_at")
+        for endpoint, date, start_index, end_index, size in victims.fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute(
+                "DELETE FROM pages WHERE endpoint=? AND date=? AND start_index=? AND end_index=?",
+                (endpoint, date, start_index, end_index))
+            total -= size
+
+    def size(self):
+        """캐시 전체 크기(바이트)"""
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,515 @@
+import argparse
+import importlib.util
+import os
+import sys
+
+# 명령마다 필요한 라이브러리만 불러오도록 pandas, scipy, matplotlib, requests를 쓰는 모듈은
+# 각 명령 함수 안에서 import함 (예: top은 저장소에서 numpy만으로 큐브를 만들어 빠르게 시작)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+API_KEY_ENV = 'SEOUL_API_KEY'
+DEFAULT_CSV_PATH = os.path.join(SCRIPT_DIR, '서울시 지하철 호선별 역별 시간대별 승하차 인원 정보.csv')
+METRIC_CHOICES = ('승차인원', '하차인원', '총이용객')
+
+
+def parse_hours(text):
+    """'7-9,17-19' 또는 '7,8,18' 형태의 시간 목록을 [7, 8, 9, 17, 18, 19]로 변환 (범위 양 끝 포함)"""
+    hours = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+            hours.extend(range(start, end + 1))
+        else:
+            hours.append(int(part))
+    if not hours or any(hour < 0 or hour > 23 for hour in hours):
+        raise argparse.ArgumentTypeError(f"잘못된 시간 범위입니다: {text}")
+    return sorted(set(hours))
+
+
+def parse_lines(text):
+    """'2호선,7호선' -> ['2호선', '7호선'] (숫자만 쓰면 '호선'을 붙임)"""
+    lines = [line.strip() for line in text.split(',') if line.strip()]
+    return [f"{line}호선" if line.isdigit() else line for line in lines]
+
+
+def parse_month(text):
+    if len(text) != 6 or not text.isdigit() or not 1 <= int(text[4:]) <= 12:
+        raise argparse.ArgumentTypeError(f"달은 YYYYMM 형식이어야 합니다: {text}")
+    return text
+
+
+def selected_months(args):
+    """--start/--end로 고른 달 목록 (--start가 없으면 None = 저장된 전체 기간)"""
+    if args.start is None:
+        return None
+    from subway_ingest import month_range
+    return month_range(args.start, args.end or args.start)
+
+
+def peak_hours(args):
+    """--peak로 지정한 피크시간대 (없으면 PEAK_HOURS)"""
+    if args.peak is not None:
+        return args.peak
+    from subway_schema import PEAK_HOURS
+    return PEAK_HOURS
+
+
+def load_ttest_module():
+    """파일 이름에 '-'가 있어 import 문으로 불러올 수 없는 t-test.py 불러오기"""
+    spec = importlib.util.spec_from_file_location('t_test', os.path.join(SCRIPT_DIR, 't-test.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def store_paths(args):
+    """(저장소, Parquet 데이터셋, 전체 기간 집계) 위치
+
+    집계는 저장소의 역 번호를 기준으로 하므로 --store-dir만 주면 나머지 둘도 그 저장소 안에 둠
+    (다른 저장소의 달이 기본 위치의 집계/데이터셋에 섞이지 않게)
+    """
+    from subway_aggregate import DEFAULT_AGGREGATE_DIR
+    from subway_parquet import DEFAULT_DATASET_DIR
+    from subway_store import DEFAULT_STORE_DIR
+
+    if args.store_dir is None:
+        return (DEFAULT_STORE_DIR, args.dataset_dir or DEFAULT_DATASET_DIR,
+                args.aggregate_dir or DEFAULT_AGGREGATE_DIR)
+    return (args.store_dir, args.dataset_dir or os.path.join(args.store_dir, 'parquet'),
+            args.aggregate_dir or os.path.join(args.store_dir, 'aggregates'))
+
+
+def load_cube(args):
+    """명령 옵션에 맞는 큐브 (--csv면 CSV/Parquet 데이터셋, 아니면 월별 저장소), 실패하면 None"""
+    lines = args.lines
+    if args.csv:
+        from subway_cube import CongestionCube
+        df = load_ttest_module().get_processed_data_chunked(args.csv)
+        if df is None:
+            return None
+        if '월' in df and args.start is not None:
+            df = df[df['월'].astype(str).isin(selected_months(args))]
+        if lines:
+            df = df[df['호선'].isin(lines)]
+        if df.empty:
+            print("조건에 맞는 데이터가 없습니다.")
+            return None
+        return CongestionCube.from_frame(df)
+
+    from subway_store import RidershipStore
+    store = RidershipStore(args.store_dir) if args.store_dir else RidershipStore()
+    months = selected_months(args)
+    if not store.months:
+        print("저장소가 비어 있습니다. 먼저 fetch와 preprocess를 실행하세요.")
+        return None
+    missing = sorted(set(months or []) - set(store.months))
+    if missing:
+        print(f"저장소에 없는 달이 있습니다: {', '.join(missing)} (fetch/preprocess 먼저 실행)")
+        return None
+    unknown = sorted(set(lines or []) - set(store.lines))
+    if unknown:
+        print(f"저장소에 없는 호선입니다: {', '.join(unknown)}")
+        return None
+    return store.cube(months, lines)
+
+
+def command_fetch(args):
+    """Open API에서 달별 원본 데이터 수집"""
+    from subway_cache import DEFAULT_CACHE_PATH, PageCache
+    from subway_ingest import DEFAULT_DATA_DIR, ingest_months
+
+    service_key = args.key or os.environ.get(API_KEY_ENV)
+    if not service_key:
+        print(f"API 키가 필요합니다 (--key 또는 환경 변수 {API_KEY_ENV})")
+        return 1
+    cache = None if args.no_cache else PageCache(args.cache_path or DEFAULT_CACHE_PATH)
+    try:
+        months = ingest_months(service_key, args.start, args.end or args.start,
+                               data_dir=args.data_dir or DEFAULT_DATA_DIR,
+                               workers=args.workers, rate=args.rate, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"수집 완료: {len(months)}개월")
+    return 0 if months else 1
+
+
+def command_preprocess(args):
+    """수집한 원본(또는 --csv 파일)을 전처리해 저장소/Parquet 데이터셋에 저장"""
+    if args.csv:
+        df = load_ttest_module().get_processed_data_chunked(args.csv)
+        return 0 if df is not None else 1
+
+    from subway_analysis import update_store
+    from subway_ingest import DEFAULT_DATA_DIR, saved_months
+
+    data_dir = args.data_dir or DEFAULT_DATA_DIR
+    # --start가 없으면 수집이 끝난 모든 달 (저장소에 이미 있는 달은 --force일 때만 다시 전처리)
+    months = selected_months(args) or saved_months(data_dir)
+    if not months:
+        print(f"전처리할 원본 데이터가 없습니다: {data_dir} (fetch 먼저 실행)")
+        return 1
+    store_dir, dataset_dir, aggregate_dir = store_paths(args)
+    store = update_store(months, data_dir, store_dir, force=args.force,
+                         dataset_dir=dataset_dir, aggregate_dir=aggregate_dir)
+    if store is None:
+        return 1
+    print(f"저장소: {len(store.months)}개월 ({', '.join(store.months)})")
+    return 0
+
+
+def command_top(args):
+    """호선별 상위 역"""
+    from subway_topk import top_k_stations
+
+    cube = load_cube(args)
+    if cube is None:
+        return 1
+    top_stations_by_line = top_k_stations(cube, args.k, args.metric, args.hours)
+    for line in cube.lines:
+        print(f"\n{line} 상위 {args.k}개 역 ({args.metric}):")
+        for i, station in enumerate(top_stations_by_line[line], 1):
+            print(f"{i}. {station}")
+    return 0
+
+
+def command_ttest(args):
+    """피크/비피크 t-검정 (--resample이면 부트스트랩/순열 검정도 수행)"""
+    cube = load_cube(args)
+    if cube is None:
+        return 1
+    tt = load_ttest_module()
+    ok = tt.perform_ttest_analysis(cube, peak_hours(args))
+    if ok and args.resample:
+        ok = tt.perform_resampling_analysis(cube, args.resample, peak_hours=peak_hours(args))
+    return 0 if ok else 1
+
+
+def command_plot(args):
+    """호선별 상위 역의 시간대별 그래프와 히트맵 저장"""
+    from subway_analysis import create_visualizations
+    from subway_topk import top_k_stations
+
+    cube = load_cube(args)
+    if cube is None:
+        return 1
+    create_visualizations(cube, top_k_stations(cube, args.k), args.output_dir, force=args.force)
+    return 0
+
+
+def command_report(args):
+    """출퇴근 시간대 탐색과 승차/하차/총이용객 가설검정 보고서"""
+    from subway_analysis import analyze_commute_windows, perform_hypothesis_testing
+
+    cube = load_cube(args)
+    if cube is None:
+        return 1
+    if analyze_commute_windows(cube, args.metric) is None:
+        return 1
+    return 0 if perform_hypothesis_testing(cube, peak_hours(args)) else 1
+
+
+def command_load(args):
+    """역 순서 파일로 구간별 열차 내 인원(재차인원)을 추정해 가장 붐비는 구간 순위 출력"""
+    from subway_load import LineLoad, read_station_order
+
+    try:
+        order = read_station_order(args.order)
+    except (OSError, ValueError) as e:
+        print(f"역 순서 파일을 읽을 수 없습니다: {e}")
+        return 1
+    if args.lines:
+        order = {line: value for line, value in order.items() if line in args.lines}
+
+    if args.monthly:
+        if args.csv:
+            print("--monthly는 월별 저장소에서만 사용할 수 있습니다.")
+            return 1
+        from subway_store import RidershipStore
+        store = RidershipStore(args.store_dir) if args.store_dir else RidershipStore()
+        months = selected_months(args) or store.months
+        missing = sorted(set(months) - set(store.months))
+        if not store.months or missing:
+            print(f"저장소에 없는 달이 있습니다: {', '.join(missing or ['전체'])} (fetch/preprocess 먼저 실행)")
+            return 1
+        load = LineLoad.from_store(store, order, months)
+    else:
+        cube = load_cube(args)
+        if cube is None:
+            return 1
+        load = LineLoad.from_cube(cube, order)
+
+    if not load.lines:
+        print("역 순서 파일과 데이터에 함께 있는 호선이 없습니다.")
+        return 1
+    for line, names in load.missing.items():
+        print(f"{line}: 데이터에 없는 역 {len(names)}개 (인원 0으로 계산): {', '.join(names[:5])}")
+    for line, names in load.unordered.items():
+        print(f"{line}: 역 순서 파일에 없는 역 {len(names)}개 (제외): {', '.join(names[:5])}")
+
+    batches = [(None, load.load)] if load.labels is None else list(zip(load.labels, load.load))
+    for label, values in batches:
+        title = "가장 붐비는 구간" + (f" ({label})" if label else "")
+        print(f"\n{title} (재차인원 기준 상위 {args.k}개):")
+        for i, row in enumerate(load.rank(args.k, args.hours, values), 1):
+            print(f"{i}. {row['호선']} {row['구간']} ({row['방향']}, {row['시간']}): {row['재차인원']:,.0f}명")
+
+    if args.output:
+        load.to_frame().to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"\n구간별 재차인원 저장: {args.output}")
+    return 0
+
+
+def load_history(args):
+    """명령 옵션에 맞는 달별 이력 (달 목록, 호선 목록, 호선별 역 목록, (달, 호선, 역, 24, 2) 배열), 실패하면 None"""
+    if args.csv:
+        from subway_forecast import history_from_frame
+        df = load_ttest_module().get_processed_data_chunked(args.csv)
+        if df is None:
+            return None
+        if '월' not in df:
+            print("달별 예측에는 '월' 컬럼이 있는 데이터가 필요합니다.")
+            return None
+        if args.start is not None:
+            df = df[df['월'].astype(str).isin(selected_months(args))]
+        if args.lines:
+            df = df[df['호선'].isin(args.lines)]
+        if df.empty:
+            print("조건에 맞는 데이터가 없습니다.")
+            return None
+        return history_from_frame(df)
+
+    from subway_store import RidershipStore
+    store = RidershipStore(args.store_dir) if args.store_dir else RidershipStore()
+    months = selected_months(args) or store.months
+    missing = sorted(set(months) - set(store.months))
+    if not store.months or missing:
+        print(f"저장소에 없는 달이 있습니다: {', '.join(missing or ['전체'])} (fetch/preprocess 먼저 실행)")
+        return None
+    lines = args.lines or store.lines
+    unknown = sorted(set(lines) - set(store.lines))
+    if unknown:
+        print(f"저장소에 없는 호선입니다: {', '.join(unknown)}")
+        return None
+    stations = [store.meta['stations'][line] for line in lines]
+    return months, lines, stations, store.history(months, lines)
+
+
+def command_forecast(args):
+    """모든 역·시간대의 다음 달 승하차 인원을 추세 + 계절 회귀로 예측 (예측 구간 포함)"""
+    import numpy as np
+    from subway_cube import DIRECTIONS
+    from subway_forecast import SeasonalForecaster
+
+    history = load_history(args)
+    if history is None:
+        return 1
+    months, lines, stations, values = history
+    if len(months) < 3:
+        print(f"예측에는 3개월 이상의 데이터가 필요합니다 (현재 {len(months)}개월).")
+        return 1
+    model = SeasonalForecaster(args.harmonics).fit(values, months)
+    future, point, lower, upper = model.forecast(args.horizon, args.level)
+    print(f"{months[0]}~{months[-1]} {len(months)}개월로 적합 (계절 항 {model.n_harmonics}개), "
+          f"{len(lines)}개 호선 {sum(len(names) for names in stations)}개 역")
+
+    last = np.nansum(values[-1], axis=(-3, -2, -1))
+    for f, month in enumerate(future):
+        print(f"\n{month} 예측 (호선별 승하차 합계):")
+        totals = np.nansum(point[f], axis=(-3, -2, -1))
+        for i, line in enumerate(lines):
+            change = f"{totals[i] / last[i] - 1:+.1%}" if last[i] else "-"
+            print(f"  {line}: {totals[i]:,.0f}명 ({months[-1]} 대비 {change})")
+
+        station_totals = np.nansum(point[f], axis=(-2, -1))
+        best = np.argsort(-station_totals, axis=None, kind='stable')[:args.k]
+        print(f"  예측 이용객 상위 {args.k}개 역:")
+        for rank, flat in enumerate(best, 1):
+            i, j = np.unravel_index(flat, station_totals.shape)
+            if j >= len(stations[i]) or not station_totals[i, j]:
+                break
+            print(f"  {rank}. {lines[i]} {stations[i][j]}: {station_totals[i, j]:,.0f}명")
+
+    if args.output:
+        import pandas as pd
+        frames = []
+        for f, month in enumerate(future):
+            for i, line in enumerate(lines):
+                n = len(stations[i])
+                index = pd.MultiIndex.from_product([stations[i], range(24)], names=['역명', '시간'])
+                frame = pd.DataFrame({'월': month, '호선': line}, index=index)
+                for d, column in enumerate(DIRECTIONS):
+                    frame[column] = point[f, i, :n, :, d].ravel()
+                    frame[f"{column}_하한"] = lower[f, i, :n, :, d].ravel()
+                    frame[f"{column}_상한"] = upper[f, i, :n, :, d].ravel()
+                frames.append(frame.reset_index()[['월', '호선', '역명', '시간'] + list(frame.columns[2:])]
+                              .dropna(subset=list(DIRECTIONS), how='all'))
+        pd.concat(frames, ignore_index=True).to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"\n역·시간대별 예측과 {args.level:.0%} 예측 구간 저장: {args.output}")
+    return 0
+
+
+def command_backtest(args):
+    """지난 달들을 한 달씩 가려 예측해 보고 오차(WAPE)와 구간 적중률을 단순 계절 예측과 비교"""
+    import numpy as np
+    from subway_forecast import backtest
+
+    history = load_history(args)
+    if history is None:
+        return 1
+    months, lines, stations, values = history
+    if len(months) < args.min_train + args.horizon:
+        print(f"백테스트에는 {args.min_train + args.horizon}개월 이상의 데이터가 필요합니다 (현재 {len(months)}개월).")
+        return 1
+    results = backtest(values, months, args.horizon, args.min_train, args.level, args.harmonics)
+    print("학습 끝   예측 달       WAPE 계절 단순   역 합계 구간 적중")
+    def percent(value):
+        return '-' if np.isnan(value) else f"{value:.1%}"
+
+    for row in results:
+        print(f"{row['train_end']:<10}{row['target']:<10}{percent(row['wape']):>8}{percent(row['naive_wape']):>10}"
+              f"{percent(row['station_wape']):>10}{percent(row['coverage']):>10}")
+    mean = {}
+    for key in ('wape', 'naive_wape', 'station_wape', 'coverage'):
+        scores = np.array([row[key] for row in results], dtype=np.float64)
+        mean[key] = scores[~np.isnan(scores)].mean() if not np.isnan(scores).all() else np.nan
+    print(f"\n평균 WAPE {percent(mean['wape'])} (계절 단순 예측 {percent(mean['naive_wape'])}), "
+          f"역 하루 합계 WAPE {percent(mean['station_wape'])}, {args.level:.0%} 구간 적중률 {percent(mean['coverage'])}")
+    return 0
+
+
+def command_serve(args):
+    """처리된 데이터를 한 번 읽어 혼잡도 질의 HTTP 서비스 실행 (/point, /window, /top, /stats)"""
+    import asyncio
+    from subway_server import CongestionIndex, serve
+
+    cube = load_cube(args)
+    if cube is None:
+        return 1
+    index = CongestionIndex(cube)
+    print(f"색인 생성: {len(cube.lines)}개 호선, {int(cube.station_counts.sum())}개 역 "
+          f"({index.nbytes / 1024 / 1024:.1f}MB)")
+
+    def ready(host, port):
+        print(f"http://{host}:{port}/ 에서 질의를 기다립니다 (Ctrl+C로 종료)", flush=True)
+
+    try:
+        asyncio.run(serve(index, args.host, args.port, args.cache_size, ready))
+    except KeyboardInterrupt:
+        print("\n서비스를 종료합니다.")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='subway_cli.py', description='서울 지하철 시간대별 승하차 인원 분석')
+    parser.add_argument('--profile', action='store_true',
+                        help='실행 시간/메모리를 측정해 data/profiles에 JSON 보고서로 저장')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    period = argparse.ArgumentParser(add_help=False)
+    period.add_argument('--start', type=parse_month, help='시작 달 (YYYYMM)')
+    period.add_argument('--end', type=parse_month, help='끝 달 (YYYYMM, 기본값: 시작 달)')
+    period.add_argument('--data-dir', help='수집한 원본 저장 위치')
+    period.add_argument('--store-dir', help='월별 저장소 위치')
+
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument('--csv', nargs='?', const=DEFAULT_CSV_PATH,
+                        help='저장소 대신 호선별 역별 시간대별 CSV 사용 (경로 생략 시 기본 파일)')
+    source.add_argument('--lines', type=parse_lines, help='분석할 호선 (예: 2호선,7호선 또는 2,7)')
+
+    peak = argparse.ArgumentParser(add_help=False)
+    peak.add_argument('--peak', type=parse_hours, help='피크시간대 (예: 7-9,17-19, 기본값: 7-9,17-19)')
+
+    fetch = commands.add_parser('fetch', parents=[period], help=command_fetch.__doc__)
+    fetch.add_argument('--key', help=f'Open API 키 (기본값: 환경 변수 {API_KEY_ENV})')
+    fetch.add_argument('--workers', type=int, default=4, help='동시 요청 수')
+    fetch.add_argument('--rate', type=float, default=5.0, help='초당 최대 요청 수')
+    fetch.add_argument('--cache-path', help='API 페이지 캐시 파일')
+    fetch.add_argument('--no-cache', action='store_true', help='API 페이지 캐시를 사용하지 않음')
+    fetch.set_defaults(func=command_fetch)
+
+    preprocess = commands.add_parser('preprocess', parents=[period], help=command_preprocess.__doc__)
+    preprocess.add_argument('--csv', nargs='?', const=DEFAULT_CSV_PATH, help='CSV 파일을 Parquet 데이터셋으로 전처리')
+    preprocess.add_argument('--force', action='store_true', help='이미 저장된 달도 다시 전처리')
+    preprocess.add_argument('--dataset-dir', help='Parquet 데이터셋 위치 (기본값: --store-dir 안의 parquet)')
+    preprocess.add_argument('--aggregate-dir', help='전체 기간 집계 위치 (기본값: --store-dir 안의 aggregates)')
+    preprocess.set_defaults(func=command_preprocess)
+
+    top = commands.add_parser('top', parents=[period, source], help=command_top.__doc__)
+    top.add_argument('-k', type=int, default=10, help='호선별 역 수')
+    top.add_argument('--metric', choices=METRIC_CHOICES, default='총이용객')
+    top.add_argument('--hours', type=parse_hours, help='이 시간대의 인원만 합산 (예: 7-9)')
+    top.set_defaults(func=command_top)
+
+    ttest = commands.add_parser('ttest', parents=[period, source, peak], help=command_ttest.__doc__)
+    ttest.add_argument('--resample', type=int, nargs='?', const=10000, default=0,
+                       help='부트스트랩/순열 검정 반복 횟수 (값 생략 시 10000)')
+    ttest.set_defaults(func=command_ttest)
+
+    plot = commands.add_parser('plot', parents=[period, source], help=command_plot.__doc__)
+    plot.add_argument('-k', type=int, default=10, help='그림에 넣을 호선별 역 수')
+    plot.add_argument('--output-dir', default='.', help='그림 저장 위치')
+    plot.add_argument('--force', action='store_true', help='바뀌지 않은 호선도 다시 그림')
+    plot.set_defaults(func=command_plot)
+
+    report = commands.add_parser('report', parents=[period, source, peak], help=command_report.__doc__)
+    report.add_argument('--metric', choices=METRIC_CHOICES, default='총이용객', help='출퇴근 시간대 탐색 기준')
+    report.set_defaults(func=command_report)
+
+    load = commands.add_parser('load', parents=[period, source], help=command_load.__doc__)
+    load.add_argument('--order', required=True, help='역 순서 CSV (호선, 순번, 역명[, 순환])')
+    load.add_argument('-k', type=int, default=10, help='출력할 구간 수')
+    load.add_argument('--hours', type=parse_hours, help='이 시간대의 시간당 평균으로 순위 (기본값: 구간별 최대 시간)')
+    load.add_argument('--monthly', action='store_true', help='저장소의 달마다 따로 추정 (백필)')
+    load.add_argument('--output', help='구간 × 시간 × 방향별 재차인원을 저장할 CSV 경로')
+    load.set_defaults(func=command_load)
+
+    model = argparse.ArgumentParser(add_help=False)
+    model.add_argument('--horizon', type=int, default=1, help='몇 달 뒤까지 예측할지')
+    model.add_argument('--level', type=float, default=0.9, help='예측 구간 신뢰수준')
+    model.add_argument('--harmonics', type=int, help='12개월 주기 계절 항 수 (기본값: 데이터 길이에 맞춰 최대 2)')
+
+    forecast = commands.add_parser('forecast', parents=[period, source, model], help=command_forecast.__doc__)
+    forecast.add_argument('-k', type=int, default=10, help='출력할 역 수')
+    forecast.add_argument('--output', help='역 × 시간대별 예측값과 구간을 저장할 CSV 경로')
+    forecast.set_defaults(func=command_forecast)
+
+    backtest = commands.add_parser('backtest', parents=[period, source, model], help=command_backtest.__doc__)
+    backtest.add_argument('--min-train', type=int, default=12, help='첫 예측에 쓸 학습 달 수')
+    backtest.set_defaults(func=command_backtest)
+
+    serve = commands.add_parser('serve', parents=[period, source], help=command_serve.__doc__)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8050, help='0이면 빈 포트를 골라 사용')
+    serve.add_argument('--cache-size', type=int, default=4096, help='질의 결과 LRU 캐시 항목 수 (0이면 사용 안 함)')
+    serve.set_defaults(func=command_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'fetch' and args.start is None:
+        print("fetch에는 --start가 필요합니다.")
+        return 2
+
+    if not args.profile:
+        return args.func(args)
+
+    from subway_profile import StageProfiler
+    profiler = StageProfiler(enabled=True)
+    try:
+        with profiler.stage(args.command):
+            code = args.func(args)
+        profiler.print_summary()
+        print(f"\n실행 보고서 저장: {profiler.save(f'subway_cli-{args.command}')}")
+    finally:
+        profiler.stop()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import codecs
+import re
+
+import numpy as np
+import pandas as pd
+
+from subway_names import canonical_column
+from subway_schema import to_compact_frame
+
+ENCODINGS = ['utf-8', 'cp949', 'euc-kr']
+BASE_COLS = ['호선명', '지하철역']
+KEY_COLS = ['호선', '역명', '시간']
+MONTH_COL = '사용월'
+SEOUL_LINES = [str(i) + '호선' for i in range(1, 10)]
+
+# 시간대별 승하차 컬럼 (예: "04시-05시 승차인원")
+TIME_COLUMN_PATTERN = re.compile(r'(\d+)시-.*(승차|하차)')
+
+
+def detect_encoding(file_path, sample_size=64 * 1024):
+    """파일 앞부분(sample_size 바이트)만 읽어 인코딩 판별
+
+    헤더에 한글 컬럼명이 있으므로 앞부분만으로 utf-8/cp949를 구분할 수 있음
+    """
+    with open(file_path, 'rb') as f:
+        prefix = f.read(sample_size)
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODINGS:
+        try:
+            # final=False: 잘린 마지막 멀티바이트 문자는 오류로 보지 않음
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("적절한 인코딩을 찾을 수 없습니다.")
+
+
+def parse_time_columns(columns):
+    """승차/하차 컬럼 이름을 한 번만 해석해 (시간 표기 목록, 승차 컬럼 목록, 하차 컬럼 목록) 생성
+
+    시간 표기는 기존 전처리와 같은 '04시' 형태이고, 승차·하차가 모두 있는 시간만 사용
+    """
+    ride, alight = {}, {}
+    for col in columns:
+        match = TIME_COLUMN_PATTERN.search(col)
+        if match:
+            (ride if match.group(2) == '승차' else alight)[match.group(1) + '시'] = col
+    hours = [hour for hour in ride if hour in alight]
+    return hours, [ride[hour] for hour in hours], [alight[hour] for hour in hours]
+
+
+def to_counts(values):
+    """인원 컬럼을 숫자로 변환 ('-', 빈칸 같은 숫자가 아닌 값은 NaN, 천 단위 쉼표 허용)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values.astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+
+def reshape_chunk(chunk, hours, ride_cols, alight_cols):
+    """넓은 형태 청크를 (호선, 역명, 시간, 승차인원, 하차인원, 총이용객) 긴 형태로 변환
+
+    승차/하차를 따로 melt한 뒤 merge하던 방식과 같은 결과를 배열 재배치로 만듦
+    (행 순서도 기존과 같이 시간 → 원본 행 순, 역 이름은 대표 표기로 바꿈)
+    """
+    n_rows, n_hours = len(chunk), len(hours)
+    ride = chunk[ride_cols].apply(to_counts).to_numpy(dtype=np.float64)
+    alight = chunk[alight_cols].apply(to_counts).to_numpy(dtype=np.float64)
+
+    df_processed = pd.DataFrame({
+        '호선': np.tile(chunk['호선명'].to_numpy(dtype=object), n_hours),
+        '역명': np.tile(canonical_column(chunk['지하철역']), n_hours),
+        '시간': np.repeat(np.array(hours, dtype=object), n_rows),
+        '승차인원': np.nan_to_num(ride.T.ravel(), nan=0.0),
+        '하차인원': np.nan_to_num(alight.T.ravel(), nan=0.0)
+    })
+    df_processed['총이용객'] = df_processed['승차인원'] + df_processed['하차인원']
+    if MONTH_COL in chunk:
+        # 사용월 컬럼을 함께 읽은 경우 달별로 나눌 수 있게 '월'로 유지
+        df_processed.insert(0, '월', np.tile(chunk[MONTH_COL].astype(str).to_numpy(dtype=object), n_hours))
+
+    # 서울 지하철 1~9호선만 필터링
+    return df_processed[df_processed['호선'].isin(SEOUL_LINES)]
+
+
+def read_processed_chunks(file_path, chunksize=100000, encoding=None, by_month=False):
+    """CSV를 chunksize 행씩 읽어 전처리된 긴 형태 청크를 하나씩 반환하는 제너레이터
+
+    by_month=True면 사용월 컬럼도 읽어 '월' 컬럼으로 붙임 (파일에 사용월이 있을 때만)
+    """
+    encoding = encoding or detect_encoding(file_path)
+    header = pd.read_csv(file_path, encoding=encoding, nrows=0).columns
+    hours, ride_cols, alight_cols = parse_time_columns(header)
+    base_cols = BASE_COLS + ([MONTH_COL] if by_month and MONTH_COL in header else [])
+
+    # 필요한 컬럼만 읽음 (인원 수는 천 단위 쉼표 허용)
+    # 인원 컬럼은 자료형을 강제하지 않음: '-'처럼 숫자가 아닌 값이 있는 컬럼만 문자열로 읽히고 reshape_chunk에서 NaN 처리
+    dtype = {col: 'str' for col in base_cols}
+    reader = pd.read_csv(file_path, encoding=encoding, usecols=base_cols + ride_cols + alight_cols,
+                         dtype=dtype, thousands=',', chunksize=chunksize)
+    for chunk in reader:
+        yield reshape_chunk(chunk, hours, ride_cols, alight_cols)
+
+
+def _combine(frames):
+    """(호선, 역명, 시간)별 (월 컬럼이 있으면 월별) 승하차 인원 합계로 줄이기"""
+    combined = pd.concat(frames, ignore_index=True)
+    keys = (['월'] if '월' in combined else []) + KEY_COLS
+    return combined.groupby(keys, sort=False, as_index=False)[['승차인원', '하차인원']].sum()
+
+
+def load_processed(file_path, chunksize=100000, encoding=None, by_month=False):
+    """청크 단위로 읽으면서 (호선, 역명, 시간)별 합계로 바로 줄여 전처리 결과 생성
+
+    중간 결과는 역 수 × 시간 수 정도로만 유지되므로 최대 메모리는 파일 크기가 아니라
+    chunksize에 비례함 (여러 달이 들어 있으면 달별 인원이 합산되고, by_month=True면 달별로 따로 유지)
+    """
+    partial = []
+    for processed in read_processed_chunks(file_path, chunksize, encoding, by_month):
+        partial.append(_combine([processed]))
+        if len(partial) >= 8:
+            partial = [_combine(partial)]
+    if not partial:
+        return to_compact_frame(pd.DataFrame(columns=KEY_COLS + ['승차인원', '하차인원', '총이용객']))
+
+    df_processed = _combine(partial)
+    df_processed['총이용객'] = df_processed['승차인원'] + df_processed['하차인원']
+    return to_compact_frame(df_processed)
@@ -0,0 +1,149 @@
+import numpy as np
+
+# pandas는 데이터프레임을 다루는 함수 안에서만 불러옴
+# (저장소에서 바로 큐브를 만드는 명령은 pandas 없이 빨리 시작)
+
+HOURS = 24
+DIRECTIONS = ('승차인원', '하차인원')
+METRICS = ('승차인원', '하차인원', '총이용객')
+
+
+def parse_hours(values):
+    """'7시', '07시', 7 같은 시간 표기를 정수 배열로 변환"""
+    import pandas as pd
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.intp)
+    # 서로 다른 표기는 많아야 수십 개이므로 고유값만 해석한 뒤 코드로 펼침
+    codes, uniques = pd.factorize(values.astype(str))
+    parsed = pd.Series(uniques).str.extract(r'(\d+)')[0].astype(int).to_numpy(dtype=np.intp)
+    return parsed[codes]
+
+
+class CongestionCube:
+    """호선 × 역 × 시간(0~23시) × 승하차 인원을 담는 밀집 배열
+
+    values[호선 번호, 역 번호, 시간, 0=승차/1=하차] 형태로 저장하고,
+    역 번호는 호선마다 0부터 매김 (역 수가 적은 호선은 뒤쪽이 0으로 채워짐)
+    """
+
+    def __init__(self, values, lines, stations, observed=None):
+        self.values = values
+        self.lines = list(lines)
+        self.stations = [list(names) for names in stations]
+        self.line_index = {line: i for i, line in enumerate(self.lines)}
+        self.station_index = [{name: j for j, name in enumerate(names)} for names in self.stations]
+        self.station_counts = np.array([len(names) for names in self.stations], dtype=np.intp)
+        # 원본 데이터에 실제로 있던 (호선, 역, 시간) 칸 표시 (검정에서 표본을 원본 행과 똑같이 맞추기 위함)
+        if observed is None:
+            observed = np.zeros(values.shape[:3], dtype=bool)
+            for i, count in enumerate(self.station_counts):
+                observed[i, :count] = True
+        self.observed = observed
+
+    @classmethod
+    def from_frame(cls, df):
+        """전처리된 (호선, 역명, 시간, 승차인원, 하차인원) 데이터프레임으로 큐브 생성"""
+        import pandas as pd
+        line_codes, lines = pd.factorize(df['호선'], sort=True)
+        pair_codes, pairs = pd.factorize(
+            pd.MultiIndex.from_arrays([line_codes, df['역명'].to_numpy()]), sort=True)
+        pair_lines = pairs.get_level_values(0).to_numpy()
+        pair_names = pairs.get_level_values(1).to_numpy()
+
+        # 호선 안에서의 역 번호 = 정렬된 (호선, 역) 목록에서 해당 호선 시작 위치와의 거리
+        line_starts = np.searchsorted(pair_lines, np.arange(len(lines)))
+        station_slots = np.arange(len(pairs)) - line_starts[pair_lines]
+        counts = np.bincount(pair_lines, minlength=len(lines))
+        stations = [pair_names[start:start + count] for start, count in zip(line_starts, counts)]
+
+        shape = (len(lines), int(counts.max()) if len(counts) else 0, HOURS)
+        flat = np.ravel_multi_index((line_codes, station_slots[pair_codes], parse_hours(df['시간'])), shape)
+        size = int(np.prod(shape))
+
+        # 같은 칸이 여러 번 나오면(여러 달) 합산
+        values = np.empty(shape + (2,), dtype=np.float64)
+        for d, column in enumerate(DIRECTIONS):
+            weights = pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+            values[..., d] = np.bincount(flat, weights=weights, minlength=size).reshape(shape)
+        observed = np.bincount(flat, minlength=size).reshape(shape) > 0
+        return cls(values, lines, stations, observed)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.observed.nbytes
+
+    def metric(self, metric='총이용객'):
+        """승차인원/하차인원/총이용객 중 하나를 (호선, 역, 시간) 배열로 반환"""
+        if metric == '총이용객':
+            return self.values.sum(axis=3)
+        return self.values[..., DIRECTIONS.index(metric)]
+
+    def line(self, line):
+        """한 호선의 (역, 시간, 승하차) 배열"""
+        i = self.line_index[line]
+        return self.values[i, :self.station_counts[i]]
+
+    def station(self, line, station):
+        """한 역의 (시간, 승하차) 배열"""
+        i = self.line_index[line]
+        return self.values[i, self.station_index[i][station]]
+
+    def get(self, line, station, hour, metric='총이용객'):
+        """(호선, 역, 시간) 한 칸의 인원"""
+        cell = self.station(line, station)[hour]
+        return cell.sum() if metric == '총이용객' else cell[DIRECTIONS.index(metric)]
+
+    def sum(self, by='station', metric='총이용객', hours=None):
+        """시간 범위(hours) 안의 인원 합계 (by: 'station'=(호선, 역), 'line'=호선, 'hour'=(호선, 시간))"""
+        data = self.metric(metric)
+        if by == 'hour':
+            return data.sum(axis=1)
+        if hours is not None:
+            data = data[:, :, list(hours)]
+        totals = data.sum(axis=2)
+        return totals.sum(axis=1) if by == 'line' else totals
+
+    def top_k(self, line, k=10, metric='총이용객', hours=None):
+        """한 호선에서 인원이 많은 상위 k개 역 이름 (동률이면 역 이름 순)"""
+        i = self.line_index[line]
+        totals = self.sum('station', metric, hours)[i, :self.station_counts[i]]
+        order = np.argsort(-totals, kind='stable')[:k]
+        return [self.stations[i][j] for j in order]
+
+    def samples(self, metric='총이용객', hours=None, exclude_hours=False, line=None):
+        """원본 데이터에 있던 칸의 값을 1차원 표본으로 반환
+
+        hours가 주어지면 그 시간만 (exclude_hours=True면 그 시간을 뺀 나머지만) 선택
+        """
+        mask = self.observed
+        if hours is not None:
+            selected = np.zeros(HOURS, dtype=bool)
+            selected[list(hours)] = True
+            mask = mask & (~selected if exclude_hours else selected)
+        data = self.metric(metric)
+        if line is not None:
+            i = self.line_index[line]
+            return data[i][mask[i]]
+        return data[mask]
+
+    def to_frame(self):
+        """(호선, 역명, 시간, 승차인원, 하차인원, 총이용객) 형태의 긴 데이터프레임으로 변환"""
+        import pandas as pd
+        line_idx, station_idx, hour_idx = np.nonzero(self.observed)
+        values = self.values[line_idx, station_idx, hour_idx]
+        return pd.DataFrame({
+            '호선': np.array(self.lines, dtype=object)[line_idx],
+            '역명': [self.stations[i][j] for i, j in zip(line_idx, station_idx)],
+            '시간': [f"{h}시" for h in hour_idx],
+            '승차인원': values[:, 0],
+            '하차인원': values[:, 1],
+            '총이용객': values.sum(axis=1)
+        })
+
+
+def as_cube(data):
+    """데이터프레임이 들어오면 큐브로 변환 (이미 큐브면 그대로 반환)"""
+    if isinstance(data, CongestionCube):
+        return data
+    return CongestionCube.from_frame(data)
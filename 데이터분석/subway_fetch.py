@@ -0,0 +1,167 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# requests는 실제로 요청을 보낼 때만 불러옴 (저장된 데이터만 쓰는 명령의 시작 시간 단축)
+
+BASE_URL = "http://openapi.seoul.go.kr:8088"
+PAGE_SIZE = 1000
+
+
+class PageFetchError(Exception):
+    """재시도 후에도 페이지를 가져오지 못했을 때 발생하는 예외"""
+
+
+class TokenBucket:
+    """초당 요청 수를 제한하는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def page_ranges(total_count, page_size=PAGE_SIZE):
+    """전체 건수를 (시작, 끝) 인덱스 구간 목록으로 분할 (API 인덱스는 1부터 시작)"""
+    return [(start, min(start + page_size - 1, total_count))
+            for start in range(1, total_count + 1, page_size)]
+
+
+def build_url(base_url, service_key, endpoint, start_index, end_index, date):
+    """Open API 요청 URL 구성"""
+    return f"{base_url}/{service_key}/json/{endpoint}/{start_index}/{end_index}/{date}"
+
+
+def parse_page(data, endpoint):
+    """응답 JSON에서 (행 목록, 전체 건수) 추출, 데이터 없음(INFO-200)이면 None"""
+    body = data.get(endpoint)
+    if body is not None and 'row' in body:
+        return body['row'], int(body.get('list_total_count', 0))
+
+    result = data.get('RESULT') or (body or {}).get('RESULT') or {}
+    if result.get('CODE') == 'INFO-200':
+        return None
+    raise PageFetchError(f"{result.get('CODE', '')} {result.get('MESSAGE', '')}".strip()
+                         or "응답에 데이터가 없습니다")
+
+
+def fetch_page(session, url, endpoint, bucket=None, retries=3, backoff=0.5, timeout=10):
+    """페이지 하나를 가져오기 (실패 시 지수 백오프로 재시도)"""
+    import requests
+    last_error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            response = session.get(url, timeout=timeout)
+            if response.status_code != 200:
+                last_error = f"HTTP {response.status_code}"
+                continue
+            return parse_page(response.json(), endpoint)
+        except (requests.RequestException, ValueError, PageFetchError) as e:
+            last_error = e
+    raise PageFetchError(f"{url} 조회 실패 ({retries + 1}회 시도): {last_error}")
+
+
+def make_session(workers):
+    """keep-alive 연결을 재사용하는 세션 생성"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_all_pages(service_key, date, endpoint='CardSubwayTime', base_url=BASE_URL,
+                    page_size=PAGE_SIZE, workers=4, rate=5.0, retries=3, backoff=0.5,
+                    session=None, cache=None, total_count=None, done=(), on_page=None):
+    """첫 페이지에서 전체 건수를 읽은 뒤 나머지 페이지를 병렬로 가져와 순서대로 합치기
+
+    cache(PageCache)가 주어지면 캐시에 있는 페이지는 네트워크 요청 없이 사용
+    total_count를 이미 알고 있으면 첫 페이지를 건너뛰고, done에 있는 구간은 조회하지 않음
+    on_page(구간, 행 목록, 전체 건수)는 각 페이지가 완료될 때마다 호출됨
+    """
+    own_session = session is None
+    session_lock = threading.Lock()
+    bucket = TokenBucket(rate) if rate else None
+
+    def get_session():
+        # 모든 페이지가 캐시에 있으면 연결을 만들지 않음
+        nonlocal session
+        with session_lock:
+            if session is None:
+                session = make_session(workers)
+            return session
+
+    def fetch_range(index_range):
+        start_index, end_index = index_range
+        if cache is not None:
+            cached = cache.get(endpoint, date, start_index, end_index)
+            if cached is not None:
+                return cached
+        url = build_url(base_url, service_key, endpoint, start_index, end_index, date)
+        page = fetch_page(get_session(), url, endpoint, bucket, retries, backoff)
+        if page is not None and cache is not None:
+            cache.put(endpoint, date, start_index, end_index, page[0], page[1])
+        return page
+
+    try:
+        pages = {}
+        first_rows = None
+        if total_count is None:
+            first = fetch_range((1, page_size))
+            if first is None:
+                print(f"{date}: 해당하는 데이터가 없습니다.")
+                return []
+            first_rows, total_count = first
+
+        ranges = page_ranges(total_count, page_size)
+        print(f"{date} 전체 건수: {total_count} ({len(ranges)}페이지)")
+
+        done = set(done)
+        if first_rows is not None and ranges and ranges[0] not in done:
+            pages[ranges[0]] = first_rows
+            if on_page is not None:
+                on_page(ranges[0], first_rows, total_count)
+        pending = [r for r in ranges if r not in done and r not in pages]
+
+        if pending:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                futures = {executor.submit(fetch_range, r): r for r in pending}
+                # 완료되는 순서대로 기록하고, 반환할 때 인덱스 순서로 정렬
+                for future in as_completed(futures):
+                    index_range = futures[future]
+                    page = future.result()
+                    if page is None:
+                        raise PageFetchError(f"{date} 인덱스 {index_range[0]}-{index_range[1]}: 데이터 없음")
+                    pages[index_range] = page[0]
+                    print(f"{date} 인덱스 {index_range[0]}-{index_range[1]}: {len(page[0])}건")
+                    if on_page is not None:
+                        on_page(index_range, page[0], total_count)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return [row for r in ranges if r in pages for row in pages[r]]
+    finally:
+        if own_session and session is not None:
+            session.close()
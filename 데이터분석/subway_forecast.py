@@ -0,0 +1,196 @@
+import numpy as np
+
+from subway_cube import DIRECTIONS, HOURS
+
+# scipy(t 분포 분위수)는 예측 구간을 계산할 때만 불러옴
+
+DEFAULT_HARMONICS = 2
+DEFAULT_LEVEL = 0.9
+
+
+def month_number(month):
+    """'YYYYMM' → 0년 1월부터 센 달 번호"""
+    return int(str(month)[:4]) * 12 + int(str(month)[4:6]) - 1
+
+
+def month_label(number):
+    return f"{number // 12:04d}{number % 12 + 1:02d}"
+
+
+def next_months(month, n):
+    """month 다음 n개월의 'YYYYMM' 목록"""
+    start = month_number(month)
+    return [month_label(start + k) for k in range(1, n + 1)]
+
+
+def auto_harmonics(n_months, harmonics=DEFAULT_HARMONICS):
+    """학습 달 수에 맞춘 계절 항 수 (계수 1 + 2 × 계절 항 수 + 1이 달 수의 절반을 넘지 않게)"""
+    return max(0, min(harmonics, (n_months // 2 - 2) // 2))
+
+
+def design_matrix(numbers, origin, harmonics):
+    """달 번호별 설명변수 (절편, 연 단위 추세, 12개월 주기 sin/cos × harmonics)"""
+    numbers = np.asarray(numbers, dtype=np.float64)
+    columns = [np.ones_like(numbers), (numbers - origin) / 12]
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * (numbers % 12) / 12
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.stack(columns, axis=1)
+
+
+def history_from_frame(df):
+    """'월' 컬럼이 있는 전처리 데이터프레임을 (달 목록, 호선 목록, 호선별 역 목록, (달, 호선, 역, 24, 2) 배열)로 변환
+
+    없던 칸은 NaN (같은 칸이 여러 번 나오면 합산)
+    """
+    import pandas as pd
+    from subway_cube import parse_hours
+    if '월' not in df:
+        raise ValueError("달별 예측에는 '월' 컬럼이 있는 데이터가 필요합니다.")
+    month_codes, months = pd.factorize(df['월'].astype(str), sort=True)
+    line_codes, lines = pd.factorize(df['호선'].astype(str), sort=True)
+    pair_codes, pairs = pd.factorize(
+        pd.MultiIndex.from_arrays([line_codes, df['역명'].astype(str).to_numpy()]), sort=True)
+    pair_lines = pairs.get_level_values(0).to_numpy()
+    line_starts = np.searchsorted(pair_lines, np.arange(len(lines)))
+    counts = np.bincount(pair_lines, minlength=len(lines))
+    slots = np.arange(len(pairs)) - line_starts[pair_lines]
+    names = pairs.get_level_values(1).to_numpy()
+    stations = [list(names[start:start + count]) for start, count in zip(line_starts, counts)]
+
+    shape = (len(months), len(lines), int(counts.max()) if len(counts) else 0, HOURS)
+    flat = np.ravel_multi_index((month_codes, line_codes, slots[pair_codes], parse_hours(df['시간'])), shape)
+    size = int(np.prod(shape))
+    values = np.empty(shape + (len(DIRECTIONS),))
+    for d, column in enumerate(DIRECTIONS):
+        weights = pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        values[..., d] = np.bincount(flat, weights=weights, minlength=size).reshape(shape)
+    observed = np.bincount(flat, minlength=size).reshape(shape) > 0
+    values[~observed] = np.nan
+    return list(months), list(lines), stations, values
+
+
+class SeasonalForecaster:
+    """모든 계열(호선 × 역 × 시간 × 승하차)에 추세 + 계절 회귀를 한 번에 적합하는 예측기
+
+    계열마다 log(1 + 인원) = 절편 + 추세 × 연 + Σ(sin, cos 계절 항)을 최소제곱으로 적합함
+    설명변수는 모든 계열이 같으므로 없는 달(NaN)만 가중치 0으로 두고
+    정규방정식을 행렬 곱으로 한꺼번에 만든 뒤 묶음으로 풂 (계열마다 반복하지 않음)
+    예측값은 로그 척도 예측을 되돌린 값(중앙값), 구간은 계열별 잔차 분산과 t 분포로 계산
+    """
+
+    def __init__(self, harmonics=None, log=True):
+        self.harmonics = harmonics
+        self.log = log
+
+    def fit(self, values, months):
+        """values: (달, ...) 배열 (NaN = 관측 없음), months: 'YYYYMM' 목록"""
+        values = np.asarray(values, dtype=np.float64)
+        self.shape = values.shape[1:]
+        self.last_month = max(months, key=month_number)
+        numbers = np.array([month_number(month) for month in months])
+        self.origin = numbers.min()
+        harmonics = auto_harmonics(len(months)) if self.harmonics is None else self.harmonics
+        self.n_harmonics = harmonics
+        X = design_matrix(numbers, self.origin, harmonics)
+        n_params = X.shape[1]
+
+        Y = values.reshape(len(months), -1).T
+        weights = ~np.isnan(Y)
+        Y = np.where(weights, np.log1p(np.maximum(Y, 0)) if self.log else Y, 0.0)
+        W = weights.astype(np.float64)
+
+        # 정규방정식의 XᵀX는 관측된 달 조합에만 달려 있으므로 조합마다 한 번만 역행렬을 구함
+        # (대부분의 계열은 모든 달이 관측되어 조합이 몇 개뿐)
+        _, first, self.pattern = np.unique(np.packbits(weights, axis=1), axis=0,
+                                           return_index=True, return_inverse=True)
+        self.pattern = self.pattern.ravel()
+        outer = (X[:, :, None] * X[:, None, :]).reshape(len(months), -1)
+        XtX = (W[first] @ outer).reshape(-1, n_params, n_params)
+        # 관측이 적거나 같은 달에만 몰린 계열도 풀리도록 유사역행렬 사용
+        self.inverse = np.linalg.pinv(XtX)
+        XtY = (W * Y) @ X
+        self.coef = np.einsum('npq,nq->np', self.inverse[self.pattern], XtY)
+
+        residuals = np.where(weights, Y - self.coef @ X.T, 0.0)
+        self.n_obs = weights.sum(axis=1)
+        self.dof = self.n_obs - n_params
+        self.sigma2 = np.divide((residuals ** 2).sum(axis=1), self.dof,
+                                out=np.full(len(Y), np.nan), where=self.dof > 0)
+        return self
+
+    def predict(self, months, level=DEFAULT_LEVEL):
+        """예측 달마다 (예측값, 구간 하한, 구간 상한) 반환, 각각 (예측 달 수, ...) 배열
+
+        관측이 없는 계열은 NaN, 잔차 자유도가 없는 계열은 구간이 NaN
+        """
+        from scipy import special
+        numbers = np.array([month_number(month) for month in months])
+        X = design_matrix(numbers, self.origin, self.n_harmonics)
+        mean = self.coef @ X.T
+        leverage = np.einsum('fp,npq,fq->nf', X, self.inverse, X)[self.pattern]
+        scale = np.sqrt(self.sigma2[:, None] * (1 + leverage))
+        dofs, codes = np.unique(self.dof, return_inverse=True)
+        quantile = np.where(dofs > 0, special.stdtrit(np.maximum(dofs, 1), 0.5 + level / 2), np.nan)[codes.ravel()]
+        lower = mean - quantile[:, None] * scale
+        upper = mean + quantile[:, None] * scale
+        if self.log:
+            mean, lower, upper = (np.expm1(a) for a in (mean, lower, upper))
+            lower = np.maximum(lower, 0)
+        empty = self.n_obs == 0
+        mean[empty] = lower[empty] = upper[empty] = np.nan
+        return tuple(a.T.reshape((len(months),) + self.shape) for a in (mean, lower, upper))
+
+    def forecast(self, horizon=1, level=DEFAULT_LEVEL):
+        """마지막 학습 달 다음 horizon개월 예측 (예측 달 목록, 예측값, 하한, 상한)"""
+        months = next_months(self.last_month, horizon)
+        return (months,) + self.predict(months, level)
+
+
+def seasonal_naive(values, months, target):
+    """비교 기준: 1년 전 같은 달 값 (없으면 마지막 관측값)"""
+    numbers = [month_number(month) for month in months]
+    last_year = month_number(target) - 12
+    fallback = np.full(values.shape[1:], np.nan)
+    for m in np.argsort(numbers):
+        fallback = np.where(np.isnan(values[m]), fallback, values[m])
+    if last_year in numbers:
+        same = values[numbers.index(last_year)]
+        return np.where(np.isnan(same), fallback, same)
+    return fallback
+
+
+def backtest(values, months, horizon=1, min_train=12, level=DEFAULT_LEVEL, harmonics=None):
+    """시작 시점을 한 달씩 옮기며 그 전까지의 달로 적합하고 horizon개월 뒤를 예측해 오차 측정
+
+    반환값: 시점별 결과 목록 [{'train_end', 'target', 'wape', 'naive_wape', 'coverage', 'station_wape'}, ...]
+    - wape: 관측된 칸의 Σ|오차| / Σ실제값 (naive_wape는 seasonal_naive 기준)
+    - station_wape: 역의 하루 합계(시간·승하차 합) 기준 WAPE
+    - coverage: 실제값이 예측 구간 안에 든 비율
+    """
+    order = np.argsort([month_number(month) for month in months])
+    months = [months[i] for i in order]
+    values = np.asarray(values, dtype=np.float64)[order]
+    results = []
+    for end in range(min_train, len(months) - horizon + 1):
+        train_months = months[:end]
+        target = months[end + horizon - 1]
+        model = SeasonalForecaster(harmonics).fit(values[:end], train_months)
+        point, lower, upper = (a[0] for a in model.predict([target], level))
+        actual = values[end + horizon - 1]
+        naive = seasonal_naive(values[:end], train_months, target)
+        observed = ~np.isnan(actual) & ~np.isnan(point) & ~np.isnan(naive)
+        total = actual[observed].sum()
+        station_actual = np.where(observed, actual, 0).sum(axis=(-2, -1))
+        station_point = np.where(observed, point, 0).sum(axis=(-2, -1))
+        bounded = observed & ~np.isnan(lower)
+        results.append({
+            'train_end': train_months[-1],
+            'target': target,
+            'wape': np.abs(point - actual)[observed].sum() / total if total else np.nan,
+            'naive_wape': np.abs(naive - actual)[observed].sum() / total if total else np.nan,
+            'station_wape': (np.abs(station_point - station_actual).sum() / station_actual.sum()
+                             if station_actual.sum() else np.nan),
+            'coverage': ((actual >= lower) & (actual <= upper))[bounded].mean() if bounded.any() else np.nan
+        })
+    return results
@@ -0,0 +1,169 @@
+import json
+import os
+
+from subway_cache import is_closed_month
+from subway_fetch import BASE_URL, PAGE_SIZE, fetch_all_pages
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'raw')
+
+
+def month_range(start_month, end_month):
+    """'202201', '202409' -> ['202201', '202202', ..., '202409']"""
+    year, month = int(start_month[:4]), int(start_month[4:6])
+    end_year, end_mon = int(end_month[:4]), int(end_month[4:6])
+    months = []
+    while (year, month) <= (end_year, end_mon):
+        months.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class MonthJournal:
+    """한 달치 페이지를 한 줄씩 기록하는 체크포인트 저널
+
+    - {월}.journal.jsonl: 진행 중인 달 (첫 줄은 전체 건수, 이후 한 줄에 한 페이지)
+    - {월}.jsonl: 모든 페이지가 기록된 달 (저널 파일 이름만 바꾼 것)
+    """
+
+    def __init__(self, data_dir, endpoint, month):
+        self.month = month
+        directory = os.path.join(data_dir, endpoint)
+        os.makedirs(directory, exist_ok=True)
+        self.done_path = os.path.join(directory, f"{month}.jsonl")
+        self.journal_path = os.path.join(directory, f"{month}.journal.jsonl")
+
+    def is_complete(self):
+        return os.path.exists(self.done_path)
+
+    def load(self):
+        """기록된 (전체 건수, 페이지 크기, {구간: 행 목록}) 읽기, 저널이 없으면 (None, None, {})"""
+        path = self.done_path if self.is_complete() else self.journal_path
+        if not os.path.exists(path):
+            return None, None, {}
+
+        total_count, page_size, pages = None, None, {}
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                # 중단된 실행이 남긴 마지막 불완전한 줄은 버림
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if 'total_count' in entry:
+                    total_count, page_size = entry['total_count'], entry['page_size']
+                else:
+                    pages[(entry['start'], entry['end'])] = entry['rows']
+                valid_bytes += len(line)
+
+        if path == self.journal_path and valid_bytes < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return total_count, page_size, pages
+
+    def _append(self, entry):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write_header(self, total_count, page_size):
+        self._append({'total_count': total_count, 'page_size': page_size})
+
+    def commit_page(self, index_range, rows):
+        self._append({'start': index_range[0], 'end': index_range[1], 'rows': rows})
+
+    def finalize(self):
+        os.replace(self.journal_path, self.done_path)
+
+    def restart(self):
+        """진행 중인 저널을 지우고 처음부터 다시 기록 (저장이 끝난 파일은 새 저널이 완료될 때 교체됨)"""
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+def saved_months(data_dir=DEFAULT_DATA_DIR, endpoint='CardSubwayTime'):
+    """수집이 끝나 저장된 달 목록 (진행 중인 저널은 제외)"""
+    directory = os.path.join(data_dir, endpoint)
+    if not os.path.isdir(directory):
+        return []
+    names = (name[:-len('.jsonl')] for name in os.listdir(directory) if name.endswith('.jsonl'))
+    return sorted(name for name in names if len(name) == 6 and name.isdigit())
+
+
+def load_month(month, data_dir=DEFAULT_DATA_DIR, endpoint='CardSubwayTime'):
+    """저장된 한 달치 행을 인덱스 순서대로 반환 (저장된 적이 없으면 빈 목록)"""
+    _, _, pages = MonthJournal(data_dir, endpoint, month).load()
+    return [row for index_range in sorted(pages) for row in pages[index_range]]
+
+
+def ingest_month(service_key, month, data_dir=DEFAULT_DATA_DIR, endpoint='CardSubwayTime',
+                 page_size=PAGE_SIZE, stats=None, **fetch_options):
+    """한 달치 데이터를 저널에 기록하며 수집, 완료되면 True
+
+    이미 끝난 달은 한 번 저장하면 다시 받지 않고, 아직 끝나지 않은 달(이번 달 이후)은
+    데이터가 계속 바뀌므로 실행할 때마다 처음부터 다시 받아 저장된 파일을 교체함
+    stats(dict)가 주어지면 이번에 받은 페이지 수(pages)와 그 행 수(rows), 전체 건수(total_count)를 기록
+    """
+    if stats is not None:
+        stats.update(pages=0, rows=0)
+    journal = MonthJournal(data_dir, endpoint, month)
+    if is_closed_month(month):
+        if journal.is_complete():
+            print(f"{month}: 이미 저장된 달이므로 건너뜁니다.")
+            return True
+        total_count, stored_page_size, pages = journal.load()
+    else:
+        # 이어받지 않음 (이전 실행 이후 건수와 값이 바뀌었을 수 있음)
+        journal.restart()
+        total_count, stored_page_size, pages = None, None, {}
+    if stored_page_size is not None:
+        page_size = stored_page_size
+    if pages:
+        print(f"{month}: 저널에서 {len(pages)}페이지를 이어받습니다.")
+
+    def on_page(index_range, rows, count):
+        nonlocal total_count
+        if total_count is None:
+            total_count = count
+            journal.write_header(count, page_size)
+        journal.commit_page(index_range, rows)
+        pages[index_range] = rows
+        if stats is not None:
+            stats['pages'] += 1
+            stats['rows'] += len(rows)
+
+    fetch_all_pages(service_key, month, endpoint=endpoint, page_size=page_size,
+                    total_count=total_count, done=set(pages), on_page=on_page,
+                    **fetch_options)
+
+    if total_count is None:
+        return False
+    if stats is not None:
+        stats['total_count'] = total_count
+    journal.finalize()
+    print(f"{month}: {total_count}건 저장 완료")
+    return True
+
+
+def ingest_months(service_key, start_month, end_month, data_dir=DEFAULT_DATA_DIR,
+                  endpoint='CardSubwayTime', base_url=BASE_URL, profiler=None, **fetch_options):
+    """여러 달을 순서대로 수집 (중단 후 다시 실행하면 마지막으로 기록된 페이지부터 이어감)
+
+    fetch_options는 fetch_all_pages로 전달됨 (workers, rate, cache 등)
+    profiler(StageProfiler)가 주어지면 달마다 수집 시간과 받은 페이지/행 수를 기록
+    반환값: 저장이 끝난 달 목록
+    """
+    completed = []
+    for month in month_range(start_month, end_month):
+        if profiler is None:
+            done = ingest_month(service_key, month, data_dir, endpoint, base_url=base_url, **fetch_options)
+        else:
+            with profiler.stage(f"수집 {month}") as stage:
+                done = ingest_month(service_key, month, data_dir, endpoint, base_url=base_url,
+                                    stats=stage, **fetch_options)
+        if done:
+            completed.append(month)
+    return completed
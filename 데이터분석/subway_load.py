@@ -0,0 +1,243 @@
+import csv
+
+import numpy as np
+
+from subway_cube import HOURS
+from subway_names import canonical_name, name_key
+
+# 역 순서 파일 컬럼 (한 행 = 한 호선의 한 역, 순번 오름차순이 운행 순서)
+ORDER_COLUMNS = ('호선', '순번', '역명')
+CIRCULAR_COLUMN = '순환'
+ENCODINGS = ['utf-8-sig', 'cp949', 'euc-kr']
+DIRECTION_LABELS = ('순방향', '역방향')
+
+
+def read_station_order(path, encoding=None):
+    """역 순서 CSV를 {호선: ([역명, ...], 순환선 여부)}로 읽기
+
+    필수 컬럼: 호선, 순번, 역명 / 선택 컬럼: 순환 (Y/1/true면 마지막 역 다음이 첫 역인 순환선)
+    """
+    encodings = [encoding] if encoding else ENCODINGS
+    for candidate in encodings:
+        try:
+            with open(path, encoding=candidate, newline='') as f:
+                rows = list(csv.DictReader(f))
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError("적절한 인코딩을 찾을 수 없습니다.")
+    if rows and not all(column in rows[0] for column in ORDER_COLUMNS):
+        raise ValueError(f"역 순서 파일에는 {', '.join(ORDER_COLUMNS)} 컬럼이 필요합니다.")
+
+    lines = {}
+    for row in rows:
+        line = row['호선'].strip()
+        stations, flags = lines.setdefault(line, ([], []))
+        stations.append((float(row['순번']), row['역명'].strip()))
+        flags.append(str(row.get(CIRCULAR_COLUMN) or '').strip().lower() in ('y', '1', 'true', '순환'))
+    return {line: ([name for _, name in sorted(stations, key=lambda item: item[0])], any(flags))
+            for line, (stations, flags) in lines.items()}
+
+
+def match_order(order, lines, stations):
+    """역 순서를 데이터의 (호선 번호, 역 번호)에 맞춤
+
+    order: read_station_order 결과, lines/stations: 데이터의 호선 목록과 호선별 역 이름 목록
+    역 이름은 대표 표기(canonical_name)로 맞추고, 순서 파일에만 있거나 데이터에만 있는 역은 따로 돌려줌
+    반환값: (호선 목록, 순서대로 정렬한 역 이름 목록, (호선, 위치)별 데이터 호선 번호, 역 번호(없으면 -1),
+            순환선 여부, {호선: 데이터에 없는 역}, {호선: 순서 파일에 없는 역})
+    """
+    line_index = {line: i for i, line in enumerate(lines)}
+    matched = [line for line in order if line in line_index]
+    width = max((len(order[line][0]) for line in matched), default=0)
+    line_pos = np.zeros((len(matched), width), dtype=np.intp)
+    station_pos = np.full((len(matched), width), -1, dtype=np.intp)
+    missing, unordered = {}, {}
+    for k, line in enumerate(matched):
+        i = line_index[line]
+        # 표기만 다른 이름도 맞도록 검색용 키(name_key)로 비교 (같은 키가 여러 번 나오면 처음 역)
+        slots = {}
+        for j, name in enumerate(stations[i]):
+            slots.setdefault(name_key(name), j)
+        used = set()
+        line_pos[k] = i
+        for s, name in enumerate(order[line][0]):
+            j = slots.get(name_key(name))
+            if j is None:
+                missing.setdefault(line, []).append(name)
+            else:
+                station_pos[k, s] = j
+                used.add(j)
+        extra = [name for j, name in enumerate(stations[i]) if j not in used]
+        if extra:
+            unordered[line] = extra
+    ordered = [[canonical_name(name) for name in order[line][0]] for line in matched]
+    circular = np.array([order[line][1] for line in matched], dtype=bool)
+    return matched, ordered, line_pos, station_pos, circular, missing, unordered
+
+
+def _share(before, after):
+    """before / (before + after), 둘 다 0이면 0.5"""
+    total = before + after
+    return np.divide(before, total, out=np.full(total.shape, 0.5), where=total > 0)
+
+
+def estimate_load(on, off, counts, circular):
+    """역 순서대로 놓인 승차/하차 인원으로 역 사이 구간의 열차 내 인원(재차인원)을 방향별로 추정
+
+    on, off: (..., 호선, 역 위치, 시간) 배열 (호선마다 counts개 역만 유효, 나머지는 0)
+    counts: 호선별 역 수, circular: 호선별 순환선 여부
+    반환값: (..., 호선, 구간, 시간, 방향) 배열, 구간 s = 역 s와 역 s+1 사이 (순환선은 마지막 역 → 첫 역 구간 포함)
+
+    승하차 인원에는 방향이 없으므로 다음과 같이 나눔
+    - 일반 노선: 역 s의 승차는 앞쪽/뒤쪽 역의 하차 인원 비율로, 하차는 앞쪽/뒤쪽 역의 승차 인원 비율로 방향을 나눔
+      (첫 역 승차는 모두 순방향, 마지막 역 하차는 모두 순방향에서 옴)
+    - 순환선: 양방향으로 반씩 나눔
+    방향마다 하차 합계를 승차 합계에 맞춘 뒤 순서대로 (승차 - 하차)를 누적하고,
+    순환선은 누적값이 가장 작은 구간을 0으로 두어 한 바퀴를 도는 인원을 정함
+    """
+    on = np.asarray(on, dtype=np.float64)
+    off = np.asarray(off, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.intp)
+    width = on.shape[-2]
+    position = np.arange(width)
+    # (호선, 역 위치, 1) 모양으로 맞춰 시간 축과 앞쪽 축에 그대로 퍼지게 함
+    circular = np.asarray(circular, dtype=bool)[:, None, None]
+
+    # 각 역 앞쪽(자기 제외)과 뒤쪽(자기 제외) 합계
+    on_before = np.cumsum(on, axis=-2) - on
+    off_before = np.cumsum(off, axis=-2) - off
+    on_after = on.sum(axis=-2, keepdims=True) - on_before - on
+    off_after = off.sum(axis=-2, keepdims=True) - off_before - off
+
+    forward_on = on * np.where(circular, 0.5, _share(off_after, off_before))
+    forward_off = off * np.where(circular, 0.5, _share(on_before, on_after))
+    flows = []
+    for direction_on, direction_off in ((forward_on, forward_off), (on - forward_on, off - forward_off)):
+        # 같은 시간대 안에서 타고 내린 인원이 같다고 보고 하차 합계를 승차 합계에 맞춤
+        on_total = direction_on.sum(axis=-2, keepdims=True)
+        off_total = direction_off.sum(axis=-2, keepdims=True)
+        scale = np.divide(on_total, off_total, out=np.zeros(on_total.shape), where=off_total > 0)
+        flows.append(direction_on - direction_off * scale)
+
+    # 순방향: 구간 s를 지나는 인원 = 역 0~s의 (승차 - 하차) 합
+    forward = np.cumsum(flows[0], axis=-2)
+    # 역방향: 구간 s(역 s+1 → 역 s)를 지나는 인원 = 역 s+1 이후의 (승차 - 하차) 합
+    backward = flows[1].sum(axis=-2, keepdims=True) - np.cumsum(flows[1], axis=-2)
+
+    # (호선, 구간, 1, 1): 일반 노선은 역 수 - 1개, 순환선은 역 수만큼 구간이 있음
+    segments = (position[None, :] < (counts - 1 + circular[:, 0, 0])[:, None])[:, :, None, None]
+    load = np.stack([forward, backward], axis=-1)
+    # 순환선은 한 바퀴를 도는 인원(상수)을 알 수 없으므로 가장 적은 구간이 0이 되도록 맞춤
+    lowest = np.where(segments, load, np.inf).min(axis=-3, keepdims=True, initial=np.inf)
+    load = np.where(circular[..., None] & np.isfinite(lowest), load - lowest, load)
+    return np.where(segments, np.maximum(load, 0.0), 0.0)
+
+
+class LineLoad:
+    """호선 × 구간 × 시간 × 방향 재차인원 추정 결과
+
+    load[..., 호선, 구간, 시간, 방향] (앞쪽 축은 달처럼 여러 번 계산한 묶음, 없으면 생략)
+    """
+
+    def __init__(self, load, lines, stations, circular, missing=None, unordered=None, labels=None):
+        self.load = load
+        self.lines = list(lines)
+        self.stations = [list(names) for names in stations]
+        self.circular = np.asarray(circular, dtype=bool)
+        self.missing = missing or {}
+        self.unordered = unordered or {}
+        self.labels = labels
+
+    @classmethod
+    def from_cube(cls, cube, order):
+        """큐브(여러 달이면 합계)와 역 순서로 재차인원 추정"""
+        lines, ordered, line_pos, station_pos, circular, missing, unordered = match_order(
+            order, cube.lines, cube.stations)
+        values = cube.values[line_pos, np.maximum(station_pos, 0)]
+        values[station_pos < 0] = 0
+        counts = [len(names) for names in ordered]
+        load = estimate_load(values[..., 0], values[..., 1], counts, circular)
+        return cls(load, lines, ordered, circular, missing, unordered)
+
+    @classmethod
+    def from_store(cls, store, order, months=None):
+        """저장소의 달별 재차인원을 한 번에 추정 (load 맨 앞 축 = 달, 다시 계산하는 백필용)
+
+        모든 달의 배열(store.history)을 호선·역 순서에 맞춰 한 번에 모으므로 달 수만큼 반복하지 않음
+        """
+        months = store.months if months is None else list(months)
+        meta_lines = store.meta['lines']
+        stations = [store.meta['stations'][line] for line in meta_lines]
+        lines, ordered, line_pos, station_pos, circular, missing, unordered = match_order(
+            order, meta_lines, stations)
+
+        values = np.nan_to_num(store.history(months)[:, line_pos, np.maximum(station_pos, 0)])
+        values[:, station_pos < 0] = 0
+        counts = [len(names) for names in ordered]
+        load = estimate_load(values[..., 0], values[..., 1], counts, circular)
+        return cls(load, lines, ordered, circular, missing, unordered, labels=months)
+
+    def segment_name(self, line_idx, segment, direction):
+        """구간 이름 (예: '강남→역삼', 역방향이면 '역삼→강남')"""
+        names = self.stations[line_idx]
+        start, end = names[segment], names[(segment + 1) % len(names)]
+        return f"{start}→{end}" if direction == 0 else f"{end}→{start}"
+
+    def rank(self, k=10, hours=None, load=None):
+        """가장 붐비는 (호선, 구간, 방향) 상위 k개
+
+        hours가 없으면 구간마다 가장 붐비는 시간의 재차인원, 있으면 그 시간대의 시간당 평균 재차인원 기준
+        load: 순위를 매길 (호선, 구간, 시간, 방향) 배열 (기본값: 묶음 축이 없을 때의 self.load)
+        반환값: [{'호선', '구간', '방향', '시간', '재차인원'}, ...]
+        """
+        load = self.load if load is None else load
+        if hours is None:
+            peak_hour = load.argmax(axis=2)
+            scores = load.max(axis=2)
+        else:
+            hours = list(hours)
+            scores = load[:, :, hours].mean(axis=2)
+            peak_hour = None
+        flat = scores.ravel()
+        k = min(k, int((flat > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-flat, k - 1)[:k]
+        top = top[np.argsort(-flat[top], kind='stable')]
+        result = []
+        for line_idx, segment, direction in zip(*np.unravel_index(top, scores.shape)):
+            result.append({
+                '호선': self.lines[line_idx],
+                '구간': self.segment_name(line_idx, segment, direction),
+                '방향': DIRECTION_LABELS[direction],
+                '시간': (f"{peak_hour[line_idx, segment, direction]}시" if peak_hour is not None
+                        else f"{hours[0]}-{hours[-1]}시" if len(hours) > 1 else f"{hours[0]}시"),
+                '재차인원': float(scores[line_idx, segment, direction])
+            })
+        return result
+
+    def to_frame(self):
+        """(호선, 구간 순번, 구간, 방향, 시간, 재차인원) 긴 데이터프레임 (묶음 축이 있으면 '묶음' 컬럼 추가)"""
+        import pandas as pd
+        frames = []
+        batches = [(None, self.load)] if self.labels is None else list(zip(self.labels, self.load))
+        for label, load in batches:
+            for i, line in enumerate(self.lines):
+                n_segments = len(self.stations[i]) - (0 if self.circular[i] else 1)
+                for direction, direction_label in enumerate(DIRECTION_LABELS):
+                    block = load[i, :n_segments, :, direction]
+                    segment, hour = np.divmod(np.arange(block.size), HOURS)
+                    frame = pd.DataFrame({
+                        '호선': line,
+                        '구간순번': segment,
+                        '구간': [self.segment_name(i, s, direction) for s in segment],
+                        '방향': direction_label,
+                        '시간': hour,
+                        '재차인원': block.ravel()
+                    })
+                    if label is not None:
+                        frame.insert(0, '묶음', label)
+                    frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
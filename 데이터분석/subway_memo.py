@@ -0,0 +1,209 @@
+import contextlib
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+from subway_cube import CongestionCube
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STAGE_CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache', 'stages')
+
+# 캐시 파일 형식을 바꾸면 올려서 기존 결과를 모두 무효화
+MEMO_VERSION = 1
+
+
+def _update(digest, obj):
+    """입력 데이터를 내용 기준으로 해시에 반영 (같은 내용이면 같은 해시)"""
+    if isinstance(obj, pd.DataFrame):
+        digest.update(b'frame')
+        digest.update(repr([(str(col), str(dtype)) for col, dtype in obj.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        digest.update(b'series' + str(obj.dtype).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        digest.update(f"array{obj.dtype}{obj.shape}".encode('utf-8'))
+        digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, CongestionCube):
+        digest.update(b'cube')
+        _update(digest, obj.values)
+        _update(digest, obj.observed)
+        _update(digest, [obj.lines, obj.stations])
+    elif isinstance(obj, dict):
+        digest.update(b'dict')
+        for key in sorted(obj, key=repr):
+            _update(digest, key)
+            _update(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        digest.update(type(obj).__name__.encode('utf-8'))
+        for item in obj:
+            _update(digest, item)
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+
+
+def fingerprint(*args, **kwargs):
+    """위치/키워드 인자 내용의 sha256 해시"""
+    digest = hashlib.sha256()
+    _update(digest, list(args))
+    _update(digest, kwargs)
+    return digest.hexdigest()
+
+
+def _functions(obj):
+    """함수면 그 자신, 클래스면 메서드 함수 목록"""
+    if isinstance(obj, types.FunctionType):
+        return [obj]
+    if isinstance(obj, type):
+        members = []
+        for member in vars(obj).values():
+            if isinstance(member, (staticmethod, classmethod)):
+                member = member.__func__
+            elif isinstance(member, property):
+                member = member.fget
+            if isinstance(member, types.FunctionType):
+                members.append(member)
+        return members
+    return []
+
+
+def _local_modules(func):
+    """함수가 사용하는 이 디렉터리의 모듈 파일 목록 (다른 모듈의 함수/클래스가 부르는 것까지 따라감)"""
+    files = set()
+    seen = {id(func)}
+    pending = [func]
+    while pending:
+        current = pending.pop()
+        codes = [current.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+            for name in code.co_names:
+                obj = current.__globals__.get(name)
+                module = obj if isinstance(obj, types.ModuleType) else sys.modules.get(getattr(obj, '__module__', None))
+                path = getattr(module, '__file__', None)
+                if not path or os.path.dirname(os.path.abspath(path)) != SCRIPT_DIR:
+                    continue
+                files.add(path)
+                for member in _functions(obj):
+                    if id(member) not in seen:
+                        seen.add(id(member))
+                        pending.append(member)
+    return files
+
+
+def code_version(func):
+    """함수 소스와 함수가 사용하는 이 디렉터리 모듈들의 소스 해시
+
+    그림 모듈처럼 단계에서 쓰지 않는 파일이 바뀌어도 결과는 그대로 재사용됨
+    """
+    # 스크립트로 실행할 때(__main__)와 모듈로 불러올 때 같은 키가 되도록 모듈 이름 대신 파일 이름 사용
+    source_file = os.path.basename(inspect.getsourcefile(func))
+    digest = hashlib.sha256(f"{MEMO_VERSION}|{source_file}|{func.__qualname__}".encode('utf-8'))
+    digest.update(inspect.getsource(func).encode('utf-8'))
+    # 기본 인자(예: PEAK_HOURS)는 다른 모듈에서 정의되어도 값으로 반영
+    digest.update(repr((func.__defaults__, func.__kwdefaults__)).encode('utf-8'))
+    for path in sorted(_local_modules(func)):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    """출력을 화면에 그대로 쓰면서 따로 모아 두는 stdout 대체 객체"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.stream.write(text)
+        self.buffer.write(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class StageCache:
+    """분석 단계 결과를 (입력 해시, 인자, 코드 버전) 키로 저장하는 디스크 캐시
+
+    - 결과와 함께 단계가 출력한 내용도 저장해 두었다가 캐시를 쓸 때 그대로 다시 출력
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 결과부터 삭제(LRU)
+    """
+
+    def __init__(self, path=DEFAULT_STAGE_CACHE_DIR, max_bytes=1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, func, args, kwargs):
+        return hashlib.sha256(f"{code_version(func)}|{fingerprint(*args, **kwargs)}".encode('utf-8')).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def run(self, func, *args, force=False, **kwargs):
+        """func(*args, **kwargs)를 실행하거나 저장된 결과를 반환 (force=True면 항상 다시 계산)
+
+        실패를 뜻하는 None/False 결과는 저장하지 않음
+        """
+        key = self.key(func, args, kwargs)
+        path = self._file(key)
+        if not force and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    result, output = pickle.load(f)
+                os.utime(path)  # 마지막 사용 시각 갱신 (LRU 기준)
+                self.hits += 1
+                sys.stdout.write(output)
+                return result
+            except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+                pass
+
+        self.misses += 1
+        tee = _Tee(sys.stdout)
+        with contextlib.redirect_stdout(tee):
+            result = func(*args, **kwargs)
+        if result is not None and result is not False:
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                pickle.dump((result, tee.buffer.getvalue()), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            self._evict()
+        return result
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.path, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 LRU 순서로 삭제"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= size
+
+    def size(self):
+        """캐시 전체 크기(바이트)"""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        for _, _, name in self._entries():
+            os.remove(os.path.join(self.path, name))
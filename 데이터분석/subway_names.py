@@ -0,0 +1,261 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# 괄호 안 보조 표기 (예: '총신대입구(이수)', '신촌(경의중앙선)')
+PAREN_PATTERN = re.compile(r'\s*[\(\[（［]([^\)\]）］]*)[\)\]）］]\s*')
+SPACE_PATTERN = re.compile(r'[\s·ㆍ・]+')
+
+# 한글 음절 = 0xAC00 + (초성 × 21 + 중성) × 28 + 종성
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+INITIALS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+MEDIALS = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ', 'ㅜㅓ', 'ㅜㅔ',
+           'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ']
+FINALS = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ', 'ㄹㅍ',
+          'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 입력 중에 낱자로 들어오는 겹모음/겹받침 (예: 'ㅘ', 'ㄺ')도 같은 낱자 열로 풀어 씀
+COMPOUND_JAMO = {'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+                 'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+                 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+# 오타 검색용 삭제 색인에 넣을 최대 편집 거리 (이보다 큰 거리는 트리를 따라 탐색)
+MAX_INDEXED_DISTANCE = 2
+# NFKC 정규화는 호환용 자모('ㄱ')를 첫가끝 자모('ᄀ')로 바꾸므로 다시 호환용 자모로 돌림
+CONJOINING_JAMO = {unicodedata.normalize('NFKC', chr(code)): chr(code) for code in range(0x3131, 0x3164)}
+
+
+@lru_cache(maxsize=65536)
+def canonical_name(name):
+    """역 이름의 대표 표기 (표기가 달라도 같은 역이면 같은 값)
+
+    - 유니코드 NFKC 정규화 (전각 문자 등), 공백·가운뎃점 제거
+    - 괄호 안 보조 표기 제거 ('총신대입구(이수)' → '총신대입구')
+    - 끝의 '역' 제거 ('서울역' → '서울', 단 '역'을 빼면 한 글자만 남는 이름은 그대로)
+    - 노선 표기('…선')는 다른 역을 가리키므로 남김 ('신촌역(경의중앙선)' → '신촌(경의중앙선)')
+    """
+    text = unicodedata.normalize('NFKC', str(name))
+    qualifiers = [inner for inner in (SPACE_PATTERN.sub('', inner) for inner in PAREN_PATTERN.findall(text))
+                  if inner.endswith('선')]
+    text = SPACE_PATTERN.sub('', PAREN_PATTERN.sub('', text))
+    if len(text) > 2 and text.endswith('역'):
+        text = text[:-1]
+    if not text:
+        return str(name).strip()
+    return text + ''.join(f"({qualifier})" for qualifier in qualifiers)
+
+
+def name_key(name):
+    """검색용 키 (대표 표기를 소문자로)"""
+    return canonical_name(name).casefold()
+
+
+def alias_keys(name):
+    """괄호 안 보조 표기 중 역 이름으로 볼 수 있는 것의 키 ('총신대입구(이수)' → ['이수'], 노선 이름은 제외)"""
+    keys = []
+    for inner in PAREN_PATTERN.findall(unicodedata.normalize('NFKC', str(name))):
+        inner = SPACE_PATTERN.sub('', inner)
+        if inner and not inner.endswith('선'):
+            keys.append(name_key(inner))
+    return keys
+
+
+def decompose(text):
+    """한글 음절을 낱자(자모) 열로 풀어 씀 ('강남' → 'ㄱㅏㅇㄴㅏㅁ', 겹모음/겹받침도 낱자로)"""
+    result = []
+    for char in text:
+        code = ord(char) - HANGUL_BASE
+        if 0 <= code <= HANGUL_LAST - HANGUL_BASE:
+            result.append(INITIALS[code // 588])
+            result.append(MEDIALS[code // 28 % 21])
+            result.append(FINALS[code % 28])
+        else:
+            char = CONJOINING_JAMO.get(char, char)
+            result.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(result)
+
+
+def deletions(text, depth):
+    """text에서 글자를 depth개 이하로 지워 만들 수 있는 모든 문자열 (text 포함)"""
+    result = {text}
+    frontier = {text}
+    for _ in range(depth):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a, b, limit=None):
+    """a, b의 편집 거리 (limit이 주어지고 거리가 limit을 넘으면 limit + 1)"""
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        row = [i]
+        for j, y in enumerate(b, 1):
+            row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (x != y)))
+        if limit is not None and min(row) > limit:
+            return limit + 1
+        previous = row
+    return previous[-1] if limit is None else min(previous[-1], limit + 1)
+
+
+def canonical_column(values):
+    """이름 열(Series/배열)의 각 값을 대표 표기로 바꾼 object 배열 (고유값만 한 번씩 변환, 결측은 그대로)"""
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(values)
+    # 결측(code -1)은 맨 뒤의 NaN을 가리킴
+    mapped = np.array([canonical_name(name) for name in uniques] + [np.nan], dtype=object)
+    return mapped[codes]
+
+
+class _Node:
+    __slots__ = ('children', 'ids', 'terminal')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = []
+        self.terminal = None
+
+
+class StationIndex:
+    """역 이름 → 역 번호 색인
+
+    - keys: 검색용 키(name_key, 괄호 안 별칭 포함) → 역 번호 사전 (정확한 이름은 사전 조회 한 번)
+    - trie: 키를 자모 열로 풀어 쓴 접두사 트리 (입력 중인 '강ㄴ'도 '강남'의 접두사가 됨)
+    - 오타는 자모 단위 편집 거리로 찾음: 거리 2 이하는 키에서 자모를 1~2개 지운 문자열의 사전(삭제 색인)으로
+      후보만 골라 확인하고, 그보다 크거나 접두사 비교면 트리를 따라 내려가며 한도 안에서만 계산
+    역 번호는 대표 표기 기준이라 환승역은 호선과 관계없이 하나 (호선 정보는 station_lines에 보관)
+    """
+
+    def __init__(self, names=(), line=None):
+        self.names = []
+        self.station_lines = []
+        self.keys = {}
+        self.trie = _Node()
+        self.deletes = {}
+        for name in names:
+            self.add(name, line)
+
+    @classmethod
+    def from_cube(cls, cube):
+        """큐브의 모든 호선·역으로 색인 생성"""
+        index = cls()
+        for line, names in zip(cube.lines, cube.stations):
+            for name in names:
+                index.add(name, line)
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, line=None):
+        """역 이름을 추가하고 역 번호 반환 (표기만 다른 이름이면 기존 번호)"""
+        key = name_key(name)
+        station_id = self.keys.get(key)
+        if station_id is None:
+            station_id = len(self.names)
+            self.names.append(canonical_name(name))
+            self.station_lines.append(set())
+            self._insert(key, station_id)
+        if line is not None:
+            self.station_lines[station_id].add(line)
+        for alias in alias_keys(name):
+            if alias not in self.keys:
+                self._insert(alias, station_id)
+            elif line is not None:
+                # 보조 표기가 이미 다른 역 이름이면 ('이수'와 '총신대입구(이수)') 그 역도 이 호선에서 찾을 수 있게 함
+                self.station_lines[self.keys[alias]].add(line)
+        return station_id
+
+    def _insert(self, key, station_id):
+        self.keys[key] = station_id
+        jamo = decompose(key)
+        for variant in deletions(jamo, MAX_INDEXED_DISTANCE):
+            self.deletes.setdefault(variant, []).append((jamo, station_id))
+        node = self.trie
+        node.ids.append(station_id)
+        for char in jamo:
+            node = node.children.setdefault(char, _Node())
+            if not node.ids or node.ids[-1] != station_id:
+                node.ids.append(station_id)
+        node.terminal = station_id
+
+    def _on_line(self, station_id, line):
+        return line is None or line in self.station_lines[station_id]
+
+    def lookup(self, name, line=None):
+        """표기 차이만 허용하는 정확한 조회 (없으면 None)"""
+        station_id = self.keys.get(name_key(name))
+        if station_id is None or not self._on_line(station_id, line):
+            return None
+        return station_id
+
+    def search(self, prefix, limit=10, line=None):
+        """접두사로 시작하는 역 번호 목록 (짧은 이름, 이름 순)"""
+        node = self.trie
+        for char in decompose(name_key(prefix)):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        ids = [i for i in dict.fromkeys(node.ids) if self._on_line(i, line)]
+        ids.sort(key=lambda i: (len(self.names[i]), self.names[i]))
+        return ids[:limit]
+
+    def fuzzy(self, name, max_distance=None, line=None, prefix=False):
+        """자모 단위 편집 거리가 max_distance 이하인 역의 [(역 번호, 거리), ...] (가까운 순)
+
+        max_distance가 없으면 이름 길이에 따라 1~2 (자모 8개당 1)
+        prefix=True면 이름 전체가 아니라 앞부분과의 거리로 비교 (입력 중인 이름의 오타용)
+        """
+        target = decompose(name_key(name))
+        if max_distance is None:
+            max_distance = min(2, max(1, len(target) // 8))
+        if prefix or max_distance > MAX_INDEXED_DISTANCE:
+            best = self._walk(target, max_distance, line, prefix)
+        else:
+            # 거리가 d 이하인 두 문자열은 각각 d개 이하를 지우면 같은 문자열이 되므로 삭제 색인으로 후보를 찾음
+            best = {}
+            for variant in deletions(target, max_distance):
+                for jamo, station_id in self.deletes.get(variant, ()):
+                    if not self._on_line(station_id, line):
+                        continue
+                    distance = edit_distance(target, jamo, max_distance)
+                    if distance <= max_distance and distance < best.get(station_id, max_distance + 1):
+                        best[station_id] = distance
+        return sorted(best.items(), key=lambda item: (item[1], len(self.names[item[0]]), self.names[item[0]]))
+
+    def _walk(self, target, max_distance, line, prefix):
+        """트리를 따라 내려가며 편집 거리 표를 한 행씩 계산해 {역 번호: 거리} 반환"""
+        best = {}
+        first = list(range(len(target) + 1))
+        stack = [(child, char, first) for char, child in self.trie.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for c in range(1, len(target) + 1):
+                row.append(min(row[c - 1] + 1, previous[c] + 1, previous[c - 1] + (target[c - 1] != char)))
+            if row[-1] <= max_distance:
+                matched = node.ids if prefix else [] if node.terminal is None else [node.terminal]
+                for station_id in matched:
+                    if self._on_line(station_id, line) and row[-1] < best.get(station_id, max_distance + 1):
+                        best[station_id] = row[-1]
+            # 행의 최솟값이 한도를 넘으면 이 아래 키는 모두 한도를 넘으므로 가지치기
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+        return best
+
+    def resolve(self, name, line=None, max_distance=None):
+        """이름을 역 번호로 변환 (정확한 조회 → 가장 가까운 오타 후보가 하나뿐이면 그 역, 아니면 None)"""
+        station_id = self.lookup(name, line)
+        if station_id is not None:
+            return station_id
+        candidates = self.fuzzy(name, max_distance, line)
+        if not candidates or (len(candidates) > 1 and candidates[1][1] == candidates[0][1]):
+            return None
+        return candidates[0][0]
+
+    def resolve_name(self, name, line=None, max_distance=None):
+        """이름을 대표 표기로 변환 (찾지 못하면 None)"""
+        station_id = self.resolve(name, line, max_distance)
+        return None if station_id is None else self.names[station_id]
@@ -0,0 +1,161 @@
+import json
+import os
+
+# 원본마다 따로 저장 (같은 달을 Open API와 CSV가 서로 덮어쓰지 않게)
+PARQUET_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'parquet')
+DEFAULT_DATASET_DIR = os.path.join(PARQUET_ROOT, 'api')
+CSV_DATASET_DIR = os.path.join(PARQUET_ROOT, 'csv')
+PARTITION_COLS = ['월', '호선']
+# 밑줄로 시작하는 파일은 pyarrow 데이터셋이 읽지 않음
+SOURCES_NAME = '_sources.json'
+
+
+def _pyarrow():
+    """pyarrow는 Parquet 저장/읽기에서만 필요하므로 사용할 때 불러옴"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet 저장소를 사용하려면 pyarrow가 필요합니다 (pip install pyarrow)")
+    return pyarrow
+
+
+def _partitioning(pa):
+    # '202309'가 정수로 추론되지 않도록 파티션 컬럼 자료형을 문자열로 고정
+    schema = pa.schema([('월', pa.string()), ('호선', pa.string())])
+    return pa.dataset.partitioning(schema, flavor='hive')
+
+
+def dataset_months(dataset_dir=DEFAULT_DATASET_DIR):
+    """저장된 달 목록 (월=YYYYMM 디렉터리 이름으로 확인하므로 pyarrow 없이 동작)"""
+    if not os.path.isdir(dataset_dir):
+        return []
+    return sorted(name.split('=', 1)[1] for name in os.listdir(dataset_dir) if name.startswith('월='))
+
+
+def write_dataset(df, dataset_dir=DEFAULT_DATASET_DIR, month=None):
+    """전처리 결과를 월/호선별로 나눈 Parquet 데이터셋으로 저장
+
+    df에 '월' 컬럼이 없으면 month를 사용하고, 저장되는 (월, 호선) 파티션은 새 데이터로 덮어씀
+    """
+    pa = _pyarrow()
+    frame = df.copy()
+    if '월' not in frame:
+        frame.insert(0, '월', month)
+    for col in PARTITION_COLS:
+        frame[col] = frame[col].astype(str)
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pa.dataset.write_dataset(table, dataset_dir, format='parquet', partitioning=_partitioning(pa),
+                             existing_data_behavior='delete_matching',
+                             basename_template='part-{i}.parquet')
+    return sorted(frame['월'].unique())
+
+
+def _filter(pa, months=None, lines=None, year=None):
+    """파티션 조건식 (조건에 맞지 않는 디렉터리는 열지 않음)"""
+    field = pa.dataset.field
+    conditions = []
+    if year is not None:
+        months = [f"{year}{m:02d}" for m in range(1, 13)] if months is None else \
+            [month for month in months if month.startswith(str(year))]
+    if months is not None:
+        conditions.append(field('월').isin([str(month) for month in months]))
+    if lines is not None:
+        conditions.append(field('호선').isin(list(lines)))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def dataset_files(dataset_dir=DEFAULT_DATASET_DIR, months=None, lines=None, year=None):
+    """조건에 맞는 파티션의 Parquet 파일 목록"""
+    pa = _pyarrow()
+    dataset = pa.dataset.dataset(dataset_dir, format='parquet', partitioning=_partitioning(pa))
+    return [fragment.path for fragment in dataset.get_fragments(filter=_filter(pa, months, lines, year))]
+
+
+def read_dataset(dataset_dir=DEFAULT_DATASET_DIR, columns=None, months=None, lines=None, year=None):
+    """Parquet 데이터셋을 필요한 컬럼(columns)과 파티션(months, lines, year)만 골라 읽기
+
+    예: read_dataset(columns=['역명', '시간', '승차인원'], lines=['2호선'], year=2023)
+    """
+    pa = _pyarrow()
+    dataset = pa.dataset.dataset(dataset_dir, format='parquet', partitioning=_partitioning(pa))
+    table = dataset.to_table(columns=columns, filter=_filter(pa, months, lines, year))
+    df = table.to_pandas()
+    for col in PARTITION_COLS:
+        if col in df:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def source_signature(file_path):
+    """원본 파일이 바뀌었는지 확인하기 위한 (경로, 크기, 수정 시각)"""
+    stat = os.stat(file_path)
+    return {'path': os.path.abspath(file_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def load_sources(dataset_dir=DEFAULT_DATASET_DIR):
+    path = os.path.join(dataset_dir, SOURCES_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def partition_fingerprint(dataset_dir, month):
+    """한 달 파티션의 파일 목록과 (크기, 수정 시각), 파티션이 없으면 None
+
+    다른 원본이 같은 달을 다시 쓰면 파일이 새로 만들어지므로 값이 달라짐
+    """
+    root = os.path.join(dataset_dir, f"월={month}")
+    if not os.path.isdir(root):
+        return None
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            files.append([os.path.relpath(path, root), stat.st_size, stat.st_mtime_ns])
+    return sorted(files)
+
+
+def save_source(dataset_dir, file_path, months):
+    """원본 파일에서 저장한 달 목록과 저장 직후의 파티션 상태 기록 (다음 실행에서 원본을 다시 읽지 않기 위함)"""
+    sources = load_sources(dataset_dir)
+    signature = source_signature(file_path)
+    sources[signature['path']] = dict(signature, months=list(months),
+                                      partitions={month: partition_fingerprint(dataset_dir, month)
+                                                  for month in months})
+    path = os.path.join(dataset_dir, SOURCES_NAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(sources, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def exported_months(dataset_dir, file_path):
+    """원본 파일이 그대로이고 그 달들이 저장한 그대로 남아 있으면 달 목록, 아니면 None
+
+    다른 원본이 같은 달 파티션을 덮어썼으면(파일 상태가 기록과 다르면) None
+    """
+    entry = load_sources(dataset_dir).get(os.path.abspath(file_path))
+    if entry is None or not os.path.exists(file_path):
+        return None
+    signature = source_signature(file_path)
+    if entry['size'] != signature['size'] or entry['mtime'] != signature['mtime']:
+        return None
+    partitions = entry.get('partitions', {})
+    for month in entry['months']:
+        fingerprint = partition_fingerprint(dataset_dir, month)
+        if fingerprint is None or partitions.get(month) != fingerprint:
+            return None
+    return entry['months']
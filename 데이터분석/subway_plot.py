@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # 화면 없이 파일로만 저장 (작업 프로세스에서도 동일)
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# 한글 폰트 설정
+plt.rcParams['font.family'] = 'Malgun Gothic'
+plt.rcParams['axes.unicode_minus'] = False
+
+# 그림 모양을 바꾸면 올려서 기존 PNG를 모두 다시 그리게 함
+RENDER_VERSION = 2
+MANIFEST_NAME = 'chart_manifest.json'
+TIME_ORDER = [f"{i}시" for i in range(24)]
+
+
+def chart_paths(line, output_dir='.'):
+    """호선별 (라인 그래프, 히트맵) 파일 경로"""
+    return (os.path.join(output_dir, f'subway_time_stats_{line}.png'),
+            os.path.join(output_dir, f'subway_time_heatmap_{line}.png'))
+
+
+def extract_line_payloads(cube, top_stations_by_line, lines):
+    """호선마다 상위 역의 (역, 시간, 승하차) 배열을 한 번만 꺼내 그리기 작업 단위로 묶기"""
+    payloads = []
+    for line in lines:
+        top_stations = top_stations_by_line.get(line)
+        if not top_stations or line not in cube.line_index:
+            continue
+        station_hours = np.stack([cube.station(line, station) for station in top_stations])
+        payloads.append({'line': line, 'stations': list(top_stations), 'station_hours': station_hours})
+    return payloads
+
+
+def content_hash(payload):
+    """그림에 들어가는 데이터(호선, 역 수, 역 이름, 배열)와 그리기 버전의 해시"""
+    digest = hashlib.sha256()
+    stations = payload['stations']
+    digest.update(f"{RENDER_VERSION}|{payload['line']}|{len(stations)}|{'|'.join(stations)}".encode('utf-8'))
+    digest.update(np.ascontiguousarray(payload['station_hours'], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def render_line_charts(payload, output_dir='.', timings=None):
+    """한 호선의 시간대별 라인 그래프와 히트맵 저장
+
+    timings(dict)가 주어지면 그림 파일별 (경과 시간, CPU 시간)을 기록
+    """
+    line = payload['line']
+    top_stations = payload['stations']
+    station_hours = payload['station_hours']
+    stats_path, heatmap_path = chart_paths(line, output_dir)
+    # 제목의 역 수는 실제로 그린 역 수 (plot -k로 바꿀 수 있고, 역이 k개보다 적은 호선도 있음)
+    k = len(top_stations)
+
+    # 라인 그래프
+    wall, cpu = time.perf_counter(), time.process_time()
+    plt.figure(figsize=(15, 10))
+
+    for position, (label, d) in enumerate([('승차', 0), ('하차', 1)], 1):
+        plt.subplot(2, 1, position)
+        for station, hours in zip(top_stations, station_hours):
+            plt.plot(TIME_ORDER, hours[:, d], label=station, marker='o')
+
+        plt.title(f'{line} 상위 {k}개 역의 시간대별 {label} 인원')
+        plt.xlabel('시간')
+        plt.ylabel(f'{label} 인원')
+        plt.xticks(TIME_ORDER, rotation=45)
+        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+        plt.grid(True)
+
+    plt.tight_layout()
+    plt.savefig(stats_path, bbox_inches='tight')
+    plt.close()
+    if timings is not None:
+        timings[stats_path] = (time.perf_counter() - wall, time.process_time() - cpu)
+
+    # 히트맵 생성
+    wall, cpu = time.perf_counter(), time.process_time()
+    plt.figure(figsize=(15, 12))
+
+    for position, (label, d) in enumerate([('승차', 0), ('하차', 1)], 1):
+        plt.subplot(2, 1, position)
+        sns.heatmap(station_hours[:, :, d],
+                    xticklabels=TIME_ORDER,
+                    yticklabels=top_stations,
+                    cmap='YlOrRd',
+                    fmt='.0f',
+                    cbar_kws={'label': f'{label} 인원'})
+
+        plt.title(f'{line} 상위 {k}개 역의 시간대별 {label} 인원 히트맵')
+        plt.xlabel('시간')
+        plt.ylabel('역명')
+
+    plt.tight_layout()
+    plt.savefig(heatmap_path, bbox_inches='tight')
+    plt.close()
+    if timings is not None:
+        timings[heatmap_path] = (time.perf_counter() - wall, time.process_time() - cpu)
+
+    return line
+
+
+def render_line_charts_timed(payload, output_dir='.'):
+    """작업 프로세스에서 그린 뒤 (호선, 그림 파일별 시간)을 돌려받기 위한 함수"""
+    timings = {}
+    return render_line_charts(payload, output_dir, timings), timings
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def render_charts(cube, top_stations_by_line, lines, output_dir='.', workers=None, force=False,
+                  timings=None):
+    """바뀐 호선의 그림만 프로세스 풀에서 병렬로 그리기
+
+    timings(dict)가 주어지면 다시 그린 그림 파일별 (경과 시간, CPU 시간)을 기록
+    반환값: (다시 그린 호선 목록, 변경이 없어 건너뛴 호선 목록)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+
+    pending, skipped = [], []
+    for payload in extract_line_payloads(cube, top_stations_by_line, lines):
+        digest = content_hash(payload)
+        exists = all(os.path.exists(path) for path in chart_paths(payload['line'], output_dir))
+        if not force and exists and manifest.get(payload['line']) == digest:
+            skipped.append(payload['line'])
+        else:
+            pending.append((payload, digest))
+
+    rendered = []
+    if pending:
+        if workers == 1 or len(pending) == 1:
+            results = [render_line_charts_timed(payload, output_dir) for payload, _ in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(render_line_charts_timed,
+                                            [payload for payload, _ in pending],
+                                            [output_dir] * len(pending)))
+        for (payload, digest), (line, chart_timings) in zip(pending, results):
+            if timings is not None:
+                timings.update(chart_timings)
+            manifest[line] = digest
+            rendered.append(line)
+        save_manifest(output_dir, manifest)
+
+    return rendered, skipped
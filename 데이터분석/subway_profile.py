@@ -0,0 +1,169 @@
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'profiles')
+MB = 1024 * 1024
+
+
+def current_rss():
+    """현재 프로세스 메모리(RSS, 바이트), psutil이 없으면 None"""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def max_rss():
+    """지금까지의 최대 RSS(바이트), 확인할 수 없으면 None"""
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # 리눅스는 KB, macOS는 바이트 단위
+        return usage if sys.platform == 'darwin' else usage * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+def _mb(value):
+    return None if value is None else round(value / MB, 3)
+
+
+class StageProfiler:
+    """실행 단계별 경과 시간, CPU 시간, 메모리, 처리 행 수를 모아 JSON 보고서로 저장
+
+    사용 예:
+        profiler = StageProfiler(enabled=True)
+        with profiler.stage('전처리', rows_in=len(raw)) as stage:
+            df = preprocess_data(raw)
+            stage['rows'] = len(df)
+        profiler.save('subway_analysis')
+
+    - enabled=False면 측정하지 않음 (stage는 값을 적어도 버려지는 dict를 돌려줌)
+    - trace_memory=True면 tracemalloc으로 단계 안에서 새로 잡은 최대 메모리(traced_peak_mb)를 기록
+      (numpy 배열 할당도 포함되지만 작은 객체를 많이 만드는 단계는 몇 배 느려지므로
+      정확한 시간이 필요하면 trace_memory=False로 따로 측정)
+    """
+
+    def __init__(self, enabled=False, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages = []
+        self.started = datetime.now()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._frames = []
+        self._started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def stop(self):
+        """이 측정기가 시작한 tracemalloc을 멈춤 (이후 코드가 느려지지 않도록)"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        """with 블록 하나를 단계로 측정 (블록 안에서 돌려받은 dict에 rows 등 값을 추가)"""
+        record = {'name': name}
+        record.update(info)
+        if not self.enabled:
+            yield record
+            return
+
+        # 바깥 단계가 안쪽 단계보다 먼저 나오도록 시작할 때 추가
+        record['depth'] = len(self._frames)
+        self.stages.append(record)
+        frame = {'child_peak': 0}
+        if self.trace_memory:
+            # 바깥 단계의 최대값을 보존한 뒤 이 단계 기준으로 최대값을 다시 잼
+            traced, peak = tracemalloc.get_traced_memory()
+            frame['outer_peak'] = peak
+            frame['start'] = traced
+            tracemalloc.reset_peak()
+        self._frames.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall, 6)
+            record['cpu_s'] = round(time.process_time() - cpu, 6)
+            self._frames.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+                record['traced_peak_mb'] = _mb(peak - frame['start'])
+                if self._frames:
+                    parent = self._frames[-1]
+                    parent['child_peak'] = max(parent['child_peak'], frame['outer_peak'], peak)
+            record['rss_mb'] = _mb(current_rss())
+            record['max_rss_mb'] = _mb(max_rss())
+
+    def record(self, name, wall_s, cpu_s=None, **info):
+        """다른 프로세스에서 측정한 값처럼 직접 잰 단계를 추가"""
+        if not self.enabled:
+            return
+        record = {'name': name, 'wall_s': round(wall_s, 6)}
+        if cpu_s is not None:
+            record['cpu_s'] = round(cpu_s, 6)
+        record.update(info)
+        record['depth'] = len(self._frames)
+        self.stages.append(record)
+
+    def report(self, script=None):
+        """기계가 읽을 수 있는 실행 보고서 (dict)"""
+        return {
+            'script': script,
+            'started': self.started.isoformat(timespec='seconds'),
+            'argv': sys.argv,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'wall_s': round(time.perf_counter() - self._wall, 6),
+            'cpu_s': round(time.process_time() - self._cpu, 6),
+            'max_rss_mb': _mb(max_rss()),
+            'stages': self.stages
+        }
+
+    def save(self, script, output_dir=DEFAULT_PROFILE_DIR):
+        """보고서를 output_dir/{script}-{시작 시각}.json으로 저장하고 경로 반환 (측정하지 않았으면 None)"""
+        if not self.enabled:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{script}-{self.started:%Y%m%d-%H%M%S-%f}.json")
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(script), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    def print_summary(self):
+        """단계별 측정 결과 표 출력"""
+        if not self.enabled:
+            return
+        print("\n=== 단계별 실행 시간/메모리 ===")
+        for record in self.stages:
+            name = '  ' * record['depth'] + record['name']
+            memory = record.get('traced_peak_mb')
+            rows = record.get('rows')
+            print(f"{name}: {record['wall_s'] * 1000:.1f}ms"
+                  + (f" (CPU {record['cpu_s'] * 1000:.1f}ms)" if 'cpu_s' in record else '')
+                  + (f", 메모리 +{memory:.1f}MB" if memory is not None else '')
+                  + (f", {rows}행" if rows is not None else ''))
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from subway_cube import HOURS
+from subway_schema import PEAK_HOURS
+from subway_stats import GROUP_COLUMNS, cube_groups
+from subway_window import hours_label
+
+
+def make_windows(peak_hours=PEAK_HOURS):
+    """비교할 시간대 목록 (출퇴근 시간대 전체, 오전/오후 피크, 각 시간대 vs 나머지 시간)"""
+    morning = [hour for hour in peak_hours if hour < 12]
+    evening = [hour for hour in peak_hours if hour >= 12]
+    windows = [(f"출퇴근({hours_label(peak_hours)})", list(peak_hours))]
+    if morning and evening:
+        windows += [(f"오전 피크({hours_label(morning)})", morning),
+                    (f"오후 피크({hours_label(evening)})", evening)]
+    return dict(windows + [(f"{hour}시", [hour]) for hour in range(HOURS)])
+
+
+# 기본으로 비교할 시간대
+DEFAULT_WINDOWS = make_windows()
+
+
+def rank_within_groups(values, groups, n_groups):
+    """그룹마다 값을 한 번만 정렬해 평균 순위(동점은 평균 순위)를 매김
+
+    반환값: (값마다 순위, 그룹별 표본 수, 그룹별 동점 보정항 sum(t^3 - t))
+    """
+    order = np.lexsort((values, groups))
+    sorted_values, sorted_groups = values[order], groups[order]
+    n = len(values)
+
+    # 같은 그룹 안에서 값이 같은 연속 구간(동점 묶음) 찾기
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (sorted_groups[1:] != sorted_groups[:-1]) | (sorted_values[1:] != sorted_values[:-1])
+    run_start = np.flatnonzero(new_run)
+    run_len = np.diff(np.append(run_start, n))
+    run_id = np.cumsum(new_run) - 1
+
+    # 그룹 안에서의 위치(0부터)로 동점 묶음의 평균 순위 계산
+    group_start = np.searchsorted(sorted_groups, sorted_groups[run_start], side='left')
+    first_rank = run_start - group_start + 1
+    run_rank = first_rank + (run_len - 1) / 2
+
+    ranks = np.empty(n)
+    ranks[order] = run_rank[run_id]
+    sizes = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    tie_term = np.bincount(sorted_groups[run_start], weights=run_len.astype(np.float64) ** 3 - run_len,
+                           minlength=n_groups)
+    return ranks, sizes, tie_term
+
+
+def mannwhitney_from_ranks(ranks, groups, mask, sizes, tie_term):
+    """미리 계산한 순위로 그룹별 Mann-Whitney U 검정 (mask=True가 첫 번째 집단)
+
+    scipy.stats.mannwhitneyu(method='asymptotic', use_continuity=True)와 같은 양측 검정
+    반환값: (첫 번째 집단의 U, p-value, 순위 이연 상관계수)
+    """
+    # scipy.stats.norm.sf와 같은 값이지만 scipy.stats 전체를 불러오지 않음 (시작 시간 단축)
+    from scipy import special
+    n_groups = len(sizes)
+    n1 = np.bincount(groups[mask], minlength=n_groups).astype(np.float64)
+    n2 = sizes - n1
+    rank_sum = np.bincount(groups[mask], weights=ranks[mask], minlength=n_groups)
+    u1 = rank_sum - n1 * (n1 + 1) / 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = sizes
+        mu = n1 * n2 / 2
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        u = np.maximum(u1, n1 * n2 - u1)
+        z = (u - mu - 0.5) / sigma
+        p_value = np.clip(2 * special.ndtr(-z), 0, 1)
+        rank_biserial = 2 * u1 / (n1 * n2) - 1
+    invalid = (n1 == 0) | (n2 == 0)
+    p_value[invalid] = np.nan
+    return u1, p_value, rank_biserial
+
+
+def adjust_pvalues(p_values, method='fdr_bh'):
+    """다중비교 보정 (method: 'fdr_bh'=Benjamini-Hochberg, 'holm'=Holm-Bonferroni), NaN은 그대로 둠"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full_like(p_values, np.nan)
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    m = len(p)
+    if m == 0:
+        return adjusted
+
+    order = np.argsort(p)
+    ranked = p[order]
+    if method == 'holm':
+        values = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    elif method == 'fdr_bh':
+        values = np.minimum.accumulate((m / np.arange(m, 0, -1) * ranked[::-1]))[::-1]
+    else:
+        raise ValueError(f"지원하지 않는 보정 방법입니다: {method}")
+
+    result = np.empty(m)
+    result[order] = np.minimum(values, 1)
+    adjusted[valid] = result
+    return adjusted
+
+
+def mannwhitney_windows(cube, by='line', metric='총이용객', windows=None, correction='fdr_bh'):
+    """그룹별로 한 번 매긴 순위를 재사용해 여러 시간대(각 시간대 vs 나머지)의 Mann-Whitney U 검정 수행
+
+    반환값: 그룹 × 시간대 결과 표 (보정된 p-value 포함)
+    """
+    windows = DEFAULT_WINDOWS if windows is None else windows
+    groups, names = cube_groups(cube, by)
+    values = cube.metric(metric)[cube.observed]
+    hour_idx = np.nonzero(cube.observed)[2]
+    ranks, sizes, tie_term = rank_within_groups(values, groups, len(names))
+
+    frames = []
+    for window_name, hours in windows.items():
+        selected = np.zeros(HOURS, dtype=bool)
+        selected[list(hours)] = True
+        u1, p_value, rank_biserial = mannwhitney_from_ranks(ranks, groups, selected[hour_idx], sizes, tie_term)
+
+        frame = pd.DataFrame(names, columns=GROUP_COLUMNS[by])
+        frame['시간대'] = window_name
+        frame['U'] = u1
+        frame['p-value'] = p_value
+        frame['순위 이연 상관'] = rank_biserial
+        frames.append(frame)
+
+    result = pd.concat(frames, ignore_index=True)
+    result['보정 p-value'] = adjust_pvalues(result['p-value'].to_numpy(), correction)
+    return result
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from subway_cube import parse_hours
+
+# 출퇴근 피크시간대 (오전 7-9시, 오후 5-7시)
+PEAK_HOURS = list(range(7, 10)) + list(range(17, 20))
+COUNT_COLUMNS = ['승차인원', '하차인원', '총이용객']
+
+
+def count_dtype(values):
+    """인원 수에 맞는 정수 자료형 (보통 int32, 여러 달 합계가 int32 범위를 넘으면 int64)"""
+    if len(values) and np.abs(values).max() > np.iinfo(np.int32).max:
+        return np.int64
+    return np.int32
+
+
+def to_compact_frame(df, peak_hours=PEAK_HOURS):
+    """전처리 결과를 작은 자료형으로 변환
+
+    호선/역명: category, 시간: uint8 (0~23), 인원: int32, 피크: peak_hours에 속하는지 여부(bool)
+    (월 컬럼이 있으면 category로 유지)
+    """
+    result = pd.DataFrame({
+        '호선': df['호선'].astype(str).astype('category'),
+        '역명': df['역명'].astype(str).astype('category'),
+        '시간': parse_hours(df['시간']).astype(np.uint8)
+    }, index=df.index)
+
+    for col in ['승차인원', '하차인원']:
+        values = np.rint(pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float64))
+        result[col] = values.astype(count_dtype(values))
+    total = result['승차인원'].to_numpy(dtype=np.int64) + result['하차인원'].to_numpy(dtype=np.int64)
+    result['총이용객'] = total.astype(count_dtype(total))
+
+    result['피크'] = np.isin(result['시간'].to_numpy(), list(peak_hours))
+    if '월' in df:
+        result.insert(0, '월', df['월'].astype(str).astype('category'))
+    return result
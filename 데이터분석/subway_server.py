@@ -0,0 +1,289 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from subway_cube import DIRECTIONS, HOURS, METRICS
+from subway_names import StationIndex
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+DEFAULT_CACHE_SIZE = 4096
+MAX_REQUEST_BYTES = 8192
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+
+class LRUCache:
+    """최근에 쓴 maxsize개의 질의 결과만 남기는 메모리 캐시 (maxsize=0이면 저장하지 않음)"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """저장된 값 반환, 없으면 None"""
+        value = self.items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'size': len(self.items), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else None}
+
+
+class CongestionIndex:
+    """큐브를 한 번 읽어 (호선, 역, 시간) 질의에 메모리에서 바로 답하는 색인
+
+    - 지표별 (호선, 역, 시간) 배열과 시간 축 누적합을 미리 만들어 두고
+      [start, end) 시간대 합계를 역마다 O(1)로 계산 (자정을 넘는 구간 허용)
+    - 호선·역 이름은 큐브의 사전(line_index, station_index)으로 번호를 찾고, 없으면 역 이름 색인(StationIndex)으로
+      '강남역', '강넘'처럼 표기가 다르거나 오타가 난 이름도 그 호선의 역으로 찾음
+    질의 인자가 잘못되면 ValueError, 없는 호선·역이면 KeyError
+    """
+
+    def __init__(self, cube):
+        self.cube = cube
+        # (호선 번호, 역 번호) → 큐브의 역 위치 (예전 저장소처럼 큐브에 대표 표기가 아닌 이름이 있어도 찾을 수 있게)
+        self.names = StationIndex()
+        self.slots = {}
+        for i, (line, names) in enumerate(zip(cube.lines, cube.stations)):
+            for j, name in enumerate(names):
+                self.slots[i, self.names.add(name, line)] = j
+        self.metrics = {metric: np.ascontiguousarray(cube.metric(metric)) for metric in METRICS}
+        self.prefix = {metric: np.concatenate([np.zeros(data.shape[:2] + (1,)), np.cumsum(data, axis=2)], axis=2)
+                       for metric, data in self.metrics.items()}
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.metrics.values()) + sum(a.nbytes for a in self.prefix.values())
+
+    def locate(self, line, station=None):
+        """호선(과 역) 이름을 (호선 번호, 역 번호)로 변환"""
+        if line not in self.cube.line_index:
+            raise KeyError(f"없는 호선입니다: {line}")
+        i = self.cube.line_index[line]
+        if station is None:
+            return i, None
+        j = self.cube.station_index[i].get(station)
+        if j is None:
+            station_id = self.names.resolve(station, line)
+            if station_id is None:
+                raise KeyError(f"{line}에 없는 역입니다: {station}")
+            j = self.slots[i, station_id]
+        return i, j
+
+    def search(self, prefix, limit=10, line=None):
+        """입력 중인 이름(자모 단위 접두사)으로 역 이름 목록 검색 (오타가 있으면 가까운 이름)"""
+        if line is not None:
+            self.locate(line)
+        ids = self.names.search(prefix, limit, line)
+        if not ids:
+            ids = [station_id for station_id, _ in self.names.fuzzy(prefix, line=line, prefix=True)[:limit]]
+        return {'query': prefix, 'line': line,
+                'stations': [{'station': self.names.names[i], 'lines': sorted(self.names.station_lines[i])}
+                             for i in ids]}
+
+    def _window(self, prefix, start, end):
+        """누적합 배열(..., 25)에서 [start, end) 시간대 합계"""
+        total = prefix[..., end] - prefix[..., start]
+        return total + prefix[..., HOURS] if start > end else total
+
+    def point(self, line, station, hour):
+        """한 역 한 시간의 승차/하차/총이용객"""
+        i, j = self.locate(line, station)
+        cell = self.cube.values[i, j, hour]
+        return {'line': line, 'station': self.cube.stations[i][j], 'hour': hour,
+                **{direction: float(cell[d]) for d, direction in enumerate(DIRECTIONS)},
+                '총이용객': float(cell.sum()), 'observed': bool(self.cube.observed[i, j, hour])}
+
+    def window(self, line, station, start, end, metric='총이용객'):
+        """한 역의 [start, end) 시간대 인원 합계와 하루 전체 대비 비율"""
+        i, j = self.locate(line, station)
+        prefix = self.prefix[metric][i, j]
+        total = float(self._window(prefix, start, end))
+        day = float(prefix[HOURS])
+        return {'line': line, 'station': self.cube.stations[i][j], 'start': start, 'end': end, 'metric': metric,
+                'total': total, 'share': round(total / day, 6) if day else None}
+
+    def top(self, line, k=10, metric='총이용객', start=0, end=HOURS):
+        """한 호선에서 [start, end) 시간대 인원이 많은 상위 k개 역 (동률이면 역 이름 순)"""
+        i, _ = self.locate(line)
+        count = int(self.cube.station_counts[i])
+        totals = self._window(self.prefix[metric][i, :count], start, end)
+        # 한 호선의 역은 수십 개라 CongestionCube.top_k처럼 stable 정렬로 충분함
+        positions = np.argsort(-totals, kind='stable')[:k]
+        stations = self.cube.stations[i]
+        return {'line': line, 'metric': metric, 'start': start, 'end': end,
+                'stations': [{'station': stations[p], 'total': float(totals[p])} for p in positions]}
+
+
+def _text(params, name, default=None):
+    value = params.get(name, default)
+    if value is None or value == '':
+        raise ValueError(f"{name} 값이 필요합니다")
+    return value
+
+
+def _int(params, name, default=None, low=0, high=HOURS):
+    """정수 인자 (low 이상 high 이하)"""
+    value = _text(params, name, default)
+    try:
+        value = int(str(value).removesuffix('시'))
+    except ValueError:
+        raise ValueError(f"{name}은(는) 정수여야 합니다: {value}") from None
+    if not low <= value <= high:
+        raise ValueError(f"{name}은(는) {low}~{high} 사이여야 합니다: {value}")
+    return value
+
+
+def _metric(params):
+    metric = params.get('metric') or '총이용객'
+    if metric not in METRICS:
+        raise ValueError(f"metric은 {', '.join(METRICS)} 중 하나여야 합니다: {metric}")
+    return metric
+
+
+class QueryService:
+    """URL 경로와 질의 인자를 색인 질의로 바꾸고 결과를 LRU 캐시에 저장
+
+    경로:
+        /point?line=2호선&station=강남&hour=8
+        /window?line=2호선&station=강남&start=7&end=10&metric=승차인원
+        /top?line=7호선&k=10&start=17&end=20&metric=하차인원
+        /search?q=강ㄴ&line=2호선&limit=10 (역 이름 자동 완성)
+        /stats (캐시 적중률, 처리한 요청 수)
+    start, end는 [start, end) 구간 (start > end면 자정을 넘는 구간)
+    """
+
+    def __init__(self, index, cache_size=DEFAULT_CACHE_SIZE):
+        self.index = index
+        self.cache = LRUCache(cache_size)
+        self.requests = 0
+        self.started = time.time()
+        self.routes = {'/point': self.point, '/window': self.window, '/top': self.top, '/search': self.search}
+
+    def point(self, params):
+        return self.index.point(_text(params, 'line'), _text(params, 'station'), _int(params, 'hour', high=HOURS - 1))
+
+    def window(self, params):
+        return self.index.window(_text(params, 'line'), _text(params, 'station'),
+                                 _int(params, 'start', high=HOURS - 1), _int(params, 'end', HOURS), _metric(params))
+
+    def top(self, params):
+        return self.index.top(_text(params, 'line'), _int(params, 'k', 10, low=1, high=1000), _metric(params),
+                              _int(params, 'start', 0, high=HOURS - 1), _int(params, 'end', HOURS))
+
+    def search(self, params):
+        return self.index.search(_text(params, 'q'), _int(params, 'limit', 10, low=1, high=100),
+                                 params.get('line') or None)
+
+    def stats(self):
+        return {'requests': self.requests, 'uptime_s': round(time.time() - self.started, 3),
+                'lines': len(self.index.cube.lines), 'stations': int(self.index.cube.station_counts.sum()),
+                'index_mb': round(self.index.nbytes / 1024 / 1024, 3), 'cache': self.cache.stats()}
+
+    def handle(self, target):
+        """요청 대상(경로?인자) 하나를 처리해 (상태 코드, 응답 본문 bytes) 반환"""
+        self.requests += 1
+        # 같은 인자를 다른 순서로 보낸 요청도 같은 캐시 항목을 쓰도록 인자를 정렬해 키로 사용
+        parts = urlsplit(target)
+        if parts.path == '/stats':
+            return 200, _json(self.stats())
+        params = dict(parse_qsl(parts.query))
+        key = (parts.path, tuple(sorted(params.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, body
+
+        route = self.routes.get(parts.path)
+        if route is None:
+            return 404, _json({'error': f"없는 경로입니다: {parts.path}", 'routes': sorted(self.routes) + ['/stats']})
+        try:
+            body = _json(route(params))
+        except KeyError as e:
+            return 404, _json({'error': e.args[0]})
+        except ValueError as e:
+            return 400, _json({'error': str(e)})
+        self.cache.put(key, body)
+        return 200, body
+
+
+def _json(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _response(status, body, keep_alive):
+    header = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+              "Content-Type: application/json; charset=utf-8\r\n"
+              f"Content-Length: {len(body)}\r\n"
+              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return header.encode('ascii') + body
+
+
+async def _handle_connection(service, reader, writer):
+    """연결 하나에서 들어오는 GET 요청을 차례로 처리 (HTTP/1.1 keep-alive)"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode('utf-8', errors='replace').split('\r\n')
+            parts = lines[0].split(' ')
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = (len(parts) == 3 and parts[2] == 'HTTP/1.1'
+                          and headers.get('connection', '').lower() != 'close')
+
+            if len(parts) != 3:
+                status, body, keep_alive = 400, _json({'error': "잘못된 요청입니다"}), False
+            elif parts[0] != 'GET':
+                status, body = 405, _json({'error': f"GET만 지원합니다: {parts[0]}"})
+            else:
+                try:
+                    status, body = service.handle(parts[1])
+                except Exception as e:
+                    status, body = 500, _json({'error': str(e)})
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(index, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, ready=None):
+    """색인을 HTTP로 제공 (멈출 때까지 실행)
+
+    ready: 서버가 열리면 (host, port)로 호출할 함수 (port=0이면 운영체제가 고른 포트)
+    """
+    service = QueryService(index, cache_size)
+    server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), host, port,
+                                        limit=MAX_REQUEST_BYTES)
+    host, port = server.sockets[0].getsockname()[:2]
+    if ready is not None:
+        ready(host, port)
+    async with server:
+        await server.serve_forever()
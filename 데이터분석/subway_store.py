@@ -0,0 +1,179 @@
+import json
+import os
+
+import numpy as np
+
+from subway_cube import DIRECTIONS, HOURS, CongestionCube, as_cube
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'store')
+META_NAME = 'meta.json'
+STORE_VERSION = 1
+
+# 원본 데이터에 없던 (호선, 역, 시간) 칸 표시 (인원은 0 이상이므로 음수로 구분)
+MISSING = -1
+
+
+def assemble_cube(parts):
+    """호선별 (호선, 역 이름 목록, (역, 시간, 승하차) 합계, (역, 시간) 관측 여부)로 큐브 생성
+
+    한 번도 관측되지 않은 역·호선은 빼고, 역 이름 순서는 CongestionCube.from_frame과 같게 정렬함
+    """
+    kept = []
+    for line, names, totals, present in parts:
+        names = np.array(names, dtype=object)
+        keep = np.flatnonzero(present.any(axis=1))
+        keep = keep[np.argsort(names[keep], kind='stable')]
+        if len(keep):
+            kept.append((line, list(names[keep]), totals[keep], present[keep]))
+
+    width = max((len(names) for _, names, _, _ in kept), default=0)
+    values = np.zeros((len(kept), width, HOURS, len(DIRECTIONS)))
+    observed = np.zeros((len(kept), width, HOURS), dtype=bool)
+    for k, (_, names, totals, present) in enumerate(kept):
+        values[k, :len(names)] = totals
+        observed[k, :len(names)] = present
+    return CongestionCube(values, [line for line, _, _, _ in kept], [names for _, names, _, _ in kept], observed)
+
+
+class RidershipStore:
+    """월별 (호선, 역, 시간, 승하차) 인원을 .npy 파일로 저장하는 메모리 맵 저장소
+
+    - {월}.npy: int32 배열, 없던 칸은 MISSING (np.memmap으로 열어 필요한 호선 부분만 읽음)
+    - meta.json: 호선/역 사전(호선·역 번호 = 처음 저장된 순서)과 월별 배열 모양
+
+    역 번호는 한 번 정해지면 바뀌지 않으므로 새 역이 생겨도 예전 달 파일은 그대로 둠
+    """
+
+    def __init__(self, path=DEFAULT_STORE_DIR):
+        self.path = path
+        self._maps = {}
+        meta_path = os.path.join(path, META_NAME)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'version': STORE_VERSION, 'lines': [], 'stations': {}, 'months': {}}
+
+    @property
+    def months(self):
+        return sorted(self.meta['months'])
+
+    @property
+    def lines(self):
+        return list(self.meta['lines'])
+
+    def has_month(self, month):
+        return month in self.meta['months']
+
+    def _month_path(self, month):
+        return os.path.join(self.path, f"{month}.npy")
+
+    def _save_meta(self):
+        path = os.path.join(self.path, META_NAME)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def write_month(self, month, data):
+        """한 달치 전처리 결과(데이터프레임 또는 큐브)를 저장 (같은 달이 있으면 덮어씀)"""
+        cube = as_cube(data)
+        lines, stations = self.meta['lines'], self.meta['stations']
+        for line, names in zip(cube.lines, cube.stations):
+            if line not in stations:
+                lines.append(line)
+                stations[line] = []
+            known = set(stations[line])
+            stations[line].extend(name for name in names if name not in known)
+
+        shape = (len(lines), max(len(stations[line]) for line in lines), HOURS, len(DIRECTIONS))
+        block = np.full(shape, MISSING, dtype=np.int32)
+        for i, (line, names) in enumerate(zip(cube.lines, cube.stations)):
+            slot = {name: j for j, name in enumerate(stations[line])}
+            rows = np.array([slot[name] for name in names], dtype=np.intp)
+            values = np.rint(cube.values[i, :len(names)]).astype(np.int32)
+            observed = cube.observed[i, :len(names)]
+            block[lines.index(line), rows] = np.where(observed[..., None], values, MISSING)
+
+        # 새 파일을 다 쓴 뒤에 이름을 바꾸고 메타데이터를 갱신 (중간에 멈춰도 저장소가 깨지지 않음)
+        os.makedirs(self.path, exist_ok=True)
+        self._maps.pop(month, None)
+        temp_path = self._month_path(month) + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, block)
+        os.replace(temp_path, self._month_path(month))
+        self.meta['months'][month] = list(shape)
+        self._save_meta()
+
+    def month_array(self, month):
+        """한 달치 배열을 읽기 전용 메모리 맵으로 열기 (처음 접근할 때 한 번만 엶)"""
+        if month not in self._maps:
+            if not self.has_month(month):
+                raise KeyError(f"저장소에 없는 달입니다: {month}")
+            self._maps[month] = np.load(self._month_path(month), mmap_mode='r')
+        return self._maps[month]
+
+    def line_history(self, line, months=None):
+        """한 호선의 월별 (역, 시간, 승하차) 배열 (n_months, 역 수, 24, 2), 없던 칸은 NaN
+
+        메모리 맵에서 해당 호선 부분(연속된 영역)만 읽음
+        """
+        months = self.months if months is None else list(months)
+        n_stations = len(self.meta['stations'][line])
+        history = np.full((len(months), n_stations, HOURS, len(DIRECTIONS)), np.nan)
+        for m, month in enumerate(months):
+            part = self._line_part(month, line)
+            history[m, :len(part)] = part
+        return history
+
+    def history(self, months=None, lines=None):
+        """선택한 달들의 (달, 호선, 역, 24, 2) 배열, 없던 칸은 NaN
+
+        호선·역 번호는 저장소 사전 순서 (lines가 주어지면 그 호선만, 주어진 순서대로)
+        """
+        months = self.months if months is None else list(months)
+        all_lines = self.meta['lines']
+        lines = all_lines if lines is None else [line for line in lines if line in self.meta['stations']]
+        rows = np.array([all_lines.index(line) for line in lines], dtype=np.intp)
+        width = max((len(self.meta['stations'][line]) for line in lines), default=0)
+        history = np.full((len(months), len(lines), width, HOURS, len(DIRECTIONS)), np.nan)
+        for m, month in enumerate(months):
+            array = self.month_array(month)
+            present = rows < array.shape[0]
+            part = np.asarray(array[rows[present], :min(width, array.shape[1])], dtype=np.float64)
+            part[part == MISSING] = np.nan
+            history[m, np.flatnonzero(present), :part.shape[1]] = part
+        return history
+
+    def _line_part(self, month, line):
+        """한 달치 배열에서 한 호선 부분을 float 배열로 읽기 (없던 칸은 NaN, 그 달 이후 생긴 역은 빠짐)"""
+        array = self.month_array(month)
+        i = self.meta['lines'].index(line)
+        if i >= array.shape[0]:
+            return np.empty((0, HOURS, len(DIRECTIONS)))
+        part = np.asarray(array[i, :min(len(self.meta['stations'][line]), array.shape[1])], dtype=np.float64)
+        part[part == MISSING] = np.nan
+        return part
+
+    def cube(self, months=None, lines=None):
+        """선택한 달들의 합계로 큐브 생성 (lines가 주어지면 그 호선만 읽음)
+
+        선택한 달에 한 번도 나오지 않은 역·호선은 빼고, 역 이름 순서는 CongestionCube.from_frame과 같게 정렬함
+        """
+        months = self.months if months is None else list(months)
+        lines = sorted(self.meta['lines'] if lines is None else [line for line in lines if line in self.meta['stations']])
+        parts = []
+        for line in lines:
+            # 달마다 한 호선 부분만 읽어 바로 합산 (메모리는 달 수와 관계없이 한 호선 크기)
+            n_stations = len(self.meta['stations'][line])
+            totals = np.zeros((n_stations, HOURS, len(DIRECTIONS)))
+            present = np.zeros((n_stations, HOURS), dtype=bool)
+            for month in months:
+                part = self._line_part(month, line)
+                totals[:len(part)] += np.nan_to_num(part)
+                present[:len(part)] |= ~np.isnan(part).all(axis=2)
+            parts.append((line, self.meta['stations'][line], totals, present))
+        return assemble_cube(parts)
+
+    def close(self):
+        self._maps.clear()
@@ -0,0 +1,226 @@
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from subway_fetch import PAGE_SIZE, page_ranges
+from subway_ingest import MonthJournal
+
+DEFAULT_LINES = [f"{i}호선" for i in range(1, 10)] + ['경의선', '공항철도', '분당선']
+# CardSubwayTime 응답의 시간 컬럼 순서 (첫차 시간대부터)
+API_HOURS = list(range(4, 24)) + [0, 1, 2, 3]
+
+# 시간별 상대 이용량 (0시~23시): 새벽 운행 중단, 오전 8시와 오후 6시에 출퇴근 피크
+HOUR_PROFILE = np.array([0.25, 0.03, 0.0, 0.0, 0.05, 0.35, 0.9, 2.6, 3.2, 1.6, 1.0, 1.0,
+                         1.05, 1.05, 1.05, 1.15, 1.4, 2.2, 2.8, 1.7, 1.2, 1.15, 1.0, 0.6])
+MORNING = [6, 7, 8, 9]
+EVENING = [17, 18, 19, 20]
+
+# 역 유형별 (오전 승차, 오전 하차, 오후 승차, 오후 하차) 배율
+# 주거 지역 역은 아침에 타고 저녁에 내리며, 업무 지역 역은 그 반대
+STATION_TYPES = {
+    '주거': (1.5, 0.5, 0.6, 1.4),
+    '업무': (0.5, 1.6, 1.5, 0.6),
+    '혼합': (1.0, 1.0, 1.0, 1.0)
+}
+TYPE_WEIGHTS = [0.5, 0.25, 0.25]
+
+SYLLABLES = list("가강경고공관광구군금남내노능당대도동마명목문미방백보봉부북사산상서석선성송수시신아안양역연오용원월은응을의이인장전정제중지창천청초충탄태파평포하학한합행현호화회효")
+
+
+def month_list(n_months, start_month='202201'):
+    """start_month부터 n_months개의 'YYYYMM' 목록"""
+    year, month = int(start_month[:4]), int(start_month[4:6])
+    months = []
+    for _ in range(n_months):
+        months.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def station_names(lines, stations_per_line, seed=0, transfer_rate=0.08):
+    """호선별 가상 역 이름 목록 (두세 글자 한글 이름, transfer_rate 비율은 다른 호선과 이름이 같은 환승역)"""
+    rng = np.random.default_rng(seed)
+    n = len(SYLLABLES)
+    total = len(lines) * stations_per_line
+    # 두 글자 이름을 먼저 쓰고 모자라면 세 글자 이름 사용 (중복 없이)
+    codes = rng.choice(n * n, size=min(total, n * n), replace=False).tolist()
+    if total > n * n:
+        codes += (n * n + rng.choice(n ** 3, size=total - n * n, replace=False)).tolist()
+
+    def decode(code):
+        if code < n * n:
+            return SYLLABLES[code // n] + SYLLABLES[code % n]
+        code -= n * n
+        return SYLLABLES[code // (n * n)] + SYLLABLES[code // n % n] + SYLLABLES[code % n]
+
+    names = [decode(code) for code in codes]
+    result = {}
+    for i, line in enumerate(lines):
+        line_names = names[i * stations_per_line:(i + 1) * stations_per_line]
+        if i > 0:
+            # 앞 호선의 역 이름을 일부 가져와 환승역으로 만듦
+            previous = [name for other in lines[:i] for name in result[other]]
+            for j in np.flatnonzero(rng.random(stations_per_line) < transfer_rate):
+                candidate = previous[rng.integers(len(previous))]
+                if candidate not in line_names:
+                    line_names[j] = candidate
+        result[line] = line_names
+    return result
+
+
+def ridership_counts(months, stations_per_line=70, lines=DEFAULT_LINES, seed=0):
+    """가상 월별 승하차 인원 (달, 호선, 역, 0~23시, 승차/하차) 정수 배열
+
+    - 역 규모는 로그정규 분포(소수의 큰 역에 이용객이 몰림), 호선마다 규모 배율이 다름
+    - 역 유형(주거/업무/혼합)에 따라 출퇴근 피크의 승차/하차 방향이 다름
+    - 달마다 계절 변동과 과분산 잡음(감마-포아송)을 더함
+    역 구성은 seed로만 정해지고 달별 잡음은 (seed, 달)로 정해지므로 어떤 달 목록을 골라도 같은 값이 나옴
+    """
+    rng = np.random.default_rng(seed)
+    n_lines = len(lines)
+    line_scale = rng.lognormal(0, 0.35, n_lines)
+    station_scale = rng.lognormal(np.log(2000), 0.9, (n_lines, stations_per_line)) * line_scale[:, None]
+    types = rng.choice(len(STATION_TYPES), size=(n_lines, stations_per_line), p=TYPE_WEIGHTS)
+
+    # (유형, 시간, 승하차) 시간 분포
+    shapes = np.repeat(HOUR_PROFILE[None, :, None], len(STATION_TYPES), axis=0).repeat(2, axis=2)
+    for t, (morning_on, morning_off, evening_on, evening_off) in enumerate(STATION_TYPES.values()):
+        shapes[t, MORNING, 0] *= morning_on
+        shapes[t, MORNING, 1] *= morning_off
+        shapes[t, EVENING, 0] *= evening_on
+        shapes[t, EVENING, 1] *= evening_off
+    mean = station_scale[:, :, None, None] * shapes[types]
+
+    counts = np.empty((len(months),) + mean.shape, dtype=np.int64)
+    for m, month in enumerate(months):
+        month_rng = np.random.default_rng([seed, int(month)])
+        season = 1 + 0.06 * np.sin(2 * np.pi * (int(month[4:6]) - 3) / 12) + month_rng.normal(0, 0.02)
+        noise = month_rng.gamma(20, 1 / 20, mean.shape)
+        counts[m] = month_rng.poisson(mean * season * noise)
+    return counts
+
+
+def make_card_subway_time(months, stations_per_line=70, seed=0, lines=DEFAULT_LINES, missing_rate=0.0):
+    """CardSubwayTime 응답과 같은 모양의 가상 데이터 생성 (한 행 = 한 달 한 역)
+
+    missing_rate: 비워 둘(NaN) 인원 값의 비율
+    """
+    rng = np.random.default_rng(seed + 1)
+    counts = ridership_counts(months, stations_per_line, lines, seed)
+    names = station_names(lines, stations_per_line, seed)
+    n = len(lines) * stations_per_line
+    frames = []
+    for m, month in enumerate(months):
+        frame = pd.DataFrame({
+            'USE_MM': month,
+            'SBWY_ROUT_LN_NM': np.repeat(lines, stations_per_line),
+            'STTN': [name for line in lines for name in names[line]],
+        })
+        values = counts[m].reshape(n, 24, 2).astype(np.float64)
+        if missing_rate:
+            values[rng.random(values.shape) < missing_rate] = np.nan
+        for hour in API_HOURS:
+            frame[f"HR_{hour}_GET_ON_NOPE"] = values[:, hour, 0]
+            frame[f"HR_{hour}_GET_OFF_NOPE"] = values[:, hour, 1]
+        frame['JOB_YMD'] = f"{month}03"
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def card_subway_time_rows(month, stations_per_line=70, seed=0, lines=DEFAULT_LINES, missing_rate=0.0):
+    """한 달치 CardSubwayTime JSON 행 목록 (NaN은 API처럼 null)"""
+    frame = make_card_subway_time([month], stations_per_line, seed, lines, missing_rate)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
+
+
+def card_subway_time_response(rows, start_index=1, end_index=None, endpoint='CardSubwayTime'):
+    """Open API 응답 JSON 한 페이지 (start_index~end_index, 1부터 시작)"""
+    end_index = len(rows) if end_index is None else end_index
+    return {endpoint: {
+        'list_total_count': len(rows),
+        'RESULT': {'CODE': 'INFO-000', 'MESSAGE': '정상 처리되었습니다'},
+        'row': rows[start_index - 1:end_index]
+    }}
+
+
+def write_raw_months(data_dir, months, stations_per_line=70, seed=0, lines=DEFAULT_LINES,
+                     page_size=PAGE_SIZE, endpoint='CardSubwayTime'):
+    """가상 데이터를 API에서 받은 것처럼 월별 저널(data_dir)에 저장 (네트워크 없이 파이프라인 실행용)"""
+    for month in months:
+        journal = MonthJournal(data_dir, endpoint, month)
+        if journal.is_complete():
+            continue
+        rows = card_subway_time_rows(month, stations_per_line, seed, lines)
+        if os.path.exists(journal.journal_path):
+            os.remove(journal.journal_path)
+        journal.write_header(len(rows), page_size)
+        for start_index, end_index in page_ranges(len(rows), page_size):
+            journal.commit_page((start_index, end_index), rows[start_index - 1:end_index])
+        journal.finalize()
+    return list(months)
+
+
+def make_station_hour_csv(months, stations_per_line=70, seed=0, lines=DEFAULT_LINES):
+    """'서울시 지하철 호선별 역별 시간대별 승하차 인원 정보' CSV와 같은 모양의 가상 데이터"""
+    counts = ridership_counts(months, stations_per_line, lines, seed)
+    names = station_names(lines, stations_per_line, seed)
+    n = len(lines) * stations_per_line
+    frames = []
+    # 최근 달이 위에 오는 원본 파일 순서
+    for m in reversed(range(len(months))):
+        frame = pd.DataFrame({
+            '사용월': int(months[m]),
+            '호선명': np.repeat(lines, stations_per_line),
+            '지하철역': [name for line in lines for name in names[line]],
+        })
+        values = counts[m].reshape(n, 24, 2)
+        for hour in API_HOURS:
+            label = f"{hour:02d}시-{(hour + 1) % 24:02d}시"
+            frame[f"{label} 승차인원"] = values[:, hour, 0]
+            frame[f"{label} 하차인원"] = values[:, hour, 1]
+        frame['작업일자'] = int(f"{months[m]}03")
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_station_hour_csv(path, months, stations_per_line=70, seed=0, lines=DEFAULT_LINES, encoding='cp949'):
+    """가상 CSV 파일 저장 (원본 파일과 같이 기본 인코딩은 cp949)"""
+    df = make_station_hour_csv(months, stations_per_line, seed, lines)
+    df.to_csv(path, index=False, encoding=encoding)
+    return df
+
+
+def write_station_order_csv(path, stations_per_line=70, seed=0, lines=DEFAULT_LINES, circular_lines=('2호선',)):
+    """가상 역 이름을 생성 순서대로 놓은 역 순서 파일 (호선, 순번, 역명, 순환) 저장"""
+    names = station_names(lines, stations_per_line, seed)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['호선', '순번', '역명', '순환'])
+        for line in lines:
+            flag = 'Y' if line in circular_lines else ''
+            writer.writerows((line, order, name, flag) for order, name in enumerate(names[line], 1))
+    return names
+
+
+def main(output_dir='synthetic', n_months=12, stations_per_line=50):
+    """가상 JSON 응답(월별), CSV 파일, 역 순서 파일을 output_dir에 저장"""
+    months = month_list(n_months)
+    os.makedirs(output_dir, exist_ok=True)
+    for month in months:
+        path = os.path.join(output_dir, f"CardSubwayTime_{month}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(card_subway_time_response(card_subway_time_rows(month, stations_per_line)),
+                      f, ensure_ascii=False)
+    csv_path = os.path.join(output_dir, '서울시 지하철 호선별 역별 시간대별 승하차 인원 정보.csv')
+    df = write_station_hour_csv(csv_path, months, stations_per_line)
+    write_station_order_csv(os.path.join(output_dir, '역 순서.csv'), stations_per_line)
+    print(f"JSON {len(months)}개월, CSV {len(df)}행, 역 순서 파일을 {output_dir}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] + [int(arg) for arg in sys.argv[2:4]]))
@@ -0,0 +1,70 @@
+import numpy as np
+
+from subway_cube import HOURS
+
+
+def group_top_k(scores, offsets, k):
+    """그룹별로 연속 저장된 점수에서 그룹마다 상위 k개 위치를 한 번에 계산
+
+    scores[offsets[g]:offsets[g + 1]]이 g번째 그룹의 점수
+    반환값: (그룹 수, k) 위치 배열 (점수 내림차순, 동점이면 앞쪽 위치 우선, 빈 칸은 -1)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    sizes = np.diff(offsets)
+    n_groups = len(sizes)
+    width = int(sizes.max()) if n_groups else 0
+    if n_groups == 0 or width == 0 or k <= 0:
+        return np.full((n_groups, max(k, 0)), -1, dtype=np.intp)
+
+    # (그룹, 그룹 내 위치) 행렬로 펼치고 빈 칸은 -inf로 채움
+    group_ids = np.repeat(np.arange(n_groups), sizes)
+    cols = np.arange(len(scores)) - offsets[group_ids]
+    padded = np.full((n_groups, width), -np.inf)
+    padded[group_ids, cols] = scores
+    valid = np.zeros((n_groups, width), dtype=bool)
+    valid[group_ids, cols] = True
+
+    # np.partition으로 그룹마다 k번째 점수(기준값)만 찾고 전체 정렬은 하지 않음
+    kth = min(k, width) - 1
+    threshold = -np.partition(-padded, kth, axis=1)[:, kth]
+    above = valid & (padded > threshold[:, None])
+    ties = valid & (padded == threshold[:, None])
+    # 기준값과 같은 점수는 앞쪽 위치부터 모자란 만큼만 선택 (pandas nlargest와 같은 규칙)
+    need = np.minimum(k, sizes) - above.sum(axis=1)
+    selected = above | (ties & (np.cumsum(ties, axis=1) <= need[:, None]))
+
+    # 선택된 k개만 점수 내림차순으로 정렬 (stable 정렬이라 동점은 위치 순서 유지)
+    result = np.full((n_groups, k), -1, dtype=np.intp)
+    slot = np.cumsum(selected, axis=1) - 1
+    rows, cols = np.nonzero(selected)
+    result[rows, slot[rows, cols]] = cols
+    picked = np.where(result >= 0, padded[np.arange(n_groups)[:, None], np.maximum(result, 0)], -np.inf)
+    order = np.argsort(-picked, axis=1, kind='stable')
+    result = np.take_along_axis(result, order, axis=1)
+    return np.where(result >= 0, result + offsets[:-1, None], -1)
+
+
+def hour_window(start, end):
+    """[start, end) 시간 구간을 시간 목록으로 변환 (예: 22시~2시처럼 자정을 넘는 구간 허용)"""
+    if start <= end:
+        return list(range(start, end))
+    return list(range(start, HOURS)) + list(range(0, end))
+
+
+def top_k_stations(cube, k=10, metric='총이용객', hours=None):
+    """모든 호선의 상위 k개 역을 한 번에 계산해 {호선: [역명, ...]} 반환
+
+    metric: '승차인원', '하차인원', '총이용객'
+    hours: 집계할 시간 목록 (None이면 하루 전체)
+    """
+    totals = cube.sum('station', metric, hours)
+    counts = cube.station_counts
+    valid = np.arange(totals.shape[1])[None, :] < counts[:, None]
+    # 호선별 역들을 하나의 연속 배열로 이어 붙이고 offsets로 호선 경계를 표시
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    positions = group_top_k(totals[valid], offsets, k)
+
+    names = [name for stations in cube.stations for name in stations]
+    return {line: [names[p] for p in positions[i] if p >= 0]
+            for i, line in enumerate(cube.lines)}
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+from subway_cube import DIRECTIONS, HOURS, as_cube
+from subway_stats import GROUP_COLUMNS, MomentAccumulator, ttest
+
+# 출퇴근 시간대 탐색 범위 (오전/오후 시간대가 시작할 수 있는 시각, 시간대 길이)
+MORNING_STARTS = range(5, 12)
+EVENING_STARTS = range(15, 22)
+WINDOW_LENGTHS = (1, 2, 3, 4)
+
+
+def _prefix(values):
+    """시간 축(axis=2)의 누적합, 맨 앞에 0을 붙여 길이 25 (P[h] = 0시 ~ h-1시 합계)"""
+    shape = values.shape[:2] + (1,) + values.shape[3:]
+    return np.concatenate([np.zeros(shape), np.cumsum(values, axis=2)], axis=2)
+
+
+def _window_sum(prefix, start, end):
+    """누적합에서 [start, end) 구간 합계 (start > end면 자정을 넘는 구간)
+
+    start, end는 정수 또는 같은 길이의 배열이고, 배열이면 결과의 마지막 축이 구간 축이 됨
+    """
+    start, end = np.asarray(start), np.asarray(end)
+    total = prefix[:, :, end] - prefix[:, :, start]
+    wrap = start > end
+    if np.ndim(wrap) == 0:
+        return total + prefix[:, :, HOURS] if wrap else total
+    return total + np.where(wrap, 1.0, 0.0) * prefix[:, :, HOURS, None]
+
+
+def hours_label(hours):
+    """[7, 8, 9, 17, 18, 19] → '7-9시, 17-19시' (연속된 시간을 묶어 표기)"""
+    hours = sorted(set(hours))
+    runs = []
+    for hour in hours:
+        if runs and hour == runs[-1][1] + 1:
+            runs[-1][1] = hour
+        else:
+            runs.append([hour, hour])
+    return ', '.join(f"{start}시" if start == end else f"{start}-{end}시" for start, end in runs)
+
+
+def window_label(windows):
+    """[(7, 10), (17, 20)] → '7-9시, 17-19시' (끝 시각은 포함하는 표기)"""
+    labels = []
+    for start, end in windows:
+        last = (end - 1) % HOURS
+        labels.append(f"{start}시" if last == start else f"{start}-{last}시")
+    return ', '.join(labels)
+
+
+class HourWindowIndex:
+    """(호선, 역, 승하차)별 24시간 누적합 색인
+
+    임의의 [start, end) 시간대 합계와 시간대 vs 나머지 비교를 역마다 O(1)로 계산함
+    (prefix[호선, 역, h, 승하차] = 0시 ~ h-1시 인원 합계)
+    """
+
+    def __init__(self, cube):
+        self.cube = as_cube(cube)
+        self.prefix = _prefix(self.cube.values)
+        self.count_prefix = _prefix(self.cube.observed.astype(np.float64))
+        self._moments = {}
+
+    def _metric_prefix(self, metric):
+        if metric == '총이용객':
+            return self.prefix.sum(axis=3)
+        return self.prefix[..., DIRECTIONS.index(metric)]
+
+    def total(self, start, end, metric='총이용객'):
+        """[start, end) 시간대의 (호선, 역)별 인원 합계"""
+        return _window_sum(self._metric_prefix(metric), start, end)
+
+    def station_total(self, line, station, start, end, metric='총이용객'):
+        """한 역의 [start, end) 시간대 인원 합계"""
+        i = self.cube.line_index[line]
+        j = self.cube.station_index[i][station]
+        prefix = self._metric_prefix(metric)[i:i + 1, j:j + 1]
+        return float(_window_sum(prefix, start, end)[0, 0])
+
+    def moments(self, metric='총이용객'):
+        """관측된 칸의 (개수, 합계, 제곱합) 누적합과 제곱합 기준값(shift)을 지표별로 한 번만 계산"""
+        if metric not in self._moments:
+            data = self.cube.metric(metric)
+            observed = self.cube.observed
+            shift = data[observed].mean() if observed.any() else 0.0
+            centered = np.where(observed, data - shift, 0.0)
+            self._moments[metric] = (self.count_prefix, _prefix(np.where(observed, data, 0.0)),
+                                     _prefix(centered ** 2), shift)
+        return self._moments[metric]
+
+    def split(self, windows, metric='총이용객', by='line'):
+        """시간대 목록(겹치지 않는 [start, end) 구간들) 안/밖 칸을 그룹별 누적기로 집계
+
+        by: 'all'(전체), 'line'(호선), 'line_station'(호선 × 역)
+        반환값: (시간대 안 누적기, 시간대 밖 누적기)
+        """
+        counts, totals, squares, shift = self.moments(metric)
+        inside = [sum(_window_sum(p, start, end) for start, end in windows) for p in (counts, totals, squares)]
+        everything = [p[:, :, HOURS] for p in (counts, totals, squares)]
+        outside = [all_ - in_ for all_, in_ in zip(everything, inside)]
+        return (MomentAccumulator.from_power_sums(*self._reduce(inside, by), shift),
+                MomentAccumulator.from_power_sums(*self._reduce(outside, by), shift))
+
+    def _reduce(self, arrays, by):
+        """(호선, 역, ...) 배열을 그룹 축으로 합침 (역 축 뒤의 축은 그대로 유지)"""
+        if by == 'all':
+            return [a.sum(axis=(0, 1))[None] for a in arrays]
+        if by == 'line':
+            return [a.sum(axis=1) for a in arrays]
+        if by == 'line_station':
+            valid = np.arange(self.cube.values.shape[1])[None, :] < self.cube.station_counts[:, None]
+            return [a[valid] for a in arrays]
+        raise ValueError(f"지원하지 않는 그룹 기준입니다: {by}")
+
+    def group_names(self, by):
+        if by == 'all':
+            return [()]
+        if by == 'line':
+            return [(line,) for line in self.cube.lines]
+        return [(line, station) for line, stations in zip(self.cube.lines, self.cube.stations)
+                for station in stations]
+
+
+def candidate_windows(lengths=WINDOW_LENGTHS, morning_starts=MORNING_STARTS, evening_starts=EVENING_STARTS,
+                      pairs=True):
+    """탐색할 출퇴근 시간대 후보 목록
+
+    pairs=True면 (오전 구간, 오후 구간) 조합, False면 하루 중 모든 단일 구간(자정 넘는 구간 포함)
+    """
+    if not pairs:
+        return [[(start, (start + length) % HOURS)] for length in lengths for start in range(HOURS)]
+    mornings = [(start, start + length) for start in morning_starts for length in lengths if start + length <= HOURS]
+    evenings = [(start, start + length) for start in evening_starts for length in lengths if start + length <= HOURS]
+    return [[morning, evening] for morning in mornings for evening in evenings if morning[1] <= evening[0]]
+
+
+def sweep_windows(data, metric='총이용객', by='all', top=10, windows=None, equal_var=True):
+    """모든 후보 출퇴근 시간대를 평가해 피크/비피크 대비(t-통계량)가 큰 순으로 반환
+
+    후보마다 역별 누적합 차이만 계산하므로 후보 수 × 역 수에 비례하는 시간으로 전체를 훑음
+    by: 'all', 'line', 'line_station' (그룹마다 상위 top개)
+    """
+    index = data if isinstance(data, HourWindowIndex) else HourWindowIndex(data)
+    windows = candidate_windows() if windows is None else windows
+    counts, totals, squares, shift = index.moments(metric)
+    everything = [p[:, :, HOURS] for p in (counts, totals, squares)]
+
+    # 후보마다 구간 시작/끝을 배열로 모아 한 번에 계산 (결과 마지막 축 = 후보)
+    n_parts = max(len(w) for w in windows)
+    inside = [np.zeros(p.shape[:2] + (len(windows),)) for p in (counts, totals, squares)]
+    for part in range(n_parts):
+        has_part = np.array([len(w) > part for w in windows])
+        starts = np.array([w[part][0] if len(w) > part else 0 for w in windows])
+        ends = np.array([w[part][1] if len(w) > part else 0 for w in windows])
+        for acc, p in zip(inside, (counts, totals, squares)):
+            acc += _window_sum(p, starts, ends) * has_part
+    outside = [all_[..., None] - in_ for all_, in_ in zip(everything, inside)]
+
+    peak = MomentAccumulator.from_power_sums(*index._reduce(inside, by), shift)
+    non_peak = MomentAccumulator.from_power_sums(*index._reduce(outside, by), shift)
+    t_stat, p_value = ttest(peak, non_peak, equal_var)
+
+    # (그룹, 후보) 2차원 결과를 긴 표로 펼침
+    names = index.group_names(by)
+    n_groups, n_windows = len(names), len(windows)
+    result = pd.DataFrame({
+        '시간대': np.tile(np.array([window_label(w) for w in windows], dtype=object), n_groups),
+        '피크시간대 평균': peak.mean().ravel(),
+        '비피크시간대 평균': non_peak.mean().ravel(),
+        '차이': (peak.mean() - non_peak.mean()).ravel(),
+        't-통계량': t_stat.ravel(),
+        'p-value': p_value.ravel()
+    })
+    spans = np.empty(n_windows, dtype=object)
+    for k, w in enumerate(windows):
+        spans[k] = tuple(w)
+    result['구간'] = np.tile(spans, n_groups)
+    columns = GROUP_COLUMNS.get(by, [])
+    for k, column in enumerate(columns):
+        result.insert(k, column, np.repeat(np.array([name[k] for name in names], dtype=object), n_windows))
+
+    result = result.sort_values('t-통계량', ascending=False, kind='stable')
+    if columns:
+        result = result.groupby(columns, sort=False).head(top).sort_values(columns, kind='stable')
+    else:
+        result = result.head(top)
+    return result.reset_index(drop=True)
@@ -1,25 +1,25 @@
 import pandas as pd
-import numpy as np
-from scipy import stats
 import warnings
-import requests
-import time
-from datetime import datetime, timedelta
+import sys
+from subway_csv import detect_encoding, load_processed, parse_time_columns, reshape_chunk
+from subway_cube import CongestionCube, as_cube
+from subway_memo import StageCache
+from subway_parquet import CSV_DATASET_DIR, exported_months, read_dataset, save_source, write_dataset
+from subway_profile import StageProfiler
+from subway_rank import make_windows, mannwhitney_windows
+from subway_resample import resample_peak_test
+from subway_schema import PEAK_HOURS, to_compact_frame
+from subway_stats import cohens_d as effect_size, grouped_ttest, peak_accumulators, ttest
 warnings.filterwarnings('ignore')
 
 def get_subway_data(file_path):
     """CSV 파일에서 지하철 시간대별 승하차 데이터 가져오기"""
     try:
-        # 다양한 인코딩 시도
-        encodings = ['utf-8', 'cp949', 'euc-kr']
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                print(f"데이터 건수: {len(df)}")
-                return df
-            except UnicodeDecodeError:
-                continue
-        raise Exception("적절한 인코딩을 찾을 수 없습니다.")
+        # 파일 앞부분만 읽어 인코딩을 판별한 뒤 한 번만 읽음
+        encoding = detect_encoding(file_path)
+        df = pd.read_csv(file_path, encoding=encoding)
+        print(f"데이터 건수: {len(df)}")
+        return df
     except Exception as e:
         print(f"데이터 읽기 중 오류 발생: {e}")
         return None
@@ -33,93 +33,71 @@ def preprocess_data(df):
         print("\n=== 원본 데이터 컬럼 ===")
         print(df.columns.tolist())
         
-        # 시간대별 데이터를 행으로 변환
-        time_cols = [col for col in df.columns if '시' in col]
-        base_cols = ['호선명', '지하철역']
-        
-        # 승차, 하차 데이터 분리
-        ride_cols = [col for col in time_cols if '승차' in col]
-        alight_cols = [col for col in time_cols if '하차' in col]
-        
-        # 승차 데이터 처리
-        ride_df = df[base_cols + ride_cols].melt(
-            id_vars=base_cols,
-            var_name='시간',
-            value_name='승차인원'
-        )
-        
-        # 하차 데이터 처리
-        alight_df = df[base_cols + alight_cols].melt(
-            id_vars=base_cols,
-            var_name='시간',
-            value_name='하차인원'
-        )
-        
-        # 시간 정보 추출 (예: "04시-05시 승차인원" -> "04시")
-        ride_df['시간'] = ride_df['시간'].str.extract(r'(\d+)시-').astype(str) + '시'
-        alight_df['시간'] = alight_df['시간'].str.extract(r'(\d+)시-').astype(str) + '시'
-        
-        # 승하차 데이터 병합
-        df_processed = pd.merge(
-            ride_df,
-            alight_df,
-            on=base_cols + ['시간']
-        )
-        
-        # 컬럼명 변경
-        df_processed = df_processed.rename(columns={
-            '호선명': '호선',
-            '지하철역': '역명'
-        })
-        
-        # 숫자형 데이터 변환 및 결측치 처리
-        df_processed['승차인원'] = pd.to_numeric(df_processed['승차인원'], errors='coerce').fillna(0)
-        df_processed['하차인원'] = pd.to_numeric(df_processed['하차인원'], errors='coerce').fillna(0)
-        
-        # 총 이용객 계산
-        df_processed['총이용객'] = df_processed['승차인원'] + df_processed['하차인원']
-        
-        # 서울 지하철 1~9호선만 필터링
-        seoul_lines = [str(i) + '호선' for i in range(1, 10)]
-        df_processed = df_processed[df_processed['호선'].isin(seoul_lines)]
-        
-        return df_processed
+        # 승차/하차 컬럼을 시간별로 짝지어 긴 형태로 변환 (melt 두 번 + merge 대신 배열 재배치)
+        hours, ride_cols, alight_cols = parse_time_columns(df.columns)
+        
+        # 작은 자료형으로 변환 (호선/역명 category, 시간 uint8, 인원 int32, 피크 여부 bool)
+        return to_compact_frame(reshape_chunk(df, hours, ride_cols, alight_cols))
         
     except Exception as e:
         print(f"데이터 전처리 중 오류 발생: {e}")
         return None
 
-def perform_ttest_analysis(df):
-    """시간대별 승하차 인원에 대한 독립표본 t-검정 수행"""
+def get_processed_data_chunked(file_path, chunksize=100000, dataset_dir=CSV_DATASET_DIR):
+    """CSV를 청크 단위로 읽으며 바로 전처리 (파일 전체를 메모리에 올리지 않음)
+
+    전처리 결과는 월/호선별 Parquet 데이터셋으로 저장하고, 다음 실행에서 CSV가 그대로면
+    CSV 대신 데이터셋을 읽음 (dataset_dir=None이면 사용하지 않음)
+    """
+    try:
+        months = exported_months(dataset_dir, file_path) if dataset_dir else None
+        if months:
+            df = to_compact_frame(read_dataset(dataset_dir, months=months))
+            print(f"저장된 Parquet 데이터셋에서 읽었습니다 ({len(months)}개월)")
+            print(f"전처리 후 데이터 건수: {len(df)}")
+            return df
+        
+        # 사용월별로 나눠 두어야 달/호선 단위로 저장할 수 있음 (분석에서는 큐브가 달별 인원을 합산)
+        df = load_processed(file_path, chunksize, by_month=True)
+        print(f"전처리 후 데이터 건수: {len(df)}")
+        
+        if dataset_dir and '월' in df:
+            try:
+                save_source(dataset_dir, file_path, write_dataset(df, dataset_dir))
+            except ImportError as e:
+                print(f"Parquet 내보내기를 건너뜁니다: {e}")
+        return df
+    except Exception as e:
+        print(f"데이터 읽기 중 오류 발생: {e}")
+        return None
+
+def perform_ttest_analysis(df, peak_hours=PEAK_HOURS):
+    """시간대별 승하차 인원에 대한 독립표본 t-검정 수행 (peak_hours: 피크시간대로 볼 시간 목록)"""
     print("\n=== T-검정 결과 ===")
     
     try:
         # 유의수준 설정
         alpha = 0.05
         
-        # 피크시간대 정의
-        morning_peak_hours = [str(i) + '시' for i in range(7, 10)]  # 오전 7-9시
-        evening_peak_hours = [str(i) + '시' for i in range(17, 20)]  # 오후 5-7시
-        peak_hours = morning_peak_hours + evening_peak_hours
+        cube = as_cube(df)
         
-        # 피크시간대와 비피크시간대 데이터 분리
-        peak_data = df[df['시간'].isin(peak_hours)]
-        non_peak_data = df[~df['시간'].isin(peak_hours)]
+        # 피크시간대와 비피크시간대 누적기 (개수/합계/편차제곱합을 한 번에 집계)
+        peak_on, non_peak_on = peak_accumulators(cube, '승차인원', peak_hours)
         
         # 1. 승차 인원에 대한 t-test
         print("\n1. 승차 인원 분석 (피크시간대 vs 비피크시간대)")
-        t_stat_on, p_value_on = stats.ttest_ind(peak_data['승차인원'], 
-                                               non_peak_data['승차인원'])
+        t_stat_on, p_value_on = ttest(peak_on, non_peak_on)
+        t_stat_on, p_value_on = t_stat_on[0], p_value_on[0]
+        peak_mean, non_peak_mean = peak_on.mean()[0], non_peak_on.mean()[0]
         
         print(f"승차 인원 t-통계량: {t_stat_on:.4f}")
         print(f"승차 인원 p-value: {p_value_on:.20f}")
-        print(f"피크시간대 평균 승차인원: {peak_data['승차인원'].mean():.2f}")
-        print(f"비피크시간대 평균 승차인원: {non_peak_data['승차인원'].mean():.2f}")
-        print(f"차이: {peak_data['승차인원'].mean() - non_peak_data['승차인원'].mean():.2f}")
+        print(f"피크시간대 평균 승차인원: {peak_mean:.2f}")
+        print(f"비피크시간대 평균 승차인원: {non_peak_mean:.2f}")
+        print(f"차이: {peak_mean - non_peak_mean:.2f}")
         
         # 효과 크기(Cohen's d) 계산 추가
-        pooled_std = np.sqrt((peak_data['승차인원'].var() + non_peak_data['승차인원'].var()) / 2)
-        cohens_d = abs(peak_data['승차인원'].mean() - non_peak_data['승차인원'].mean()) / pooled_std
+        cohens_d = effect_size(peak_on, non_peak_on)[0]
         print(f"효과 크기(Cohen's d): {cohens_d:.4f}")
         
         if p_value_on < alpha:
@@ -135,24 +113,21 @@ def perform_ttest_analysis(df):
         
         # 호선별 분석 추가
         print("\n=== 호선별 T-검정 결과 ===")
-        for line in df['호선'].unique():
-            print(f"\n{line} 분석")
-            line_data = df[df['호선'] == line]
-            peak_line = line_data[line_data['시간'].isin(peak_hours)]
-            non_peak_line = line_data[~line_data['시간'].isin(peak_hours)]
-            
-            t_stat, p_value = stats.ttest_ind(peak_line['총이용객'], 
-                                            non_peak_line['총이용객'])
+        # 모든 호선의 검정을 한 번에 계산한 결과 표
+        line_results = grouped_ttest(cube, 'line', '총이용객', peak_hours)
+        
+        for _, row in line_results.iterrows():
+            print(f"\n{row['호선']} 분석")
+            p_value = row['p-value']
             
-            print(f"t-통계량: {t_stat:.4f}")
+            print(f"t-통계량: {row['t-통계량']:.4f}")
             print(f"p-value: {p_value:.20f}")
-            print(f"피크시간대 평균: {peak_line['총이용객'].mean():.2f}")
-            print(f"비피크시간대 평균: {non_peak_line['총이용객'].mean():.2f}")
-            print(f"차이: {peak_line['총이용객'].mean() - non_peak_line['총이용객'].mean():.2f}")
+            print(f"피크시간대 평균: {row['피크시간대 평균']:.2f}")
+            print(f"비피크시간대 평균: {row['비피크시간대 평균']:.2f}")
+            print(f"차이: {row['차이']:.2f}")
             
             # 효과 크기 계산
-            pooled_std = np.sqrt((peak_line['총이용객'].var() + non_peak_line['총이용객'].var()) / 2)
-            cohens_d = abs(peak_line['총이용객'].mean() - non_peak_line['총이용객'].mean()) / pooled_std
+            cohens_d = row["효과 크기(Cohen's d)"]
             print(f"효과 크기(Cohen's d): {cohens_d:.4f}")
             
             if p_value < alpha:
@@ -166,42 +141,97 @@ def perform_ttest_analysis(df):
             else:
                 print("결론: 출퇴근 시간대와 통계적으로 유의미한 관계가 없음")
         
+        # 순위 기반 Mann-Whitney U 검정 (호선마다 순위를 한 번만 매기고 모든 시간대 비교에 재사용)
+        print("\n=== 호선별 Mann-Whitney U 검정 결과 (Benjamini-Hochberg 보정) ===")
+        mw_results = mannwhitney_windows(cube, 'line', '총이용객', make_windows(peak_hours))
+        
+        for line, line_rows in mw_results.groupby('호선', sort=False):
+            peak_row = line_rows.iloc[0]  # 첫 번째 비교가 출퇴근 시간대 전체
+            significant = line_rows[line_rows['보정 p-value'] < alpha]['시간대'].tolist()
+            
+            print(f"\n{line} 분석")
+            print(f"U 통계량: {peak_row['U']:.1f}")
+            print(f"보정 p-value: {peak_row['보정 p-value']:.20f}")
+            print(f"순위 이연 상관: {peak_row['순위 이연 상관']:.4f}")
+            print(f"유의미한 시간대 ({len(significant)}/{len(line_rows)}): {', '.join(significant)}")
+        
         return True
         
     except Exception as e:
         print(f"T-검정 분석 중 오류 발생: {e}")
         return False
 
-def main():
-    """메인 함수"""
+def perform_resampling_analysis(df, n_resamples=10000, seed=0, peak_hours=PEAK_HOURS):
+    """부트스트랩 신뢰구간과 순열 검정으로 호선별 피크 vs 비피크 차이 분석 (분포 가정 없음)"""
+    print("\n=== 부트스트랩/순열 검정 결과 ===")
+    
+    try:
+        cube = as_cube(df)
+        
+        # 승하차 인원은 한쪽으로 크게 치우친 분포이므로 t-검정 결과를 재표본 방법으로 확인
+        results = resample_peak_test(cube, 'line', '총이용객', peak_hours, n_resamples=n_resamples, seed=seed)
+        
+        for _, row in results.iterrows():
+            print(f"\n{row['호선']} 분석 (재표본 {n_resamples}회)")
+            print(f"차이: {row['차이']:.2f}")
+            print(f"차이의 95% 부트스트랩 신뢰구간: [{row['신뢰구간 하한']:.2f}, {row['신뢰구간 상한']:.2f}]")
+            print(f"순열 검정 p-value: {row['순열 p-value']:.6f}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"재표본 검정 중 오류 발생: {e}")
+        return False
+
+def main(force=False, profile=False):
+    """메인 함수 (force=True면 저장된 검정 결과를 쓰지 않고 다시 계산)
+
+    profile=True면 단계별 시간/메모리/행 수를 측정해 data/profiles에 JSON 보고서로 저장
+    """
     # CSV 파일 경로 설정
     file_path = r"C:\astudy12\데이터분석\서울시 지하철 호선별 역별 시간대별 승하차 인원 정보.csv"
     
+    profiler = StageProfiler(enabled=profile)
     try:
-        # CSV 파일에서 데이터 가져오기
+        # CSV 파일을 청크 단위로 읽으면서 전처리
         print("CSV 파일에서 데이터를 읽는 중...")
-        raw_data = get_subway_data(file_path)
+        with profiler.stage('데이터 읽기/전처리') as stage:
+            df = get_processed_data_chunked(file_path)
+            stage['rows'] = 0 if df is None else len(df)
         
-        if raw_data is None:
+        if df is None:
             print("데이터를 가져오는데 실패했습니다.")
             return
+            
+        # 호선 × 역 × 시간 × 승하차 큐브를 한 번만 만들어 검정에 사용
+        with profiler.stage('큐브 생성', rows_in=len(df)) as stage:
+            cube = CongestionCube.from_frame(df)
+            stage['rows'] = int(cube.observed.sum())
         
-        # 데이터 전처리
-        print("\n데이터 전처리 중...")
-        df = preprocess_data(raw_data)
+        # 큐브와 코드가 그대로인 검정은 저장된 결과를 사용
+        stages = StageCache()
         
-        if df is None:
-            print("데이터 전처리에 실패했습니다.")
-            return
-            
         # T-검정 수행
         print("\nT-검정 수행 중...")
-        perform_ttest_analysis(df)
+        with profiler.stage('T-검정', rows=int(cube.observed.sum())):
+            stages.run(perform_ttest_analysis, cube, force=force)
+        
+        # 부트스트랩/순열 검정 수행
+        print("\n재표본 검정 수행 중...")
+        with profiler.stage('재표본 검정', rows=int(cube.observed.sum())):
+            stages.run(perform_resampling_analysis, cube, force=force)
         
         print("\n분석이 완료되었습니다.")
         
     except Exception as e:
         print(f"Error: 분석 중 오류가 발생했습니다: {str(e)}")
+    finally:
+        try:
+            if profile:
+                profiler.print_summary()
+                print(f"\n실행 보고서 저장: {profiler.save('t-test')}")
+        finally:
+            profiler.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(force='--force' in sys.argv, profile='--profile' in sys.argv)
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 분석 스크립트들은 패키지가 아니라 같은 폴더의 모듈이므로 테스트에서 바로 import할 수 있게 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,50 @@
+import os
+import shutil
+
+import numpy as np
+
+from subway_aggregate import AggregateState
+from subway_analysis import update_store
+from subway_synth import month_list, write_raw_months
+
+
+def build(tmp_path, months, force=False):
+    return update_store(months, str(tmp_path / 'raw'), str(tmp_path / 'store'), force=force,
+                        dataset_dir=None, aggregate_dir=str(tmp_path / 'agg'))
+
+
+def store_total(store):
+    return sum(np.nan_to_num(store.cube([month]).values).sum() for month in store.months)
+
+
+def test_fold_matches_store(tmp_path):
+    months = month_list(2)
+    write_raw_months(str(tmp_path / 'raw'), months, 5)
+    store = build(tmp_path, months)
+    aggregates = AggregateState(str(tmp_path / 'agg'))
+    assert aggregates.months == months
+    assert np.isclose(aggregates.cube(store).values.sum(), store_total(store))
+
+
+def test_force_rebuild_with_fresh_aggregate(tmp_path):
+    months = month_list(1)
+    write_raw_months(str(tmp_path / 'raw'), months, 5)
+    build(tmp_path, months)
+    shutil.rmtree(tmp_path / 'agg')
+
+    # 저장소에는 이미 있는 달을 force로 다시 저장할 때 빈 집계에도 그 달이 온전히 더해져야 함
+    store = build(tmp_path, months, force=True)
+    aggregates = AggregateState(str(tmp_path / 'agg'))
+    assert os.path.exists(tmp_path / 'agg')
+    assert aggregates.months == months
+    assert store_total(store) > 0
+    assert np.isclose(aggregates.cube(store).values.sum(), store_total(store))
+
+
+def test_force_rebuild_does_not_double_count(tmp_path):
+    months = month_list(1)
+    write_raw_months(str(tmp_path / 'raw'), months, 5)
+    build(tmp_path, months)
+    store = build(tmp_path, months, force=True)
+    aggregates = AggregateState(str(tmp_path / 'agg'))
+    assert np.isclose(aggregates.cube(store).values.sum(), store_total(store))
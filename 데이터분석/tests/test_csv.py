@@ -0,0 +1,24 @@
+import numpy as np
+
+from subway_csv import load_processed
+from subway_synth import make_station_hour_csv
+
+
+def test_placeholder_counts_become_missing(tmp_path):
+    df = make_station_hour_csv(['202309'], 3, lines=['2호선'])
+    count_cols = [col for col in df.columns if col.endswith('승차인원') or col.endswith('하차인원')]
+    clean_path, dirty_path = tmp_path / 'clean.csv', tmp_path / 'dirty.csv'
+    df.to_csv(clean_path, index=False, encoding='cp949')
+
+    dirty = df.astype({col: object for col in count_cols})
+    ride, alight = count_cols[0], count_cols[1]
+    dirty.loc[0, ride] = '-'
+    dirty.loc[1, alight] = ' '
+    dirty.loc[2, ride] = f"{int(df.loc[2, ride]):,}"
+    dirty.to_csv(dirty_path, index=False, encoding='cp949')
+
+    clean = load_processed(str(clean_path))
+    result = load_processed(str(dirty_path))
+    assert len(result) == len(clean)
+    expected = (clean['총이용객'].sum() - df.loc[0, ride] - df.loc[1, alight])
+    assert np.isclose(result['총이용객'].sum(), expected)
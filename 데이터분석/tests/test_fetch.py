@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from subway_fetch import PageFetchError, TokenBucket, fetch_all_pages, page_ranges
+
+ENDPOINT = 'CardSubwayTime'
+
+
+class StubApi:
+    """Open API 응답 형식을 흉내 내는 로컬 HTTP 서버
+
+    failures: {시작 인덱스: 남은 실패 횟수} (0 미만이면 항상 실패), 실패 시 HTTP 503 응답
+    """
+
+    def __init__(self, total_count, failures=None):
+        self.total_count = total_count
+        self.failures = dict(failures or {})
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                _, _, _, endpoint, start, end, date = self.path.split('/')
+                start, end = int(start), int(end)
+                with stub.lock:
+                    stub.requests.append((start, end))
+                    remaining = stub.failures.get(start, 0)
+                    if remaining:
+                        stub.failures[start] = remaining - 1
+                if remaining:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                rows = [{'USE_MM': date, 'INDEX': i} for i in range(start, min(end, stub.total_count) + 1)]
+                body = json.dumps({endpoint: {'list_total_count': stub.total_count, 'row': rows}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fetch(stub, **options):
+    options = {'page_size': 10, 'workers': 3, 'rate': 0, 'backoff': 0.01, **options}
+    return fetch_all_pages('KEY', '202309', ENDPOINT, base_url=stub.url, **options)
+
+
+def test_page_ranges():
+    assert page_ranges(25, 10) == [(1, 10), (11, 20), (21, 25)]
+    assert page_ranges(20, 10) == [(1, 10), (11, 20)]
+    assert page_ranges(0, 10) == []
+
+
+def test_pages_are_fetched_once_and_joined_in_order():
+    with StubApi(total_count=35) as stub:
+        rows = fetch(stub)
+    assert [row['INDEX'] for row in rows] == list(range(1, 36))
+    assert sorted(stub.requests) == [(1, 10), (11, 20), (21, 30), (31, 35)]
+
+
+def test_transient_server_error_is_retried():
+    with StubApi(total_count=25, failures={11: 2}) as stub:
+        rows = fetch(stub, retries=3)
+    assert [row['INDEX'] for row in rows] == list(range(1, 26))
+    assert stub.requests.count((11, 20)) == 3
+
+
+def test_persistent_failure_raises_after_retries():
+    with StubApi(total_count=25, failures={21: -1}) as stub:
+        with pytest.raises(PageFetchError, match='3회 시도'):
+            fetch(stub, retries=2)
+    assert stub.requests.count((21, 25)) == 3
+
+
+def test_done_ranges_are_skipped_and_pages_reported():
+    seen = []
+    with StubApi(total_count=30) as stub:
+        rows = fetch(stub, total_count=30, done=[(11, 20)],
+                     on_page=lambda index_range, page, total: seen.append(index_range))
+    assert [row['INDEX'] for row in rows] == list(range(1, 11)) + list(range(21, 31))
+    assert (11, 20) not in stub.requests and (1, 10) in stub.requests
+    assert sorted(seen) == [(1, 10), (21, 30)]
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # 첫 토큰은 바로, 나머지 5개는 초당 20개씩 → 약 0.25초
+    assert time.monotonic() - start >= 0.2
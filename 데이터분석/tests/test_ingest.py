@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from subway_ingest import ingest_month, load_month, saved_months
+from test_fetch import StubApi
+
+OPTIONS = {'page_size': 10, 'workers': 2, 'rate': 0, 'backoff': 0.01}
+
+
+def test_closed_month_is_fetched_once(tmp_path):
+    with StubApi(total_count=15) as stub:
+        assert ingest_month('KEY', '202309', str(tmp_path), base_url=stub.url, **OPTIONS)
+        first = len(stub.requests)
+        assert ingest_month('KEY', '202309', str(tmp_path), base_url=stub.url, **OPTIONS)
+    assert len(stub.requests) == first
+    assert len(load_month('202309', str(tmp_path))) == 15
+    assert saved_months(str(tmp_path)) == ['202309']
+
+
+def test_open_month_is_fetched_again(tmp_path):
+    month = datetime.now().strftime('%Y%m')
+    with StubApi(total_count=15) as stub:
+        assert ingest_month('KEY', month, str(tmp_path), base_url=stub.url, **OPTIONS)
+    assert len(load_month(month, str(tmp_path))) == 15
+
+    # 이번 달 데이터가 늘어난 뒤 다시 실행하면 새로 받아 저장된 파일을 교체함
+    with StubApi(total_count=25) as stub:
+        assert ingest_month('KEY', month, str(tmp_path), base_url=stub.url, **OPTIONS)
+    assert sorted(stub.requests) == [(1, 10), (11, 20), (21, 25)]
+    assert [row['INDEX'] for row in load_month(month, str(tmp_path))] == list(range(1, 26))
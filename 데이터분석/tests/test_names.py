@@ -0,0 +1,28 @@
+from subway_names import StationIndex, canonical_name
+
+
+def test_spelling_variants_share_a_name():
+    assert canonical_name('서울역') == canonical_name(' 서울 ') == '서울'
+    assert canonical_name('총신대입구(이수)') == '총신대입구'
+
+
+def test_line_qualifier_is_part_of_identity():
+    assert canonical_name('신촌(경의중앙선)') == canonical_name('신촌역 (경의중앙선)') == '신촌(경의중앙선)'
+    assert canonical_name('신촌(경의중앙선)') != canonical_name('신촌')
+
+    index = StationIndex()
+    sinchon = index.add('신촌', '2호선')
+    yangpyeong = index.add('양평', '5호선')
+    assert index.add('신촌(경의중앙선)', '경의중앙선') != sinchon
+    assert index.add('양평(경의중앙선)', '경의중앙선') != yangpyeong
+    assert index.lookup('신촌', '경의중앙선') is None
+    assert index.station_lines[sinchon] == {'2호선'}
+
+
+def test_alias_of_existing_station_adds_line():
+    index = StationIndex()
+    isu = index.add('이수', '7호선')
+    chongshin = index.add('총신대입구(이수)', '4호선')
+    assert index.resolve('이수', '4호선') == isu
+    assert index.resolve('이수', '7호선') == isu
+    assert index.lookup('총신대입구', '4호선') == chongshin
@@ -0,0 +1,48 @@
+import importlib.util
+import os
+
+import pandas as pd
+import pytest
+
+from subway_parquet import CSV_DATASET_DIR, DEFAULT_DATASET_DIR, exported_months, write_dataset
+from subway_synth import make_station_hour_csv
+
+pytest.importorskip('pyarrow')
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_ttest_module():
+    spec = importlib.util.spec_from_file_location('t_test', os.path.join(SCRIPT_DIR, 't-test.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_sources_use_separate_dataset_dirs():
+    assert os.path.abspath(CSV_DATASET_DIR) != os.path.abspath(DEFAULT_DATASET_DIR)
+
+
+def test_overwritten_month_is_not_served_from_cache(tmp_path):
+    tt = load_ttest_module()
+    csv_path = str(tmp_path / 'source.csv')
+    make_station_hour_csv(['202309'], 5, lines=['1호선', '2호선']).to_csv(csv_path, index=False, encoding='cp949')
+    dataset_dir = str(tmp_path / 'parquet')
+
+    first = tt.get_processed_data_chunked(csv_path, dataset_dir=dataset_dir)
+    assert exported_months(dataset_dir, csv_path) == ['202309']
+    cached = tt.get_processed_data_chunked(csv_path, dataset_dir=dataset_dir)
+    assert cached['총이용객'].sum() == first['총이용객'].sum()
+
+    # 다른 원본이 같은 달 파티션을 다른 값으로 덮어씀
+    other = first.copy()
+    other['승차인원'] = other['승차인원'] // 2
+    other['총이용객'] = other['승차인원'] + other['하차인원']
+    write_dataset(other, dataset_dir)
+    assert exported_months(dataset_dir, csv_path) is None
+
+    # CSV가 그대로면 CSV를 다시 읽어 원래 값을 돌려줌
+    again = tt.get_processed_data_chunked(csv_path, dataset_dir=dataset_dir)
+    assert again['총이용객'].sum() == first['총이용객'].sum()
+    assert exported_months(dataset_dir, csv_path) == ['202309']
+    assert isinstance(again, pd.DataFrame)
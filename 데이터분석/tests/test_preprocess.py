@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from subway_analysis import preprocess_data
+
+
+def raw_row(station, on, off, hours=(7, 8)):
+    row = {'SBWY_ROUT_LN_NM': '2호선', 'STTN': station}
+    for hour in hours:
+        row[f'HR_{hour}_GET_ON_NOPE'] = on
+        row[f'HR_{hour}_GET_OFF_NOPE'] = off
+    return row
+
+
+def test_name_variants_are_summed():
+    single = preprocess_data(pd.DataFrame([raw_row('강남', 100, 50)]))
+    merged = preprocess_data(pd.DataFrame([raw_row('강남', 100, 50), raw_row('강남역', 30, 20)]))
+    assert merged['역명'].astype(str).unique().tolist() == ['강남']
+    assert merged['승차인원'].sum() == 2 * 130
+    assert merged['하차인원'].sum() == 2 * 70
+    assert merged['총이용객'].sum() == single['총이용객'].sum() + 2 * 50
+
+
+def test_missing_cells_stay_missing_when_all_variants_missing():
+    rows = [raw_row('강남', 100, 50), raw_row('강남역', '', 20)]
+    rows.append({'SBWY_ROUT_LN_NM': '2호선', 'STTN': '역삼', 'HR_7_GET_ON_NOPE': None,
+                 'HR_7_GET_OFF_NOPE': None, 'HR_8_GET_ON_NOPE': 10, 'HR_8_GET_OFF_NOPE': 5})
+    df = preprocess_data(pd.DataFrame(rows))
+    gangnam = df[df['역명'] == '강남']
+    assert gangnam['승차인원'].tolist() == [100, 100]
+    assert gangnam['하차인원'].tolist() == [70, 70]
+    # 승하차가 모두 없는 역삼 7시는 0으로 채워지지 않고 빠져야 함
+    yeoksam = df[df['역명'] == '역삼']
+    assert yeoksam['시간'].astype(int).tolist() == [8]
+    assert not np.isnan(df['총이용객'].to_numpy(dtype=float)).any()
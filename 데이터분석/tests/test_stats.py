@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from subway_cube import CongestionCube
+from subway_schema import PEAK_HOURS
+from subway_stats import peak_accumulators
+
+
+def frame():
+    rng = np.random.default_rng(0)
+    rows = [{'호선': line, '역명': station, '시간': f"{hour}시",
+             '승차인원': int(rng.integers(0, 500)), '하차인원': int(rng.integers(0, 500))}
+            for line in ('1호선', '2호선') for station in ('가', '나') for hour in range(24)]
+    df = pd.DataFrame(rows)
+    df['총이용객'] = df['승차인원'] + df['하차인원']
+    return df
+
+
+def test_lines_missing_on_either_side_are_skipped():
+    df = frame()
+    cube = CongestionCube.from_frame(df)
+    # 3호선은 데이터에 없고, 1호선은 lines에 없음
+    lines = ['2호선', '3호선']
+    for data in (cube, df):
+        peak, non_peak = peak_accumulators(data, '총이용객', PEAK_HOURS, lines)
+        expected = df[df['호선'] == '2호선']
+        is_peak = expected['시간'].str[:-1].astype(int).isin(PEAK_HOURS)
+        assert peak.count.tolist() == [is_peak.sum(), 0]
+        assert non_peak.count.tolist() == [(~is_peak).sum(), 0]
+        assert np.isclose(peak.total[0], expected.loc[is_peak, '총이용객'].sum())